@@ -0,0 +1 @@
+"""Benchmarks com cliente Telegram simulado."""
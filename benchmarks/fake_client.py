@@ -0,0 +1,207 @@
+"""Stand-in local do TelegramClient para benchmarks (sem rede)."""
+
+from __future__ import annotations
+
+import asyncio
+from collections import Counter
+from collections.abc import AsyncIterator
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any
+
+from telethon import errors
+from telethon._updates import EntityCache
+from telethon.tl.types import (
+    Channel,
+    ChatPhotoEmpty,
+    Document,
+    DocumentAttributeFilename,
+    Message,
+    MessageMediaDocument,
+    PeerChannel,
+    PeerUser,
+)
+
+# Canal sintético usado pelos cenários (id marcado: -100<CHANNEL_ID>)
+CHANNEL_ID = 1234
+DEST_CHANNEL_ID = 5678
+
+EPOCH = datetime(2024, 1, 1, tzinfo=UTC)
+
+
+@dataclass(slots=True)
+class FakeConfig:
+    """Parâmetros do servidor simulado."""
+
+    messages: int = 10_000
+    dialogs: int = 500
+    latency: float = 0.05  # segundos por RPC
+    page_size: int = 100  # mensagens por GetHistory
+    payload_size: int = 200  # caracteres de texto por mensagem
+    media_every: int = 0  # 1 mídia a cada N mensagens (0 = nenhuma)
+    media_size: int = 64 * 1024  # bytes por arquivo
+    flood_every: int = 0  # 1 FloodWait a cada N RPCs (0 = nenhum)
+    flood_seconds: int = 1
+    flood_sleep_threshold: int = 60  # como no Telethon: abaixo disso dorme sozinho
+
+
+class FakeTelegramClient:
+    """
+    Implementa a parte do `TelegramClient` usada pelos comandos.
+
+    Cada RPC custa `latency` segundos; iteradores paginam de `page_size` em
+    `page_size`. FloodWaits injetados abaixo de `flood_sleep_threshold` são
+    dormidos pelo próprio cliente (como o Telethon faz) e contabilizados em
+    `flood_sleep`; acima disso são levantados para o chamador.
+    """
+
+    def __init__(self, config: FakeConfig) -> None:
+        self.config = config
+        self.rpcs: Counter[str] = Counter()
+        self.items = 0
+        self.flood_sleep = 0.0
+        # Lidos por Message._finish_init e Message.text
+        self._self_id = 1
+        self.parse_mode = None
+        self._mb_entity_cache = EntityCache()
+        self._text = ("lorem ipsum dolor sit amet " * (config.payload_size // 27 + 1))[
+            : config.payload_size
+        ]
+
+    # ========== RPC SIMULADA ==========
+
+    async def _rpc(self, name: str, latency: float | None = None) -> None:
+        """Simula uma requisição: latência e, às vezes, FloodWait."""
+        self.rpcs[name] += 1
+        total = sum(self.rpcs.values())
+        if self.config.flood_every and total % self.config.flood_every == 0:
+            seconds = self.config.flood_seconds
+            if seconds > self.config.flood_sleep_threshold:
+                raise errors.FloodWaitError(request=None, capture=seconds)
+            self.flood_sleep += seconds
+            await asyncio.sleep(seconds)
+        await asyncio.sleep(self.config.latency if latency is None else latency)
+
+    def _message(self, message_id: int, channel_id: int = CHANNEL_ID) -> Message:
+        media = None
+        if self.config.media_every and message_id % self.config.media_every == 0:
+            media = MessageMediaDocument(
+                document=Document(
+                    id=message_id,
+                    access_hash=0,
+                    file_reference=b"",
+                    date=None,
+                    mime_type="application/octet-stream",
+                    size=self.config.media_size,
+                    dc_id=2,
+                    attributes=[DocumentAttributeFilename(f"arquivo_{message_id}.bin")],
+                )
+            )
+        message = Message(
+            id=message_id,
+            peer_id=PeerChannel(channel_id),
+            date=EPOCH + timedelta(minutes=message_id),
+            message=f"{message_id} {self._text}",
+            from_id=PeerUser(1000 + message_id % 50),
+            media=media,
+        )
+        message._finish_init(self, {}, None)
+        return message
+
+    # ========== API USADA PELOS COMANDOS ==========
+
+    async def connect(self) -> None:
+        pass
+
+    async def disconnect(self) -> None:
+        pass
+
+    async def is_user_authorized(self) -> bool:
+        return True
+
+    async def get_entity(self, entity_id: int) -> Channel:
+        await self._rpc("GetEntity")
+        channel_id = int(str(abs(entity_id)).removeprefix("100"))
+        return Channel(
+            id=channel_id,
+            title=f"Canal {channel_id}",
+            photo=ChatPhotoEmpty(),
+            date=EPOCH,
+            access_hash=channel_id * 7,
+        )
+
+    async def iter_messages(
+        self,
+        entity: Any,
+        limit: int | None = None,
+        offset_id: int = 0,
+        min_id: int = 0,
+        max_id: int = 0,
+        reverse: bool = False,
+        search: str | None = None,
+        **_: Any,
+    ) -> AsyncIterator[Message]:
+        """Histórico de 1..`messages`, com as mesmas regras de paginação do Telethon."""
+        top = min(self.config.messages, max_id - 1) if max_id else self.config.messages
+        if reverse:
+            ids = range(min_id + 1, top + 1)
+        else:
+            ids = range(min(offset_id - 1, top) if offset_id else top, min_id, -1)
+        if limit is not None:
+            ids = ids[:limit]
+
+        rpc = "Search" if search else "GetHistory"
+        for start in range(0, len(ids), self.config.page_size):
+            await self._rpc(rpc)
+            for message_id in ids[start : start + self.config.page_size]:
+                self.items += 1
+                yield self._message(message_id)
+
+    async def get_messages(
+        self, entity: Any, ids: list[int] | None = None, limit: int | None = None
+    ) -> list[Message | None]:
+        if ids is None:
+            # Sem ids: as `limit` mais recentes (uma página do histórico)
+            return [message async for message in self.iter_messages(entity, limit=limit)]
+        await self._rpc("GetMessages")
+        return [self._message(i) if i <= self.config.messages else None for i in ids]
+
+    async def iter_dialogs(self, **_: Any) -> AsyncIterator[Any]:
+        for start in range(0, self.config.dialogs, 100):
+            await self._rpc("GetDialogs")
+            for n in range(start, min(start + 100, self.config.dialogs)):
+                self.items += 1
+                entity = Channel(
+                    id=10_000 + n,
+                    title=f"Canal {n}",
+                    photo=ChatPhotoEmpty(),
+                    date=EPOCH,
+                    access_hash=n,
+                    broadcast=n % 2 == 0,
+                )
+                yield SimpleNamespace(
+                    id=-(1_000_000_000_000 + 10_000 + n),
+                    name=entity.title,
+                    entity=entity,
+                    unread_count=n % 7,
+                    message=SimpleNamespace(id=n + 1),
+                )
+
+    async def forward_messages(
+        self, entity: Any, messages: list[int], from_peer: Any = None, **_: Any
+    ) -> list[Message]:
+        await self._rpc("ForwardMessages")
+        self.items += len(messages)
+        return [self._message(i, DEST_CHANNEL_ID) for i in messages]
+
+    async def download_media(self, message: Message, file: str | None = None, **_: Any) -> str:
+        """Escreve `media_size` bytes; latência proporcional a partes de 512 KB."""
+        parts = max(1, self.config.media_size // (512 * 1024))
+        await self._rpc("GetFile", self.config.latency * parts)
+        path = Path(file or ".")
+        if path.is_dir():
+            path = path / f"{message.id}.bin"
+        path.write_bytes(b"\0" * self.config.media_size)
+        return str(path)
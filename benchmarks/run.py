@@ -0,0 +1,118 @@
+"""
+Benchmarks dos comandos contra o cliente simulado.
+
+Uso:
+    uv run python -m benchmarks.run                      # todos os cenários
+    uv run python -m benchmarks.run backup forward --messages 50000 --latency 0.02
+    uv run python -m benchmarks.run --unlimited --json   # sem rate limiter, saída JSON
+
+Cada cenário roda em um subprocesso próprio, para o pico de RSS ser só dele.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+import sys
+from dataclasses import asdict, replace
+from typing import Any
+
+import typer
+from rich.console import Console
+from rich.table import Table
+
+from .fake_client import FakeConfig
+
+# Cenários disponíveis (um comando cada)
+SCENARIOS = ("list", "backup", "backup-ranges", "backup-media", "forward", "search")
+
+console = Console()
+
+
+def _spawn(name: str, config: FakeConfig, unlimited: bool) -> dict[str, Any]:
+    """Roda um cenário em subprocesso e devolve o resultado."""
+    env = {
+        "TELEGRAM_API_ID": "1",
+        "TELEGRAM_API_HASH": "benchmark",
+        "TELEGRAM_PHONE": "0",
+        **os.environ,
+    }
+    args = [sys.executable, "-m", "benchmarks.worker", name, json.dumps(asdict(config))]
+    if unlimited:
+        args.append("--unlimited")
+    proc = subprocess.run(args, env=env, capture_output=True, text=True, check=False)
+    if proc.returncode != 0:
+        raise RuntimeError(f"Cenário {name} falhou:\n{proc.stderr}")
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def main(
+    scenarios: list[str] = typer.Argument(None, help="Cenários (padrão: todos)"),
+    messages: int = typer.Option(10_000, help="Mensagens no histórico"),
+    dialogs: int = typer.Option(500, help="Diálogos da conta"),
+    latency: float = typer.Option(0.05, help="Latência por RPC (s)"),
+    page_size: int = typer.Option(100, help="Mensagens por página"),
+    payload_size: int = typer.Option(200, help="Caracteres de texto por mensagem"),
+    media_every: int = typer.Option(10, help="1 mídia a cada N mensagens (backup-media)"),
+    media_size: int = typer.Option(64 * 1024, help="Bytes por mídia"),
+    flood_every: int = typer.Option(0, help="1 FloodWait a cada N RPCs (0 = nenhum)"),
+    flood_seconds: int = typer.Option(1, help="Duração de cada FloodWait (s)"),
+    unlimited: bool = typer.Option(False, help="Desliga o rate limiter (mede só o pipeline)"),
+    as_json: bool = typer.Option(False, "--json", help="Saída JSON (para comparar execuções)"),
+) -> None:
+    """Mede itens/s, RPCs, espera por flood/limiter e pico de RSS de cada comando."""
+    selected = scenarios or list(SCENARIOS)
+    if unknown := set(selected) - set(SCENARIOS):
+        raise typer.BadParameter(f"Cenário desconhecido: {', '.join(sorted(unknown))}")
+
+    base = FakeConfig(
+        messages=messages,
+        dialogs=dialogs,
+        latency=latency,
+        page_size=page_size,
+        payload_size=payload_size,
+        media_size=media_size,
+        flood_every=flood_every,
+        flood_seconds=flood_seconds,
+    )
+
+    results = []
+    for name in selected:
+        config = replace(base, media_every=media_every if name == "backup-media" else 0)
+        if not as_json:
+            console.print(f"[dim]Rodando {name}...[/]")
+        results.append(_spawn(name, config, unlimited))
+
+    if as_json:
+        print(json.dumps(results, indent=2))
+        return
+
+    table = Table(title="Benchmarks", header_style="bold cyan")
+    table.add_column("Cenário")
+    for column in (
+        "Itens",
+        "Tempo (s)",
+        "Itens/s",
+        "RPCs",
+        "Flood (s)",
+        "Limiter (s)",
+        "Pico RSS (MB)",
+    ):
+        table.add_column(column, justify="right")
+    for r in results:
+        table.add_row(
+            r["scenario"],
+            str(r["items"]),
+            f"{r['seconds']:.2f}",
+            f"{r['items_per_s']:.0f}",
+            str(r["rpcs"]),
+            f"{r['flood_sleep_s']:.1f}",
+            f"{r['limiter_wait_s']:.1f}",
+            f"{r['peak_rss_mb']:.0f}",
+        )
+    console.print(table)
+
+
+if __name__ == "__main__":
+    typer.run(main)
@@ -0,0 +1,105 @@
+"""Executa um cenário de benchmark em processo próprio e imprime o resultado em JSON."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import resource
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+from .fake_client import CHANNEL_ID, DEST_CHANNEL_ID, FakeConfig, FakeTelegramClient
+
+
+def _marked(channel_id: int) -> int:
+    return -(1_000_000_000_000 + channel_id)
+
+
+async def run_scenario(
+    name: str, config: FakeConfig, unlimited: bool, workdir: Path
+) -> dict[str, Any]:
+    """Instala o cliente simulado no pool e executa o comando."""
+    # Imports tardios: TELEGRAM_DATA_DIR precisa estar definido antes
+    from telegram_gfcr.commands import backup, forward, search
+    from telegram_gfcr.commands import list as list_cmd
+    from telegram_gfcr.config import reload_settings
+    from telegram_gfcr.core.client import TelegramClientWrapper, get_pool, shutdown_pool
+    from telegram_gfcr.core.ratelimit import DEFAULT_RATES, RateLimiter
+
+    for module in (backup, forward, list_cmd, search):
+        module.console.quiet = True
+
+    # As configurações são memoizadas: relê o TELEGRAM_DATA_DIR do cenário
+    reload_settings()
+
+    waited = 0.0
+
+    class MeasuredRateLimiter(RateLimiter):
+        async def acquire(self, rate_class: str) -> float:
+            nonlocal waited
+            wait = await super().acquire(rate_class)
+            waited += wait
+            return wait
+
+    rates = {key: (1e9, 1e9) for key in DEFAULT_RATES} if unlimited else None
+    fake = FakeTelegramClient(config)
+    pool = await get_pool()
+    pool.rate_limiter = MeasuredRateLimiter(rates)
+    pool._wrapper = TelegramClientWrapper(pool.rate_limiter)
+    pool._wrapper._client = fake  # type: ignore[assignment]
+
+    source = _marked(CHANNEL_ID)
+    start = time.perf_counter()
+    try:
+        match name:
+            case "list":
+                await list_cmd.run_list_async(refresh=True)
+            case "backup":
+                await backup.run_backup_async([source], str(workdir / "backup"), media=False)
+            case "backup-ranges":
+                await backup.run_backup_async(
+                    [source], str(workdir / "backup"), media=False, ranges=4
+                )
+            case "backup-media":
+                await backup.run_backup_async([source], str(workdir / "backup"), media=True)
+            case "forward":
+                await forward.run_forward_async(source, _marked(DEST_CHANNEL_ID), config.messages)
+            case "search":
+                await search.run_search_async("lorem", [source], limit=config.messages)
+            case _:
+                raise ValueError(f"Cenário desconhecido: {name}")
+        elapsed = time.perf_counter() - start
+    finally:
+        await shutdown_pool()
+
+    # items: mensagens servidas/encaminhadas ou diálogos listados pelo cliente simulado
+    return {
+        "scenario": name,
+        "items": fake.items,
+        "seconds": round(elapsed, 3),
+        "items_per_s": round(fake.items / elapsed, 1) if elapsed else 0.0,
+        "rpcs": sum(fake.rpcs.values()),
+        "rpcs_by_method": dict(fake.rpcs),
+        "flood_sleep_s": round(fake.flood_sleep, 3),
+        "limiter_wait_s": round(waited, 3),
+        # ru_maxrss é em KB no Linux
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+
+
+def main(argv: list[str]) -> None:
+    """Uso: python -m benchmarks.worker <cenário> <config JSON> [--unlimited]"""
+    name, config_json = argv[0], argv[1]
+    config = FakeConfig(**json.loads(config_json))
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["TELEGRAM_DATA_DIR"] = str(Path(tmp) / "data")
+        result = asyncio.run(run_scenario(name, config, "--unlimited" in argv, Path(tmp)))
+    print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -1,13 +1,11 @@
 """Entry point do CLI com Typer."""
 
+from datetime import datetime
+from typing import Any, TypedDict
+
 import typer
-from rich.console import Console
 
 from . import __version__
-from .core.logging import setup_logging
-
-# Configurar logging ao importar o módulo
-setup_logging()
 
 app = typer.Typer(
     name="telegram-gfcr",
@@ -15,16 +13,74 @@ app = typer.Typer(
     add_completion=True,
     no_args_is_help=True,
 )
-console = Console()
 
 
 def version_callback(value: bool) -> None:
     """Exibe versão e sai."""
     if value:
-        console.print(f"[bold blue]telegram-gfcr[/] version [green]{__version__}[/]")
+        from rich.console import Console
+
+        Console().print(f"[bold blue]telegram-gfcr[/] version [green]{__version__}[/]")
         raise typer.Exit()
 
 
+def _setup() -> None:
+    """
+    Configura o logging ao executar um comando.
+
+    Fica fora do import e do callback (que roda antes do `--help` dos
+    subcomandos): `--help`, `--version` e o shell completion não leem
+    configurações, não tocam o disco e não importam o Telethon.
+    """
+    from .core.logging import setup_logging
+
+    setup_logging()
+
+
+class _BackupArgs(TypedDict):
+    """Argumentos de `run_backup` (também enviados ao daemon)."""
+
+    entity_ids: list[int]
+    output: str | None
+    media: bool
+    workers: int | None
+    compression: str | None
+    fmt: str | None
+    parallel: int | None
+    from_file: str | None
+    entity_type: str | None
+    split: int | None
+    follow: bool
+    ranges: int | None
+    since: str | None
+    until: str | None
+    min_id: int | None
+    max_id: int | None
+    media_types: str | None
+    max_media_mb: float | None
+
+
+class _SyncArgs(TypedDict):
+    """Argumentos de `run_sync` (também enviados ao daemon)."""
+
+    output: str | None
+    entity_type: str
+    media: bool
+    workers: int | None
+    compression: str | None
+    fmt: str | None
+    parallel: int | None
+    split: int | None
+    dry_run: bool
+
+
+def _in_daemon(command: str, **args: Any) -> bool:
+    """Encaminha o comando ao daemon, se houver um rodando (ver `daemon`)."""
+    from .core.daemon import run_in_daemon
+
+    return run_in_daemon(command, **args)
+
+
 @app.callback()
 def main(
     version: bool = typer.Option(
@@ -43,6 +99,7 @@ def main(
 @app.command()
 def interactive() -> None:
     """Inicia modo REPL interativo."""
+    _setup()
     from .interactive import start_session
 
     start_session()
@@ -53,6 +110,7 @@ def auth(
     phone: str = typer.Argument(..., help="Número de telefone com código do país (+5511...)"),
 ) -> None:
     """Autentica conta Telegram."""
+    _setup()
     from .commands.auth import run_auth
 
     run_auth(phone)
@@ -66,23 +124,142 @@ def list_entities(
         "-t",
         help="Tipo de entidade: all, groups, channels, users",
     ),
+    refresh: bool = typer.Option(
+        False, "--refresh", "-r", help="Ignora o cache e busca a lista no Telegram"
+    ),
 ) -> None:
     """Lista grupos, conversas e canais."""
+    _setup()
+    if _in_daemon("list", entity_type=entity_type, refresh=refresh):
+        return
     from .commands.list import run_list
 
-    run_list(entity_type)
+    run_list(entity_type, refresh)
 
 
 @app.command()
 def backup(
-    entity_id: int = typer.Argument(..., help="ID da entidade para backup"),
-    output: str = typer.Option(None, "--output", "-o", help="Diretório de saída"),
+    entity_ids: list[int] = typer.Argument(None, help="IDs das entidades para backup"),
+    output: str = typer.Option(
+        None, "--output", "-o", help="Diretório de saída (raiz, se houver várias entidades)"
+    ),
     media: bool = typer.Option(False, "--media", "-m", help="Incluir mídias"),
+    workers: int = typer.Option(
+        None, "--workers", "-w", help="Downloads de mídia simultâneos (padrão: 4)"
+    ),
+    compress: str = typer.Option(
+        None, "--compress", "-z", help="Compressão dos segmentos: none, gzip ou zstd"
+    ),
+    fmt: str = typer.Option(None, "--format", "-f", help="Formato das mensagens: full ou compact"),
+    from_file: str = typer.Option(
+        None, "--from-file", help="Arquivo com um ID por linha (# inicia comentário)"
+    ),
+    entity_type: str = typer.Option(
+        None, "--type", "-t", help="Incluir todos os diálogos do tipo: users, groups, channels, all"
+    ),
+    parallel: int = typer.Option(
+        None, "--parallel", "-p", help="Entidades simultâneas (padrão: 4)"
+    ),
+    split: int = typer.Option(
+        None, "--split", help="Conexões paralelas por mídia grande (0 desativa)"
+    ),
+    follow: bool = typer.Option(
+        False, "--follow", "-F", help="Após o backup, acompanha novas mensagens em tempo real"
+    ),
+    ranges: int = typer.Option(
+        None, "--ranges", help="Faixas de ids buscadas em paralelo no histórico (padrão: 1)"
+    ),
+    since: datetime = typer.Option(
+        None, "--since", formats=["%Y-%m-%d"], help="Só mensagens a partir da data"
+    ),
+    until: datetime = typer.Option(
+        None, "--until", formats=["%Y-%m-%d"], help="Só mensagens antes da data (exclusiva)"
+    ),
+    min_id: int = typer.Option(None, "--min-id", help="Menor id de mensagem (inclusivo)"),
+    max_id: int = typer.Option(None, "--max-id", help="Maior id de mensagem (inclusivo)"),
+    media_types: str = typer.Option(
+        None, "--media-type", help="Só baixar estes tipos: photo, video, document, ... (vírgulas)"
+    ),
+    max_media_mb: float = typer.Option(
+        None, "--max-media-mb", help="Não baixar mídias maiores que isso (MB)"
+    ),
 ) -> None:
-    """Faz backup de uma conversa ou grupo."""
+    """
+    Faz backup de uma ou várias conversas ou grupos.
+
+    Com --since/--until/--min-id/--max-id é uma exportação do recorte: só as
+    páginas pedidas são buscadas e o checkpoint do backup incremental não muda.
+    """
+    _setup()
+    args = _BackupArgs(
+        entity_ids=entity_ids or [],
+        output=output,
+        media=media,
+        workers=workers,
+        compression=compress,
+        fmt=fmt,
+        parallel=parallel,
+        from_file=from_file,
+        entity_type=entity_type,
+        split=split,
+        follow=follow,
+        ranges=ranges,
+        # Datas como texto: também precisam atravessar o socket do daemon
+        since=since.date().isoformat() if since else None,
+        until=until.date().isoformat() if until else None,
+        min_id=min_id,
+        max_id=max_id,
+        media_types=media_types,
+        max_media_mb=max_media_mb,
+    )
+    # --follow não termina: no daemon prenderia a fila de comandos para sempre
+    if not follow and _in_daemon("backup", **args):
+        return
     from .commands.backup import run_backup
 
-    run_backup(entity_id, output, media)
+    run_backup(**args)
+
+
+@app.command()
+def sync(
+    output: str = typer.Option(None, "--output", "-o", help="Raiz dos backups (padrão: ./backups)"),
+    entity_type: str = typer.Option(
+        "all", "--type", "-t", help="Tipo de diálogo: all, users, groups, channels"
+    ),
+    media: bool = typer.Option(False, "--media", "-m", help="Incluir mídias"),
+    workers: int = typer.Option(
+        None, "--workers", "-w", help="Downloads de mídia simultâneos (padrão: 4)"
+    ),
+    compress: str = typer.Option(
+        None, "--compress", "-z", help="Compressão dos segmentos: none, gzip ou zstd"
+    ),
+    fmt: str = typer.Option(None, "--format", "-f", help="Formato das mensagens: full ou compact"),
+    parallel: int = typer.Option(
+        None, "--parallel", "-p", help="Entidades simultâneas (padrão: 4)"
+    ),
+    split: int = typer.Option(
+        None, "--split", help="Conexões paralelas por mídia grande (0 desativa)"
+    ),
+    dry_run: bool = typer.Option(False, "--dry-run", "-n", help="Só lista os diálogos que mudaram"),
+) -> None:
+    """Backup de todos os diálogos que mudaram desde o último backup."""
+    _setup()
+    args = _SyncArgs(
+        output=output,
+        entity_type=entity_type,
+        media=media,
+        workers=workers,
+        compression=compress,
+        fmt=fmt,
+        parallel=parallel,
+        split=split,
+        dry_run=dry_run,
+    )
+    if _in_daemon("sync", **args):
+        return
+    from .commands.sync import run_sync
+
+    run_sync(**args)
 
 
 @app.command()
@@ -92,6 +269,9 @@ def forward(
     limit: int = typer.Option(100, "--limit", "-l", help="Limite de mensagens"),
 ) -> None:
     """Encaminha mensagens entre entidades."""
+    _setup()
+    if _in_daemon("forward", source_id=source_id, dest_id=dest_id, limit=limit):
+        return
     from .commands.forward import run_forward
 
     run_forward(source_id, dest_id, limit)
@@ -100,13 +280,79 @@ def forward(
 @app.command()
 def search(
     query: str = typer.Argument(..., help="Termo de busca"),
-    entity_id: int = typer.Option(None, "--id", help="ID da entidade (opcional)"),
+    entity_ids: list[int] = typer.Option(
+        None, "--id", help="ID do chat (repita para vários; sem --id/--type: busca global)"
+    ),
+    entity_type: str = typer.Option(
+        None, "--type", "-t", help="Buscar nos diálogos do tipo: users, groups, channels, all"
+    ),
     limit: int = typer.Option(20, "--limit", "-l", help="Limite de resultados"),
+    parallel: int = typer.Option(
+        None, "--parallel", "-p", help="Chats consultados simultaneamente (padrão: 4)"
+    ),
+    local: bool = typer.Option(
+        False, "--local", help="Busca offline no índice dos backups (ver 'index')"
+    ),
+    since: datetime = typer.Option(
+        None, "--since", formats=["%Y-%m-%d"], help="Data inicial (apenas --local)"
+    ),
+    until: datetime = typer.Option(
+        None, "--until", formats=["%Y-%m-%d"], help="Data final, exclusiva (apenas --local)"
+    ),
+    sender_id: int = typer.Option(None, "--from", help="ID do remetente (apenas --local)"),
 ) -> None:
     """Busca mensagens por texto."""
+    _setup()
+    # A busca --local lê o índice em disco: não precisa da conexão do daemon
+    if not local and _in_daemon(
+        "search",
+        query=query,
+        entity_ids=entity_ids or [],
+        limit=limit,
+        entity_type=entity_type,
+        parallel=parallel,
+    ):
+        return
     from .commands.search import run_search
 
-    run_search(query, entity_id, limit)
+    run_search(
+        query, entity_ids or [], limit, local, since, until, sender_id, entity_type, parallel
+    )
+
+
+@app.command()
+def index(
+    path: str = typer.Argument(None, help="Diretório de backups (padrão: ./backups)"),
+) -> None:
+    """Indexa backups locais para busca offline."""
+    _setup()
+    from .commands.index import run_index
+
+    run_index(path)
+
+
+@app.command()
+def stats() -> None:
+    """Exibe métricas da última execução (latência, erros, FloodWait)."""
+    _setup()
+    # Com o daemon rodando, mostra as métricas dele (ao vivo)
+    if _in_daemon("stats"):
+        return
+    from .commands.stats import run_stats
+
+    run_stats()
+
+
+@app.command()
+def daemon(
+    stop: bool = typer.Option(False, "--stop", help="Encerra o daemon em execução"),
+    status: bool = typer.Option(False, "--status", help="Indica se há um daemon rodando"),
+) -> None:
+    """Mantém a conexão aberta e atende os comandos do CLI por um socket local."""
+    _setup()
+    from .commands.daemon import run_daemon
+
+    run_daemon(stop, status)
 
 
 @app.command()
@@ -115,6 +361,10 @@ def leave(
     confirm: bool = typer.Option(False, "--yes", "-y", help="Confirmar sem prompt"),
 ) -> None:
     """Sai de um grupo."""
+    _setup()
+    # Sem --yes a confirmação é interativa: roda localmente
+    if confirm and _in_daemon("leave", entity_id=entity_id, confirm=True):
+        return
     from .commands.leave import run_leave
 
     run_leave(entity_id, confirm)
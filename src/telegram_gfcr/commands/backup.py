@@ -1,99 +1,1167 @@
 """Comando de backup de conversas."""
 
+import asyncio
+import contextlib
+import json
+import shutil
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable
+from dataclasses import dataclass, field
+from datetime import datetime
 from pathlib import Path
+from typing import Any
 
 from loguru import logger
-from rich.console import Console
-from rich.progress import Progress, SpinnerColumn, TextColumn
+from rich.progress import Progress, SpinnerColumn, TaskID, TextColumn
+from rich.table import Table
 
-from ..core.client import get_client, run_async
-from ..core.errors import RateLimitError, TelegramError, handle_telethon_errors, retry_on_flood
+from ..config import get_settings
+from ..core.client import TelegramClientWrapper, get_client, run_async
+from ..core.errors import RateLimitError, TelegramError
+from ..core.media import MediaDownloadPool, MediaFilter, MediaStore
+from ..core.metrics import get_metrics
+from ..core.serialization import check_format, serialize
+from ..core.state import BackupCheckpoint, StateStore
+from ..core.storage import Record, SegmentWriter, check_compression, list_segments
+from ..core.terminal import console, current_console, workdir
+from ..core.transfer import ParallelTransfer
 
-console = Console()
+# Mensagens por bloco gravado (e por avanço do checkpoint)
+BATCH_SIZE = 100
 
+# Ids apagados durante o `--follow` (um JSON por evento: {"ids": [...], "date": ...})
+DELETIONS_FILE = "deletions.jsonl"
 
-@retry_on_flood(max_retries=3)
-@handle_telethon_errors("download_media")
-async def _download_media_with_retry(message, media_dir: Path) -> None:
-    """Download de mídia com retry automático em FloodWait."""
-    await message.download_media(file=str(media_dir))
+# Segmentos de cada faixa do `--ranges` até a junção (ignorado pelo `index`)
+RANGES_DIR = ".ranges"
 
+# Marca um diretório com recorte gravado (--since/--until/--min-id/--max-id)
+FILTERED_FILE = ".filtered"
 
-def run_backup(entity_id: int, output: str | None, media: bool) -> None:
-    """Faz backup de uma conversa ou grupo."""
-    output_path = Path(output) if output else Path.cwd() / "backups" / str(entity_id)
+
+@dataclass(frozen=True, slots=True)
+class MessageFilter:
+    """
+    Recorte do histórico pedido ao servidor (`--since/--until/--min-id/--max-id`).
+
+    Datas com fuso (a de `until` é exclusiva); ids inclusivos.
+    """
+
+    since: datetime | None = None
+    until: datetime | None = None
+    min_id: int | None = None
+    max_id: int | None = None
+
+    @property
+    def active(self) -> bool:
+        """Há algum limite: a execução é uma exportação, sem checkpoint."""
+        limits = (self.since, self.until, self.min_id, self.max_id)
+        return any(value is not None for value in limits)
+
+
+@dataclass(slots=True)
+class BackupOptions:
+    """Opções comuns a todas as entidades de uma execução."""
+
+    media: bool
+    workers: int
+    compression: str
+    fmt: str
+    split: int
+    ranges: int = 1
+    messages: MessageFilter = field(default_factory=MessageFilter)
+    media_filter: MediaFilter = field(default_factory=MediaFilter)
+
+
+@dataclass(slots=True)
+class BackupResult:
+    """Resultado do backup de uma entidade (linha do resumo)."""
+
+    entity_id: int
+    output: Path
+    messages: int = 0
+    error: str | None = None
+
+
+@dataclass(slots=True)
+class _Batch:
+    """Bloco a caminho do disco: serialização em andamento e o que ele confirma."""
+
+    records: asyncio.Future[list[Record]]
+    ids: list[int]
+    media_queued: list[int]
+    media_ok: list[int]
+    media_failed: list[int]
+    complete: bool
+
+
+def _serialize_batch(messages: list[Any], fmt: str) -> list[Record]:
+    """Serializa um batch (roda numa thread, fora do event loop)."""
+    return [
+        (message.id, int(message.date.timestamp()), serialize(message, fmt)) for message in messages
+    ]
+
+
+class _EntityOutput:
+    """
+    Pipeline de gravação de uma entidade: busca → serialização → escrita.
+
+    Compartilhado pelo backup (passadas de histórico) e pelo `--follow`
+    (eventos). O loop de busca só acumula mensagens (`add`); `submit` manda
+    o batch serializar numa thread e o coloca numa fila limitada, consumida
+    por uma única tarefa de escrita que grava os blocos na ordem, avança o
+    checkpoint e registra o estado das mídias no state DB. Assim a próxima
+    página do histórico é pedida enquanto a anterior ainda é serializada e
+    gravada; com a fila cheia, a busca espera (backpressure).
+
+    Usage:
+        async with _EntityOutput(client, state, writer, checkpoint, fmt, depth) as out:
+            out.add(message)
+            await out.submit()
+    """
+
+    def __init__(
+        self,
+        client: TelegramClientWrapper,
+        state: StateStore,
+        writer: SegmentWriter,
+        checkpoint: BackupCheckpoint,
+        fmt: str,
+        depth: int,
+        checkpointed: bool = True,
+    ) -> None:
+        self.client = client
+        self.state = state
+        self.writer = writer
+        self.checkpoint = checkpoint
+        self.fmt = fmt
+        # False nas exportações filtradas: o recorte não é uma faixa contígua
+        self.checkpointed = checkpointed
+        self.batch: list[Any] = []
+        self.batch_ids: list[int] = []
+        self.media_queued: list[int] = []
+        self.media_ok: list[int] = []
+        self.media_failed: list[int] = []
+        self._complete = False
+        self._queue: asyncio.Queue[_Batch] = asyncio.Queue(maxsize=max(1, depth))
+        self._task: asyncio.Task[None] | None = None
+        self._error: BaseException | None = None
+
+    async def __aenter__(self) -> "_EntityOutput":
+        self.writer.open()
+        self._task = asyncio.create_task(self._write_loop())
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        # Grava o restante (também em caso de erro, para retomar dali)
+        try:
+            await self.flush()
+        finally:
+            if self._task:
+                self._task.cancel()
+                await asyncio.gather(self._task, return_exceptions=True)
+            self.writer.close()
+
+    def add(self, message: Any, advance: bool = True) -> None:
+        """
+        Acrescenta a mensagem ao batch (em memória).
+
+        `advance=False` para versões editadas: a mensagem é regravada, mas o
+        checkpoint não muda (uma edição antiga não prova que o intervalo até
+        ela esteja em disco).
+        """
+        self.client.peers.remember(message.sender)
+        self.batch.append(message)
+        if advance:
+            self.batch_ids.append(message.id)
+
+    def mark_complete(self) -> None:
+        """O histórico chegou ao início: vale quando o último batch for gravado."""
+        self._complete = True
+
+    @property
+    def dirty(self) -> bool:
+        """Há mensagens ou resultados de mídia esperando o flush."""
+        return bool(
+            self.batch
+            or self.media_queued
+            or self.media_ok
+            or self.media_failed
+            or (self._complete and not self.checkpoint.complete)
+        )
+
+    def on_media_result(self, message_id: int, ok: bool) -> None:
+        """Callback dos workers: registra resultado para o próximo batch."""
+        (self.media_ok if ok else self.media_failed).append(message_id)
+
+    async def submit(self) -> None:
+        """Inicia a serialização do batch e o enfileira para escrita."""
+        self._raise_error()
+        if not self.dirty:
+            return
+        records = asyncio.ensure_future(asyncio.to_thread(_serialize_batch, self.batch, self.fmt))
+        await self._queue.put(
+            _Batch(
+                records,
+                self.batch_ids,
+                self.media_queued,
+                self.media_ok,
+                self.media_failed,
+                self._complete,
+            )
+        )
+        get_metrics().queue("backup_write", self._queue.qsize())
+        self.batch, self.batch_ids = [], []
+        self.media_queued, self.media_ok, self.media_failed = [], [], []
+
+    async def flush(self) -> None:
+        """Enfileira o batch atual e espera tudo estar em disco."""
+        await self.submit()
+        await self._queue.join()
+        self._raise_error()
+
+    def _raise_error(self) -> None:
+        if self._error is not None:
+            raise self._error
+
+    async def _write_loop(self) -> None:
+        """Única tarefa de escrita: blocos em ordem e checkpoint só após gravar."""
+        checkpoint = self.checkpoint
+        entity_id, output = checkpoint.entity_id, checkpoint.output
+        while True:
+            batch = await self._queue.get()
+            try:
+                if self._error is None:
+                    records = await batch.records
+                    if records and not self.checkpointed:
+                        # Recorte: o diretório só é marcado quando recebe mensagens
+                        (self.writer.directory / FILTERED_FILE).touch()
+                    await asyncio.to_thread(self.writer.write_batch, records)
+                    if self.checkpointed:
+                        checkpoint.extend(batch.ids)
+                        checkpoint.complete = checkpoint.complete or batch.complete
+                        await self.state.save_checkpoint(checkpoint)
+                    # Enfileiradas ficam pendentes até um worker concluir: se o
+                    # processo cair antes, a próxima execução tenta de novo
+                    await self.state.mark_media(entity_id, output, batch.media_queued, done=False)
+                    await self.state.mark_media(entity_id, output, batch.media_ok, done=True)
+                    await self.state.mark_media(entity_id, output, batch.media_failed, done=False)
+                    await self.client.peers.flush()
+            except Exception as e:
+                # A busca descobre no próximo submit; os batches seguintes são
+                # descartados (sem avançar o checkpoint) para ela nunca travar
+                logger.opt(exception=e).error("{}: falha ao gravar batch", entity_id)
+                self._error = e
+            finally:
+                self._queue.task_done()
+
+
+def _segment_writer(output_path: Path, options: BackupOptions) -> SegmentWriter:
+    settings = get_settings()
+    return SegmentWriter(
+        output_path,
+        max_bytes=settings.backup_segment_mb * 1024 * 1024,
+        max_records=settings.backup_segment_records,
+        compression=options.compression,
+    )
+
+
+async def _history_passes(
+    client: TelegramClientWrapper, peer: Any, checkpoint: BackupCheckpoint, history: bool = True
+) -> AsyncIterator[tuple[str, AsyncIterator[Any]]]:
+    """
+    Gera as passadas de histórico que ainda faltam segundo o checkpoint.
+
+    1. Mensagens novas (> max_id), em ordem crescente para o checkpoint
+       avançar a cada batch gravado. Também roda com `max_id == 0` se o
+       checkpoint estiver completo (chat vazio no primeiro backup).
+    2. Histórico antigo (< min_id), do mais novo para o mais antigo, enquanto
+       o backup inicial não tiver chegado ao início da conversa (fica de
+       fora com `history=False`, quando o `--ranges` busca essa parte).
+    """
+    # Faixa lida antes de começar: a escrita avança o checkpoint em paralelo
+    paced = client.rate_limiter.paced
+    max_id, min_id, complete = checkpoint.max_id, checkpoint.min_id, checkpoint.complete
+    if max_id or complete:
+        yield (
+            "novas",
+            paced(client.client.iter_messages(peer, min_id=max_id, reverse=True), "history"),
+        )
+
+    if history and not complete:
+        yield "histórico", paced(client.client.iter_messages(peer, offset_id=min_id), "history")
+
+
+async def _filtered_pass(
+    client: TelegramClientWrapper, peer: Any, filters: MessageFilter
+) -> AsyncIterator[Any]:
+    """
+    Só as páginas do recorte, do mais novo para o mais antigo.
+
+    `until` vira `offset_date` e os ids viram `min_id`/`max_id` (exclusivos
+    no Telegram), então o servidor já começa no ponto certo; a busca para na
+    primeira mensagem anterior a `since`.
+    """
+    messages = client.client.iter_messages(
+        peer,
+        offset_date=filters.until,
+        min_id=filters.min_id - 1 if filters.min_id else 0,
+        max_id=filters.max_id + 1 if filters.max_id else 0,
+    )
+    async for message in client.rate_limiter.paced(messages, "history"):
+        if filters.since and message.date < filters.since:
+            break
+        yield message
+
+
+async def _backup_entity(
+    client: TelegramClientWrapper,
+    state: StateStore,
+    store: MediaStore | None,
+    transfer: ParallelTransfer | None,
+    entity_id: int,
+    output_path: Path,
+    options: BackupOptions,
+    progress: Progress,
+    task: TaskID,
+) -> int:
+    """
+    Backup incremental de uma entidade, atualizando sua linha no `progress`.
+
+    Returns:
+        Quantidade de mensagens novas gravadas
+    """
     output_path.mkdir(parents=True, exist_ok=True)
+    output_key = str(output_path.resolve())
+
+    checkpoint = await state.get_checkpoint(entity_id, output_key)
+    filtered = options.messages.active
+    # Recorte misturado ao incremental repetiria mensagens, em qualquer ordem
+    if filtered and checkpoint.max_id:
+        raise ValueError(
+            f"{output_path} já tem um backup incremental: use outro --output para o recorte"
+        )
+    if not filtered and (output_path / FILTERED_FILE).exists():
+        raise ValueError(
+            f"{output_path} tem um recorte filtrado: use outro --output para o backup incremental"
+        )
+    in_ranges = options.ranges > 1 and not checkpoint.complete
+    staging = output_path / RANGES_DIR
+    if not filtered:
+        if in_ranges:
+            _check_ranges_plan(staging, options.compression)
+        elif staging.exists():
+            # Faixas de uma execução anterior: a passada sequencial busca o mesmo histórico
+            logger.warning("{}: descartando faixas incompletas de {}", entity_id, staging)
+            await _discard_ranges(state, entity_id, staging)
+
+    peer = await client.resolve(entity_id)
+    out = _EntityOutput(
+        client,
+        state,
+        _segment_writer(output_path, options),
+        checkpoint,
+        options.fmt,
+        get_settings().backup_pipeline_depth,
+        checkpointed=not filtered,
+    )
+    count = 0
+
+    # Uma linha extra no progress por arquivo grande em andamento
+    large_files: dict[int, TaskID] = {}
+
+    def _on_media_bytes(message_id: int, received: int, total: int) -> None:
+        if message_id not in large_files:
+            large_files[message_id] = progress.add_task("", total=total)
+        row = large_files[message_id]
+        progress.update(
+            row,
+            completed=received,
+            description=f"  ↳ msg {message_id}: {received / 2**20:.0f}/{total / 2**20:.0f} MB",
+        )
+        if received >= total:
+            progress.remove_task(large_files.pop(message_id))
+
+    # Criar diretório de mídia uma única vez, fora do loop
+    pool: MediaDownloadPool | None = None
+    done_media: set[int] = set()
+    if options.media:
+        media_dir = output_path / "media"
+        media_dir.mkdir(exist_ok=True)
+        done_media = await state.get_media(entity_id, output_key, done=True)
+        pool = MediaDownloadPool(
+            media_dir,
+            workers=options.workers,
+            on_result=out.on_media_result,
+            store=store,
+            transfer=transfer,
+            on_progress=_on_media_bytes,
+        )
+
+    async def _enqueue_media(message: Any) -> None:
+        """Entrega mídia aos workers (bloqueia se a fila estiver cheia)."""
+        assert pool is not None
+        out.media_queued.append(message.id)
+        await pool.put(message)
+
+    if checkpoint.max_id:
+        logger.info(
+            "{}: retomando a partir do checkpoint (ids {}–{})",
+            entity_id,
+            checkpoint.min_id,
+            checkpoint.max_id,
+        )
+
+    def _show(label: str) -> None:
+        description = f"{entity_id}: {label}... ({count} mensagens"
+        if pool:
+            description += f", {pool.pending} mídias na fila"
+        progress.update(task, description=description + ")")
+
+    async def _consume(label: str, messages: AsyncIterator[Any], target: _EntityOutput) -> None:
+        """Passa as mensagens de uma passada (ou faixa) para o pipeline `target`."""
+        nonlocal count
+        async for message in messages:
+            if (
+                pool
+                and message.media
+                and message.id not in done_media
+                and options.media_filter.accepts(message)
+            ):
+                await _enqueue_media(message)
+
+            target.add(message)
+            count += 1
+
+            # Batch cheio segue para serialização e escrita em segundo plano
+            if len(target.batch) >= BATCH_SIZE:
+                await target.submit()
+                if target is not out:
+                    # Estado das mídias fica sempre no checkpoint principal
+                    await out.submit()
+                logger.debug("{}: batch de {} mensagens enviado", entity_id, BATCH_SIZE)
+                _show(label)
+
+        _show(label)
+
+    try:
+        # `out` sai por último: a gravação final inclui os resultados das mídias
+        async with out, contextlib.AsyncExitStack() as stack:
+            if pool:
+                await stack.enter_async_context(pool)
+
+                # Mídias que falharam em execuções anteriores
+                pending = sorted(await state.get_media(entity_id, output_key, done=False))
+                if pending:
+                    progress.update(
+                        task, description=f"{entity_id}: retomando {len(pending)} mídias..."
+                    )
+                    await client.rate_limiter.acquire("history")
+                    messages = await client.client.get_messages(peer, ids=pending)
+                    for message_id, message in zip(pending, messages, strict=True):
+                        if message is None or not message.media:
+                            # Mensagem apagada: nada mais a baixar
+                            out.media_ok.append(message_id)
+                        elif options.media_filter.accepts(message):
+                            await _enqueue_media(message)
+                        # Recusada pelo filtro: fica pendente para um backup sem filtro
+
+            if filtered:
+                await _consume("recorte", _filtered_pass(client, peer, options.messages), out)
+            else:
+                async for label, messages in _history_passes(
+                    client, peer, checkpoint, history=not in_ranges
+                ):
+                    await _consume(label, messages, out)
+                    if label == "histórico":
+                        out.mark_complete()
+
+                if in_ranges:
+                    await _fetch_ranges(client, state, peer, out, options, _consume)
+
+            if pool:
+                progress.update(
+                    task, description=f"{entity_id}: aguardando {pool.pending} mídias..."
+                )
+    finally:
+        for row in large_files.values():
+            progress.remove_task(row)
+
+    return count
+
+
+def _split_ids(top_id: int, ranges: int) -> list[int]:
+    """Limites de faixas disjuntas cobrindo 1..top_id (faixa k: ids em (b[k], b[k+1]])."""
+    ranges = max(1, min(ranges, top_id))
+    return [top_id * k // ranges for k in range(ranges + 1)]
+
+
+def _check_ranges_plan(staging: Path, compression: str) -> None:
+    """
+    Recusa retomar faixas com outra compressão, antes de buscar qualquer coisa.
+
+    A junção copia os blocos das faixas sem descomprimir: com `--compress`
+    diferente, ela só falharia depois de todas as faixas baixadas.
+    """
+    plan = staging / "plan.json"
+    if not plan.exists():
+        return
+    started = json.loads(plan.read_text(encoding="utf-8")).get("compression", compression)
+    if started != compression:
+        raise ValueError(
+            f"{staging.parent} tem faixas em andamento com --compress {started}: "
+            "retome com a mesma compressão"
+        )
+
+
+async def _discard_ranges(state: StateStore, entity_id: int, staging: Path) -> None:
+    """Remove a área das faixas e o checkpoint de cada uma."""
+    for directory in staging.iterdir():
+        if directory.is_dir():
+            await state.delete_checkpoint(entity_id, str(directory.resolve()))
+    await asyncio.to_thread(shutil.rmtree, staging)
+
+
+async def _range_bounds(
+    client: TelegramClientWrapper,
+    peer: Any,
+    checkpoint: BackupCheckpoint,
+    ranges: int,
+    compression: str,
+    staging: Path,
+) -> list[int]:
+    """Limites das faixas, gravados no início para a retomada usar os mesmos."""
+    plan = staging / "plan.json"
+    if plan.exists():
+        bounds: list[int] = json.loads(plan.read_text(encoding="utf-8"))["bounds"]
+        return bounds
+
+    if checkpoint.min_id:
+        # Histórico que falta: tudo abaixo do mais antigo já gravado
+        top_id = checkpoint.min_id - 1
+    else:
+        await client.rate_limiter.acquire("history")
+        latest = await client.client.get_messages(peer, limit=1)
+        top_id = latest[0].id if latest else 0
+
+    bounds = _split_ids(top_id, ranges)
+    staging.mkdir(parents=True, exist_ok=True)
+    plan.write_text(json.dumps({"bounds": bounds, "compression": compression}), encoding="utf-8")
+    return bounds
+
+
+def _merge_ranges(staging: Path, count: int, writer: SegmentWriter) -> list[int]:
+    """
+    Copia os segmentos das faixas para o backup, da mais nova para a mais antiga.
 
-    async def _backup() -> int:
-        async with get_client() as client:
-            messages_file = output_path / "messages.jsonl"
-            count = 0
-            batch: list[str] = []
-            batch_size = 100
-
-            def _flush_batch() -> None:
-                """Escreve batch de mensagens no arquivo."""
-                nonlocal batch
-                if batch:
-                    with messages_file.open("a", encoding="utf-8") as f:
-                        f.write("\n".join(batch) + "\n")
-                    batch = []
-
-            # Criar diretório de mídia uma única vez, fora do loop
-            media_dir: Path | None = None
-            if media:
-                media_dir = output_path / "media"
-                media_dir.mkdir(exist_ok=True)
+    O resultado fica na mesma ordem de uma passada sequencial pelo histórico
+    (ids decrescentes). Returns: menor e maior id copiados (vazio se nenhum).
+    """
+    ids: list[int] = []
+    for k in reversed(range(count)):
+        for segment in list_segments(staging / f"{k:03d}"):
+            for block in segment.blocks():
+                ids += [block.min_id, block.max_id]
+            writer.copy_segment(segment)
+    return [min(ids), max(ids)] if ids else []
 
+
+async def _fetch_ranges(
+    client: TelegramClientWrapper,
+    state: StateStore,
+    peer: Any,
+    out: _EntityOutput,
+    options: BackupOptions,
+    consume: Callable[[str, AsyncIterator[Any], _EntityOutput], Awaitable[None]],
+) -> None:
+    """
+    Histórico antigo em `options.ranges` faixas de ids buscadas em paralelo.
+
+    Cada faixa tem seu próprio pipeline, segmentos (em `RANGES_DIR`) e
+    checkpoint no state DB, então uma execução interrompida retoma cada
+    faixa de onde parou. Todas usam o mesmo cliente e a classe "history" do
+    rate limiter. Com todas completas, os segmentos são copiados em ordem
+    para o backup principal, que passa a cobrir o histórico inteiro.
+    """
+    checkpoint = out.checkpoint
+    entity_id = checkpoint.entity_id
+    staging = Path(checkpoint.output) / RANGES_DIR
+    bounds = await _range_bounds(
+        client, peer, checkpoint, options.ranges, options.compression, staging
+    )
+    count = len(bounds) - 1
+    depth = get_settings().backup_pipeline_depth
+    logger.info("{}: histórico em {} faixas até o id {}", entity_id, count, bounds[-1])
+
+    async def _fetch(k: int) -> None:
+        directory = staging / f"{k:03d}"
+        directory.mkdir(parents=True, exist_ok=True)
+        part = await state.get_checkpoint(entity_id, str(directory.resolve()))
+        if part.complete:
+            return
+        # Do topo da faixa (ou do ponto onde parou) até o limite inferior
+        messages = client.client.iter_messages(
+            peer, offset_id=part.min_id or bounds[k + 1] + 1, min_id=bounds[k]
+        )
+        writer = _segment_writer(directory, options)
+        async with _EntityOutput(client, state, writer, part, options.fmt, depth) as target:
+            await consume(f"{count} faixas", client.rate_limiter.paced(messages, "history"), target)
+            target.mark_complete()
+
+    tasks = [asyncio.create_task(_fetch(k)) for k in range(count)]
+    try:
+        await asyncio.gather(*tasks)
+    except BaseException:
+        # Uma faixa falhou: as demais param (o que gravaram fica para a retomada)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+
+    # Junção: nada mais pode estar a caminho do segmento principal
+    await out.flush()
+    if merged := await asyncio.to_thread(_merge_ranges, staging, count, out.writer):
+        checkpoint.extend(merged)
+    checkpoint.complete = True
+    await state.save_checkpoint(checkpoint)
+
+    await _discard_ranges(state, entity_id, staging)
+
+
+async def _resolve_targets(
+    entity_ids: list[int], from_file: str | None, entity_type: str | None
+) -> list[int]:
+    """Junta ids da linha de comando, do arquivo e do filtro de tipo (sem repetir)."""
+    targets = list(entity_ids)
+    if from_file:
+        for line in (workdir() / from_file).read_text(encoding="utf-8").splitlines():
+            value = line.split("#", 1)[0].strip()
+            if value:
+                targets.append(int(value))
+    if entity_type:
+        from ..core.dialogs import get_dialogs
+
+        dialogs, _ = await get_dialogs(entity_type)
+        targets.extend(dialog.id for dialog in dialogs)
+    return list(dict.fromkeys(targets))
+
+
+def _print_summary(results: list[BackupResult]) -> None:
+    """Tabela final com o resultado de cada entidade."""
+    table = Table(title="Resumo do backup")
+    table.add_column("ID", style="cyan")
+    table.add_column("Status")
+    table.add_column("Mensagens", justify="right")
+    table.add_column("Saída / erro", style="dim")
+
+    for result in results:
+        if result.error:
+            table.add_row(str(result.entity_id), "[red]falhou[/]", "-", result.error)
+        else:
+            table.add_row(
+                str(result.entity_id), "[green]ok[/]", str(result.messages), str(result.output)
+            )
+    console.print(table)
+
+
+async def _run_all(
+    results: list[BackupResult], options: BackupOptions, parallel: int
+) -> MediaStore | None:
+    """
+    Executa os backups com no máximo `parallel` entidades simultâneas.
+
+    Workers retiram entidades de uma fila na ordem pedida; o rate limiter
+    (FIFO por classe) reparte as chamadas entre elas página a página.
+    Falhas ficam no `BackupResult` da entidade e não interrompem as demais.
+    """
+    queue: asyncio.Queue[BackupResult] = asyncio.Queue()
+    for result in results:
+        queue.put_nowait(result)
+
+    async with get_client() as client, StateStore() as state:
+        settings = get_settings()
+        store = MediaStore(state) if options.media and settings.media_dedup else None
+        transfer = None
+        if options.media and options.split > 1:
+            transfer = ParallelTransfer(
+                client.client,
+                connections=options.split,
+                threshold=settings.media_split_mb * 1024 * 1024,
+                limiter=client.rate_limiter,
+            )
+
+        with Progress(
+            SpinnerColumn(),
+            TextColumn("[progress.description]{task.description}"),
+            console=current_console(),
+        ) as progress:
+
+            async def _worker() -> None:
+                while not queue.empty():
+                    result = queue.get_nowait()
+                    task = progress.add_task(f"{result.entity_id}: iniciando...", total=None)
+                    # Tarefas criadas no backup (workers de mídia) herdam o contexto
+                    with logger.contextualize(entity_id=result.entity_id):
+                        try:
+                            result.messages = await _backup_entity(
+                                client,
+                                state,
+                                store,
+                                transfer,
+                                result.entity_id,
+                                result.output,
+                                options,
+                                progress,
+                                task,
+                            )
+                            status = f"[green]✓[/] {result.entity_id}: {result.messages} mensagens"
+                        except RateLimitError as e:
+                            result.error = f"Rate limit: aguarde {e.wait_seconds}s"
+                            status = f"[yellow]⚠️[/] {result.entity_id}: {result.error}"
+                        except Exception as e:
+                            logger.opt(exception=e).warning("Backup de {} falhou", result.entity_id)
+                            result.error = str(e)
+                            status = f"[red]✗[/] {result.entity_id}: {result.error}"
+                    progress.update(task, description=status)
+                    progress.stop_task(task)
+
+            try:
+                await asyncio.gather(*(_worker() for _ in range(parallel)))
+            finally:
+                if transfer:
+                    await transfer.close()
+
+    return store
+
+
+# ========== FOLLOW ==========
+
+
+@dataclass(slots=True)
+class _FollowTarget:
+    """Entidade acompanhada: fila de eventos e contadores da sua linha no progress."""
+
+    result: BackupResult
+    peer: Any
+    queue: asyncio.Queue[tuple[str, Any]] = field(default_factory=asyncio.Queue)
+    new: int = 0
+    edited: int = 0
+    deleted: int = 0
+
+
+def _record_deletions(output_path: Path, message_ids: list[int]) -> None:
+    """Acrescenta ids apagados ao `deletions.jsonl` do backup (as mensagens ficam)."""
+    entry = {"ids": message_ids, "date": int(time.time())}
+    with (output_path / DELETIONS_FILE).open("a", encoding="utf-8") as f:
+        f.write(json.dumps(entry) + "\n")
+
+
+async def _follow_entity(
+    client: TelegramClientWrapper,
+    state: StateStore,
+    store: MediaStore | None,
+    transfer: ParallelTransfer | None,
+    target: _FollowTarget,
+    options: BackupOptions,
+    progress: Progress,
+    task: TaskID,
+) -> None:
+    """
+    Consome os eventos de uma entidade até ser cancelado.
+
+    Mensagens novas avançam o checkpoint; edições são regravadas (a versão
+    mais recente é a última no backup); exclusões vão para `deletions.jsonl`.
+    Um evento "gap" (início do follow, `UpdatesTooLong` e a cada
+    `follow_gap_seconds`) busca no histórico tudo acima do último id gravado.
+    O batch segue para a escrita a cada `BATCH_SIZE` mensagens ou
+    `follow_flush_seconds`, o que vier primeiro.
+    """
+    result = target.result
+    interval = get_settings().follow_flush_seconds
+    checkpoint = await state.get_checkpoint(result.entity_id, str(result.output.resolve()))
+    out = _EntityOutput(
+        client,
+        state,
+        _segment_writer(result.output, options),
+        checkpoint,
+        options.fmt,
+        get_settings().backup_pipeline_depth,
+    )
+    last_id = checkpoint.max_id
+
+    pool: MediaDownloadPool | None = None
+    if options.media:
+        pool = MediaDownloadPool(
+            result.output / "media",
+            workers=options.workers,
+            on_result=out.on_media_result,
+            store=store,
+            transfer=transfer,
+        )
+
+    async def _new(message: Any) -> None:
+        nonlocal last_id
+        if message.id <= last_id:
+            # Já gravada: evento repetido pelo preenchimento de lacuna
+            return
+        last_id = message.id
+        out.add(message)
+        target.new += 1
+        if pool and message.media and options.media_filter.accepts(message):
+            out.media_queued.append(message.id)
+            await pool.put(message)
+
+    async with out, contextlib.AsyncExitStack() as stack:
+        if pool:
+            await stack.enter_async_context(pool)
+
+        deadline = time.monotonic() + interval
+        while True:
+            try:
+                timeout = max(0.0, deadline - time.monotonic())
+                kind, payload = await asyncio.wait_for(target.queue.get(), timeout)
+            except TimeoutError:
+                kind, payload = "tick", None
+
+            match kind:
+                case "gap":
+                    messages = client.client.iter_messages(
+                        target.peer, min_id=last_id, reverse=True
+                    )
+                    async for message in client.rate_limiter.paced(messages, "history"):
+                        await _new(message)
+                        if len(out.batch) >= BATCH_SIZE:
+                            await out.submit()
+                case "new":
+                    await _new(payload)
+                case "edited":
+                    out.add(payload, advance=False)
+                    target.edited += 1
+                case "deleted":
+                    _record_deletions(result.output, payload)
+                    target.deleted += len(payload)
+
+            if len(out.batch) >= BATCH_SIZE or time.monotonic() >= deadline:
+                await out.submit()
+                deadline = time.monotonic() + interval
+
+            progress.update(
+                task,
+                description=(
+                    f"{result.entity_id}: acompanhando... ({target.new} novas, "
+                    f"{target.edited} editadas, {target.deleted} apagadas)"
+                ),
+            )
+
+
+async def _gap_ticker(targets: list[_FollowTarget], interval: float) -> None:
+    """
+    Pede um preenchimento de lacuna a cada `interval` segundos, até ser cancelado.
+
+    O Telethon não busca as atualizações perdidas numa reconexão; a busca
+    periódica acima do último id gravado cobre esse caso sem depender dos
+    internos do cliente (é barata: uma página vazia por chat em dia).
+    """
+    while True:
+        await asyncio.sleep(interval)
+        for target in targets:
+            target.queue.put_nowait(("gap", None))
+
+
+async def _follow_all(results: list[BackupResult], options: BackupOptions) -> None:
+    """
+    Acompanha as entidades em tempo real até Ctrl+C, sem reler o histórico.
+
+    Os handlers de eventos são registrados no cliente do pool antes do
+    primeiro preenchimento de lacuna, então nada entre o fim do backup e a
+    inscrição se perde (repetições são descartadas pelo id).
+    """
+    from telethon import events, utils
+    from telethon.tl.types import UpdatesTooLong
+
+    async with get_client() as client, StateStore() as state:
+        settings = get_settings()
+        store = MediaStore(state) if options.media and settings.media_dedup else None
+        transfer = None
+        if options.media and options.split > 1:
+            transfer = ParallelTransfer(
+                client.client,
+                connections=options.split,
+                threshold=settings.media_split_mb * 1024 * 1024,
+                limiter=client.rate_limiter,
+            )
+
+        targets: dict[int, _FollowTarget] = {}
+        for result in results:
+            peer = await client.resolve(result.entity_id)
+            targets[utils.get_peer_id(peer)] = _FollowTarget(result, peer)
+        chats = [target.peer for target in targets.values()]
+
+        def _dispatch(kind: str, chat_id: int | None, payload: Any) -> None:
+            if chat_id in targets:
+                targets[chat_id].queue.put_nowait((kind, payload))
+
+        async def _on_new(event: Any) -> None:
+            _dispatch("new", event.chat_id, event.message)
+
+        async def _on_edited(event: Any) -> None:
+            _dispatch("edited", event.chat_id, event.message)
+
+        async def _on_deleted(event: Any) -> None:
+            # O Telegram só informa o chat em canais e supergrupos
+            _dispatch("deleted", event.chat_id, event.deleted_ids)
+
+        async def _on_too_long(update: Any) -> None:
+            # O servidor descartou atualizações: todos os chats buscam a lacuna
+            logger.info("UpdatesTooLong: preenchendo lacunas do follow")
+            for target in targets.values():
+                target.queue.put_nowait(("gap", None))
+
+        handlers = [
+            (_on_new, events.NewMessage(chats=chats)),
+            (_on_edited, events.MessageEdited(chats=chats)),
+            (_on_deleted, events.MessageDeleted(chats=chats)),
+            (_on_too_long, events.Raw(UpdatesTooLong)),
+        ]
+        for callback, event in handlers:
+            client.client.add_event_handler(callback, event)
+
+        for target in targets.values():
+            target.queue.put_nowait(("gap", None))
+
+        console.print("[blue]👀 Acompanhando em tempo real (Ctrl+C encerra)...[/]")
+        try:
             with Progress(
                 SpinnerColumn(),
                 TextColumn("[progress.description]{task.description}"),
-                console=console,
+                console=current_console(),
             ) as progress:
-                task = progress.add_task(
-                    f"Baixando mensagens de {entity_id}...", total=None
+                await asyncio.gather(
+                    _gap_ticker(list(targets.values()), settings.follow_gap_seconds),
+                    *(
+                        _follow_entity(
+                            client,
+                            state,
+                            store,
+                            transfer,
+                            target,
+                            options,
+                            progress,
+                            progress.add_task(f"{target.result.entity_id}: acompanhando..."),
+                        )
+                        for target in targets.values()
+                    ),
                 )
+        finally:
+            for callback, event in handlers:
+                client.client.remove_event_handler(callback, event)
+            if transfer:
+                await transfer.close()
 
-                async for message in client.client.iter_messages(entity_id):
-                    # Adicionar ao batch (em memória)
-                    batch.append(message.to_json())
 
-                    # Flush quando batch atinge o limite
-                    if len(batch) >= batch_size:
-                        _flush_batch()
-                        logger.debug(f"Batch de {batch_size} mensagens salvo")
+def _parse_date(value: str | None) -> datetime | None:
+    """Data ISO do CLI, com fuso (local, se não informado)."""
+    if value is None:
+        return None
+    try:
+        return datetime.fromisoformat(value).astimezone()
+    except ValueError:
+        raise ValueError(f"Data inválida: {value} (use AAAA-MM-DD)") from None
 
-                    # Download de mídia se solicitado
-                    if media_dir and message.media:
-                        try:
-                            await _download_media_with_retry(message, media_dir)
-                            logger.debug(f"Mídia baixada: msg {message.id}")
-                        except RateLimitError:
-                            logger.warning(
-                                f"Mídia msg {message.id} pulada após max retries"
-                            )
-                        except Exception as e:
-                            logger.warning(
-                                f"Falha ao baixar mídia msg {message.id}: {e}"
-                            )
 
-                    count += 1
-                    progress.update(task, description=f"Baixando... ({count} mensagens)")
+def make_options(
+    media: bool,
+    workers: int | None = None,
+    compression: str | None = None,
+    fmt: str | None = None,
+    split: int | None = None,
+    ranges: int | None = None,
+    since: str | None = None,
+    until: str | None = None,
+    min_id: int | None = None,
+    max_id: int | None = None,
+    media_types: str | None = None,
+    max_media_mb: float | None = None,
+) -> BackupOptions:
+    """
+    Opções da execução, com os padrões das configurações para o que faltar.
+
+    Datas em ISO (`2024-01-31`, ou com hora), no fuso local se não tiverem
+    um; chegam como texto para também valerem via daemon.
 
-                # Flush do batch restante
-                _flush_batch()
+    Raises:
+        ValueError: compressão, formato, data, faixa de ids ou filtro de mídia inválido
+    """
+    messages = MessageFilter(_parse_date(since), _parse_date(until), min_id, max_id)
+    if messages.since and messages.until and messages.since >= messages.until:
+        raise ValueError("--since deve ser anterior a --until")
+    if min_id and max_id and min_id > max_id:
+        raise ValueError("--min-id deve ser menor ou igual a --max-id")
 
-            return count
+    settings = get_settings()
+    options = BackupOptions(
+        media=media,
+        workers=workers or settings.media_workers,
+        compression=compression or settings.backup_compression,
+        fmt=fmt or settings.backup_format,
+        split=settings.media_split_connections if split is None else split,
+        ranges=ranges or settings.backup_ranges,
+        messages=messages,
+        media_filter=MediaFilter.parse(media_types, max_media_mb),
+    )
+    check_compression(options.compression)
+    check_format(options.fmt)
+    return options
 
-    console.print(f"[blue]💾 Iniciando backup de {entity_id}...[/]")
 
+async def run_backup_async(
+    entity_ids: list[int],
+    output: str | None,
+    media: bool,
+    workers: int | None = None,
+    compression: str | None = None,
+    fmt: str | None = None,
+    parallel: int | None = None,
+    from_file: str | None = None,
+    entity_type: str | None = None,
+    split: int | None = None,
+    follow: bool = False,
+    ranges: int | None = None,
+    since: str | None = None,
+    until: str | None = None,
+    min_id: int | None = None,
+    max_id: int | None = None,
+    media_types: str | None = None,
+    max_media_mb: float | None = None,
+) -> None:
+    """Faz backup de uma ou várias entidades (variante para um loop já em execução)."""
     try:
-        total = run_async(_backup())
-        console.print(
-            f"[green]✓ Backup completo! {total} mensagens salvas em {output_path}[/]"
+        options = make_options(
+            media,
+            workers,
+            compression,
+            fmt,
+            split,
+            ranges,
+            since,
+            until,
+            min_id,
+            max_id,
+            media_types,
+            max_media_mb,
         )
-    except RateLimitError as e:
-        console.print(f"[yellow]⚠️ Rate limit: {e}[/]")
-        console.print(f"[dim]Aguarde {e.wait_seconds}s e tente novamente[/]")
+        if follow and options.messages.active:
+            raise ValueError("--follow não combina com --since/--until/--min-id/--max-id")
+        targets = await _resolve_targets(entity_ids, from_file, entity_type)
+    except (ValueError, RuntimeError, OSError, TelegramError) as e:
+        console.print(f"[red]Erro: {e}[/]")
+        return
+
+    if not targets:
+        console.print("[yellow]Nenhuma entidade para backup[/]")
+        return
+
+    # Uma entidade: `output` é o diretório do backup; várias: a raiz dos backups
+    if len(targets) == 1 and output:
+        outputs = {targets[0]: workdir() / output}
+    else:
+        root = workdir() / (output or "backups")
+        outputs = {entity_id: root / str(entity_id) for entity_id in targets}
+    results = [BackupResult(entity_id, outputs[entity_id]) for entity_id in targets]
+
+    if len(targets) == 1:
+        console.print(f"[blue]💾 Iniciando backup de {targets[0]}...[/]")
+    else:
+        console.print(f"[blue]💾 Iniciando backup de {len(targets)} entidades...[/]")
+
+    await backup_entities(results, options, parallel, follow)
+
+
+async def backup_entities(
+    results: list[BackupResult],
+    options: BackupOptions,
+    parallel: int | None = None,
+    follow: bool = False,
+) -> None:
+    """
+    Executa o backup de entidades já resolvidas e imprime o resultado.
+
+    Cada `BackupResult` traz o diretório de saída da entidade e é preenchido
+    com a contagem de mensagens ou o erro. Usado pelo `backup` e pelo `sync`.
+    """
+    parallel = max(1, min(parallel or get_settings().backup_parallel, len(results)))
+    try:
+        with logger.contextualize(command="backup"):
+            store = await _run_all(results, options, parallel)
     except TelegramError as e:
         console.print(f"[red]Erro no backup: {e}[/]")
+        return
+
+    if store and store.hits:
+        console.print(
+            f"[dim]{store.hits} mídias reaproveitadas do media store "
+            f"({store.downloads} baixadas)[/]"
+        )
+
+    if len(results) > 1:
+        _print_summary(results)
+    elif results[0].error:
+        console.print(f"[red]Erro no backup: {results[0].error}[/]")
+    else:
+        console.print(
+            f"[green]✓ Backup completo! {results[0].messages} mensagens novas "
+            f"salvas em {results[0].output}[/]"
+        )
+
+    # Follow só das entidades cujo backup terminou (o checkpoint está em dia)
+    if follow and (caught_up := [result for result in results if not result.error]):
+        try:
+            with logger.contextualize(command="backup"):
+                await _follow_all(caught_up, options)
+        except TelegramError as e:
+            console.print(f"[red]Erro no follow: {e}[/]")
+
+
+def run_backup(
+    entity_ids: list[int],
+    output: str | None,
+    media: bool,
+    workers: int | None = None,
+    compression: str | None = None,
+    fmt: str | None = None,
+    parallel: int | None = None,
+    from_file: str | None = None,
+    entity_type: str | None = None,
+    split: int | None = None,
+    follow: bool = False,
+    ranges: int | None = None,
+    since: str | None = None,
+    until: str | None = None,
+    min_id: int | None = None,
+    max_id: int | None = None,
+    media_types: str | None = None,
+    max_media_mb: float | None = None,
+) -> None:
+    """Faz backup de uma ou várias entidades."""
+    run_async(
+        run_backup_async(
+            entity_ids,
+            output,
+            media,
+            workers,
+            compression,
+            fmt,
+            parallel,
+            from_file,
+            entity_type,
+            split,
+            follow,
+            ranges,
+            since,
+            until,
+            min_id,
+            max_id,
+            media_types,
+            max_media_mb,
+        )
+    )
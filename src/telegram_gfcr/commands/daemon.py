@@ -0,0 +1,39 @@
+"""Comando para rodar o daemon (conexão mantida entre invocações do CLI)."""
+
+from rich.console import Console
+
+from ..core import daemon
+from ..core.client import run_async
+from ..core.errors import TelegramError
+
+console = Console()
+
+
+async def run_daemon_async() -> None:
+    """Atende os comandos do CLI até ser encerrado (variante para um loop já em execução)."""
+    try:
+        await daemon.serve()
+    except RuntimeError as e:
+        console.print(f"[yellow]⚠️ {e}[/]")
+    except TelegramError as e:
+        console.print(f"[red]Erro ao conectar: {e}[/]")
+    console.print("[dim]Daemon encerrado[/]")
+
+
+def run_daemon(stop: bool = False, status: bool = False) -> None:
+    """Roda o daemon em primeiro plano, ou consulta/encerra o que estiver rodando."""
+    if stop:
+        if daemon.stop():
+            console.print("[green]✓ Daemon encerrado[/]")
+        else:
+            console.print("[yellow]Nenhum daemon rodando[/]")
+        return
+
+    if status:
+        if daemon.ping():
+            console.print(f"[green]✓ Daemon rodando em {daemon.socket_path()}[/]")
+        else:
+            console.print("[yellow]Nenhum daemon rodando[/]")
+        return
+
+    run_async(run_daemon_async())
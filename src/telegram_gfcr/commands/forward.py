@@ -1,24 +1,76 @@
 """Comando para encaminhar mensagens."""
 
+from collections.abc import Iterable
+from typing import TYPE_CHECKING, Any
+
 from loguru import logger
-from rich.console import Console
 from rich.progress import Progress, SpinnerColumn, TextColumn
 
 from ..core.client import get_client, run_async
 from ..core.errors import RateLimitError, TelegramError, handle_telethon_errors, retry_on_flood
+from ..core.terminal import console, current_console
 
-console = Console()
+if TYPE_CHECKING:
+    from telethon import TelegramClient
 
+# Máximo de ids aceito por uma chamada forward_messages
+MAX_FORWARD_BATCH = 100
 
-@retry_on_flood(max_retries=5)
-@handle_telethon_errors("forward_message")
-async def _forward_with_retry(client, dest_id: int, message) -> None:
-    """Encaminha mensagem com retry automático em FloodWait."""
-    await client.forward_messages(dest_id, message)
 
+def build_batches(
+    messages: Iterable[tuple[int, int | None]], max_size: int = MAX_FORWARD_BATCH
+) -> list[list[int]]:
+    """
+    Agrupa ids de mensagens em batches para forward_messages.
 
-def run_forward(source_id: int, dest_id: int, limit: int) -> None:
-    """Encaminha mensagens entre entidades."""
+    Preserva a ordem recebida e nunca separa um álbum: mensagens consecutivas
+    com o mesmo `grouped_id` vão sempre no mesmo batch.
+
+    Args:
+        messages: Pares (id, grouped_id) na ordem em que devem chegar
+        max_size: Tamanho máximo de cada batch
+
+    Returns:
+        Lista de batches de ids
+    """
+    # Unidades indivisíveis: mensagem avulsa ou álbum inteiro
+    units: list[list[int]] = []
+    last_group: int | None = None
+    for message_id, grouped_id in messages:
+        if grouped_id is not None and grouped_id == last_group:
+            units[-1].append(message_id)
+        else:
+            units.append([message_id])
+        last_group = grouped_id
+
+    batches: list[list[int]] = []
+    for unit in units:
+        if batches and len(batches[-1]) + len(unit) <= max_size:
+            batches[-1].extend(unit)
+        else:
+            batches.append(list(unit))
+    return batches
+
+
+@retry_on_flood(max_retries=5, rate_class="forward")
+@handle_telethon_errors("forward_messages")
+async def _forward_batch_with_retry(
+    client: "TelegramClient", dest: Any, source: Any, ids: list[int]
+) -> int:
+    """
+    Encaminha um batch com retry automático em FloodWait.
+
+    Em FloodWait só este batch é repetido; os anteriores já foram entregues.
+
+    Returns:
+        Quantidade de mensagens efetivamente encaminhadas
+    """
+    forwarded = await client.forward_messages(dest, ids, from_peer=source)
+    return sum(1 for message in forwarded if message is not None)
+
+
+async def run_forward_async(source_id: int, dest_id: int, limit: int) -> None:
+    """Encaminha mensagens entre entidades (variante para um loop já em execução)."""
 
     async def _forward() -> int:
         async with get_client() as client:
@@ -27,28 +79,52 @@ def run_forward(source_id: int, dest_id: int, limit: int) -> None:
             with Progress(
                 SpinnerColumn(),
                 TextColumn("[progress.description]{task.description}"),
-                console=console,
+                console=current_console(),
             ) as progress:
-                task = progress.add_task("Encaminhando mensagens...", total=None)
+                task = progress.add_task("Coletando mensagens...", total=None)
+
+                # Peers resolvidos uma vez pelo cache, reaproveitados em cada batch
+                source = await client.resolve(source_id)
+                dest = await client.resolve(dest_id)
+
+                messages = client.client.iter_messages(source, limit=limit)
+                collected = [
+                    (message.id, message.grouped_id)
+                    async for message in client.rate_limiter.paced(messages, "history")
+                ]
+                # iter_messages vem do mais novo para o mais antigo; inverte para
+                # entregar no destino na ordem original
+                collected.reverse()
+                total = len(collected)
 
-                async for message in client.client.iter_messages(source_id, limit=limit):
+                for ids in build_batches(collected):
                     try:
-                        await _forward_with_retry(client.client, dest_id, message)
-                        count += 1
-                        progress.update(task, description=f"Encaminhando... ({count}/{limit})")
+                        count += await _forward_batch_with_retry(client.client, dest, source, ids)
+                        progress.update(task, description=f"Encaminhando... ({count}/{total})")
                     except RateLimitError:
-                        logger.warning(f"Mensagem {message.id} pulada após max retries")
+                        logger.warning(
+                            "Batch {}–{} ({} msgs) pulado após max retries",
+                            ids[0],
+                            ids[-1],
+                            len(ids),
+                        )
                     except Exception as e:
-                        logger.warning(f"Mensagem {message.id} não encaminhada: {e}")
+                        logger.warning("Batch {}–{} não encaminhado: {}", ids[0], ids[-1], e)
 
             return count
 
     console.print(f"[blue]📤 Encaminhando de {source_id} para {dest_id}...[/]")
 
     try:
-        total = run_async(_forward())
+        with logger.contextualize(command="forward", entity_id=source_id):
+            total = await _forward()
         console.print(f"[green]✓ {total} mensagens encaminhadas![/]")
     except RateLimitError as e:
         console.print(f"[yellow]⚠️ Rate limit: {e}[/]")
     except TelegramError as e:
         console.print(f"[red]Erro: {e}[/]")
+
+
+def run_forward(source_id: int, dest_id: int, limit: int) -> None:
+    """Encaminha mensagens entre entidades."""
+    run_async(run_forward_async(source_id, dest_id, limit))
@@ -0,0 +1,32 @@
+"""Comando para indexar backups locais para busca offline."""
+
+import asyncio
+from pathlib import Path
+
+from rich.console import Console
+
+from ..core.index import SearchIndex
+
+console = Console()
+
+
+async def run_index_async(path: str | None = None) -> None:
+    """Indexa backups locais (variante para um loop já em execução)."""
+    root = Path(path) if path else Path.cwd() / "backups"
+    if not root.exists():
+        console.print(f"[yellow]Diretório não encontrado: {root}[/]")
+        return
+
+    console.print(f"[blue]🗂️ Indexando backups em {root}...[/]")
+
+    with console.status("Indexando..."):
+        async with SearchIndex() as index:
+            total = await index.index_tree(root)
+
+    console.print(f"[green]✓ {total} mensagens indexadas[/]")
+
+
+def run_index(path: str | None = None) -> None:
+    """Indexa backups locais para `search --local`."""
+    # Sem `run_async`: nada de pool nem métricas, e o Telethon nem é importado
+    asyncio.run(run_index_async(path))
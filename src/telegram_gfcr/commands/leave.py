@@ -1,34 +1,48 @@
 """Comando para sair de grupos."""
 
-import typer
-from rich.console import Console
-
-from ..core.client import get_client, run_async
-from ..core.errors import TelegramError, TelegramPermissionError
-
-console = Console()
+import asyncio
 
+import typer
 
-def run_leave(entity_id: int, confirm: bool) -> None:
-    """Sai de um grupo."""
-    if not confirm and not typer.confirm(
-        f"Tem certeza que deseja sair do grupo {entity_id}?"
+from ..core.client import TelegramClientWrapper, get_client, run_async
+from ..core.errors import (
+    TelegramError,
+    TelegramPermissionError,
+    handle_telethon_errors,
+    retry_on_flood,
+)
+from ..core.terminal import console
+
+
+@retry_on_flood(max_retries=3, rate_class="account")
+@handle_telethon_errors("leave")
+async def _leave_with_retry(client: TelegramClientWrapper, entity_id: int) -> None:
+    """Sai do grupo com retry automático em FloodWait."""
+    peer = await client.resolve(entity_id)
+    await client.client.delete_dialog(peer)
+
+
+async def run_leave_async(entity_id: int, confirm: bool) -> None:
+    """Sai de um grupo (variante para um loop já em execução)."""
+    # Prompt bloqueante em thread para não congelar o loop (e a conexão) do REPL
+    if not confirm and not await asyncio.to_thread(
+        typer.confirm, f"Tem certeza que deseja sair do grupo {entity_id}?"
     ):
         console.print("[yellow]Operação cancelada[/]")
         return
 
-    async def _leave() -> bool:
-        async with get_client() as client:
-            entity = await client.client.get_entity(entity_id)
-            await client.client.delete_dialog(entity)
-            return True
-
     console.print(f"[blue]🚪 Saindo do grupo {entity_id}...[/]")
 
     try:
-        run_async(_leave())
+        async with get_client() as client:
+            await _leave_with_retry(client, entity_id)
         console.print(f"[green]✓ Saiu do grupo {entity_id}[/]")
     except TelegramPermissionError as e:
         console.print(f"[yellow]⚠️ {e}[/]")
     except TelegramError as e:
         console.print(f"[red]Erro: {e}[/]")
+
+
+def run_leave(entity_id: int, confirm: bool) -> None:
+    """Sai de um grupo."""
+    run_async(run_leave_async(entity_id, confirm))
@@ -1,25 +1,19 @@
 """Comando para listar entidades."""
 
-from rich.console import Console
 from rich.table import Table
 
-from ..core.client import get_client, run_async
+from ..core.client import run_async
+from ..core.dialogs import get_dialogs, is_refreshing
 from ..core.errors import AuthenticationError, TelegramError
+from ..core.terminal import console
 
-console = Console()
-
-
-def run_list(entity_type: str = "all") -> None:
-    """Lista grupos, conversas e canais."""
-
-    async def _list() -> list[tuple[int, str, str, int]]:
-        async with get_client() as client:
-            return await client.get_dialogs(entity_type)
 
+async def run_list_async(entity_type: str = "all", refresh: bool = False) -> None:
+    """Lista grupos, conversas e canais (variante para um loop já em execução)."""
     console.print(f"[blue]📂 Listando entidades ({entity_type})...[/]")
 
     try:
-        dialogs = run_async(_list())
+        dialogs, age = await get_dialogs(entity_type, refresh)
     except AuthenticationError as e:
         console.print(f"[yellow]⚠️ {e}[/]")
         return
@@ -31,7 +25,18 @@ def run_list(entity_type: str = "all") -> None:
         console.print("[yellow]Nenhuma entidade encontrada[/]")
         return
 
-    table = Table(title=f"Entidades ({len(dialogs)})", show_header=True, header_style="bold cyan")
+    caption = None
+    if age >= 1:
+        caption = f"cache de {age:.0f}s atrás"
+        if is_refreshing():
+            caption += ", atualizando em segundo plano"
+
+    table = Table(
+        title=f"Entidades ({len(dialogs)})",
+        caption=caption,
+        show_header=True,
+        header_style="bold cyan",
+    )
     table.add_column("ID", style="dim")
     table.add_column("Nome")
     table.add_column("Tipo", style="green")
@@ -45,7 +50,7 @@ def run_list(entity_type: str = "all") -> None:
         "unknown": "❓",
     }
 
-    for dialog_id, name, dtype, unread in dialogs:
+    for dialog_id, name, dtype, unread, _top_id in dialogs:
         emoji = type_emoji.get(dtype, "❓")
         table.add_row(
             str(dialog_id),
@@ -55,3 +60,8 @@ def run_list(entity_type: str = "all") -> None:
         )
 
     console.print(table)
+
+
+def run_list(entity_type: str = "all", refresh: bool = False) -> None:
+    """Lista grupos, conversas e canais."""
+    run_async(run_list_async(entity_type, refresh))
@@ -1,70 +1,310 @@
 """Comando para buscar mensagens."""
 
-from rich.console import Console
+import asyncio
+import heapq
+import time
+from collections.abc import AsyncIterator
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any
+
+from loguru import logger
+from rich.live import Live
+from rich.markup import escape
 from rich.table import Table
 
-from ..core.client import get_client, run_async
-from ..core.errors import RateLimitError, TelegramError, handle_telethon_errors
+from ..config import get_settings
+from ..core.client import TelegramClientWrapper, get_client, run_async
+from ..core.dialogs import get_dialogs
+from ..core.errors import RateLimitError, TelegramError
+from ..core.index import HIGHLIGHT_END, HIGHLIGHT_START, SearchIndex
+from ..core.metrics import get_metrics
+from ..core.terminal import console, current_console
 
-console = Console()
+# Fim do stream de um chat na fila do merge
+_DONE = None
 
 
-@handle_telethon_errors("search_messages")
-async def _search_async(query: str, entity_id: int | None = None, limit: int = 20) -> list:
-    """Busca mensagens de forma assíncrona."""
-    async with get_client() as client:
-        results = []
-        # Se entity_id for None, busca globalmente (se suportado pelo wrapper/telethon)
-        # Caso contrário, busca na entidade específica
-        async for message in client.client.iter_messages(entity_id, search=query, limit=limit):
-            results.append(message)
-        return results
+@dataclass(slots=True)
+class ChatFailure:
+    """Chat que falhou durante a busca (os demais seguem)."""
 
+    entity_id: int | None
+    error: str
 
-def run_search(query: str, entity_id: int | None = None, limit: int = 20) -> None:
-    """Executa busca de mensagens."""
-    console.print(f"[blue]🔍 Buscando por '[bold]{query}[/]'...[/]")
-    if entity_id:
-        console.print(f"[dim]No chat: {entity_id}[/]")
 
+async def _produce(
+    client: TelegramClientWrapper,
+    entity_id: int | None,
+    query: str,
+    limit: int,
+    slots: asyncio.Semaphore,
+    queue: asyncio.Queue[Any],
+    failures: list[ChatFailure],
+) -> None:
+    """
+    Lê os resultados de um chat (do mais novo para o mais antigo) para a fila.
+
+    O semáforo limita as requisições em andamento, não os chats: ele só é
+    segurado durante o `anext`, então um chat com a fila cheia esperando o
+    merge não impede os outros de buscar.
+    """
+    started = time.perf_counter()
     try:
-        messages = run_async(_search_async(query, entity_id, limit))
-    except RateLimitError as e:
-        console.print(f"[yellow]⚠️ Rate limit: {e}[/]")
-        return
-    except TelegramError as e:
-        console.print(f"[red]Erro na busca: {e}[/]")
-        return
+        async with slots:
+            # Sem entity_id: busca global do Telegram
+            peer = await client.resolve(entity_id) if entity_id is not None else None
+        messages = client.client.iter_messages(peer, search=query, limit=limit)
+        iterator = aiter(client.rate_limiter.paced(messages, "search"))
+        while True:
+            async with slots:
+                try:
+                    message = await anext(iterator)
+                except StopAsyncIteration:
+                    break
+            client.peers.remember(message.sender)
+            await queue.put(message)
+    except Exception as e:
+        get_metrics().observe("search_messages", time.perf_counter() - started, e)
+        logger.warning("Busca em {} falhou: {}", entity_id, e)
+        failures.append(ChatFailure(entity_id, str(e)))
+    else:
+        get_metrics().observe("search_messages", time.perf_counter() - started)
+    await queue.put(_DONE)
 
-    if not messages:
-        console.print("[yellow]Nenhuma mensagem encontrada[/]")
+
+async def _merge(queues: list[asyncio.Queue[Any]]) -> AsyncIterator[Any]:
+    """
+    Intercala os streams dos chats por data (mais nova primeiro) com um heap.
+
+    Cada stream já vem ordenado, então basta manter a cabeça de cada um no
+    heap: a próxima mensagem global é sempre a do topo.
+    """
+    heap: list[tuple[float, int, Any]] = []
+
+    async def _advance(n: int) -> None:
+        message = await queues[n].get()
+        if message is not _DONE:
+            heapq.heappush(heap, (-message.date.timestamp(), n, message))
+
+    await asyncio.gather(*(_advance(n) for n in range(len(queues))))
+    while heap:
+        _, n, message = heapq.heappop(heap)
+        yield message
+        await _advance(n)
+
+
+async def search_stream(
+    client: TelegramClientWrapper,
+    query: str,
+    entity_ids: list[int | None],
+    limit: int,
+    parallel: int,
+    failures: list[ChatFailure],
+) -> AsyncIterator[Any]:
+    """
+    Busca em vários chats ao mesmo tempo e entrega os resultados já em ordem.
+
+    Cada chat contribui com no máximo `limit` mensagens; ao atingir `limit`
+    no total (ou se o consumidor parar de iterar), as buscas pendentes são
+    canceladas.
+    """
+    slots = asyncio.Semaphore(parallel)
+    queues: list[asyncio.Queue[Any]] = [asyncio.Queue(maxsize=limit) for _ in entity_ids]
+    tasks = [
+        asyncio.create_task(_produce(client, entity_id, query, limit, slots, queue, failures))
+        for entity_id, queue in zip(entity_ids, queues, strict=True)
+    ]
+    try:
+        count = 0
+        async for message in _merge(queues):
+            yield message
+            count += 1
+            if count >= limit:
+                break
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def _resolve_chats(
+    entity_ids: list[int], entity_type: str | None
+) -> tuple[list[int | None], dict[int, str]]:
+    """Chats da busca (ids e filtro de diálogos, sem repetir) e seus nomes conhecidos."""
+    names: dict[int, str] = {}
+    targets: list[int | None] = list(entity_ids)
+    if entity_type:
+        dialogs, _ = await get_dialogs(entity_type)
+        targets.extend(dialog.id for dialog in dialogs)
+        names = {dialog.id: dialog.name for dialog in dialogs}
+    return list(dict.fromkeys(targets)) or [None], names
+
+
+def _sender_name(message: Any) -> str:
+    """Nome de exibição do remetente."""
+    if not message.sender:
+        return "Desconhecido"
+    return getattr(message.sender, "first_name", "") or getattr(message.sender, "title", "Sistema")
+
+
+async def _search_local(
+    query: str,
+    entity_id: int | None,
+    limit: int,
+    since: datetime | None,
+    until: datetime | None,
+    sender_id: int | None,
+) -> None:
+    """Busca no índice FTS5 local, sem rede."""
+    started = time.perf_counter()
+    async with SearchIndex() as index:
+        hits = await index.search(query, entity_id, since, until, sender_id, limit)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+
+    if not hits:
+        console.print("[yellow]Nenhuma mensagem encontrada no índice local[/]")
+        console.print("[dim]Dica: rode 'telegram-gfcr index' após o backup[/]")
         return
 
     table = Table(
-        title=f"Resultados da Busca ({len(messages)})",
+        title=f"Resultados Locais ({len(hits)}) em {elapsed_ms:.0f}ms",
         show_header=True,
         header_style="bold cyan",
     )
     table.add_column("Data", style="dim")
+    table.add_column("Chat", style="dim")
     table.add_column("De", style="green")
     table.add_column("Mensagem")
 
-    for msg in messages:
-        sender = "Desconhecido"
-        if msg.sender:
-            sender = (
-                getattr(msg.sender, "first_name", "")
-                or getattr(msg.sender, "title", "Sistema")
-            )
-
-        text = msg.text or "[Mídia/Sem texto]"
-        if len(text) > 100:
-            text = text[:97] + "..."
-
+    for hit in hits:
+        snippet = (
+            escape(hit.snippet.replace("\n", " "))
+            .replace(HIGHLIGHT_START, "[bold yellow]")
+            .replace(HIGHLIGHT_END, "[/]")
+        )
         table.add_row(
-            msg.date.strftime("%Y-%m-%d %H:%M"),
-            sender,
-            text.replace("\n", " ")
+            hit.date.strftime("%Y-%m-%d %H:%M"),
+            str(hit.entity_id),
+            str(hit.sender_id or "-"),
+            snippet,
         )
 
     console.print(table)
+
+
+async def _search_remote(
+    query: str,
+    entity_ids: list[int],
+    entity_type: str | None,
+    limit: int,
+    parallel: int,
+) -> None:
+    """Busca no Telegram, mostrando cada linha assim que o merge a libera."""
+    try:
+        targets, names = await _resolve_chats(entity_ids, entity_type)
+    except TelegramError as e:
+        console.print(f"[red]Erro na busca: {e}[/]")
+        return
+
+    multi = len(targets) > 1
+    if multi:
+        console.print(f"[dim]Em {len(targets)} chats ({parallel} buscas simultâneas)[/]")
+    elif targets[0] is not None:
+        console.print(f"[dim]No chat: {targets[0]}[/]")
+
+    table = Table(title="Resultados da Busca", show_header=True, header_style="bold cyan")
+    table.add_column("Data", style="dim")
+    if multi:
+        table.add_column("Chat", style="dim")
+    table.add_column("De", style="green")
+    table.add_column("Mensagem")
+
+    started = time.perf_counter()
+    first_ms: float | None = None
+    failures: list[ChatFailure] = []
+    count = 0
+    try:
+        async with get_client() as client:
+            with Live(table, console=current_console(), refresh_per_second=8, transient=False):
+                async for msg in search_stream(client, query, targets, limit, parallel, failures):
+                    if first_ms is None:
+                        first_ms = (time.perf_counter() - started) * 1000
+
+                    text = msg.text or "[Mídia/Sem texto]"
+                    if len(text) > 100:
+                        text = text[:97] + "..."
+
+                    row = [msg.date.strftime("%Y-%m-%d %H:%M")]
+                    if multi:
+                        chat = names.get(msg.chat_id) or getattr(msg.chat, "title", None)
+                        row.append(escape(chat or str(msg.chat_id)))
+                    row += [_sender_name(msg), text.replace("\n", " ")]
+                    table.add_row(*row)
+                    count += 1
+                    table.title = f"Resultados da Busca ({count})"
+            await client.peers.flush()
+    except RateLimitError as e:
+        console.print(f"[yellow]⚠️ Rate limit: {e}[/]")
+        return
+    except TelegramError as e:
+        console.print(f"[red]Erro na busca: {e}[/]")
+        return
+
+    for failure in failures:
+        console.print(f"[yellow]⚠️ {failure.entity_id}: {failure.error}[/]")
+    if not count:
+        console.print("[yellow]Nenhuma mensagem encontrada[/]")
+    elif first_ms is not None:
+        total_ms = (time.perf_counter() - started) * 1000
+        console.print(f"[dim]Primeiro resultado em {first_ms:.0f}ms, total {total_ms:.0f}ms[/]")
+
+
+async def run_search_async(
+    query: str,
+    entity_ids: list[int] | None = None,
+    limit: int = 20,
+    local: bool = False,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    sender_id: int | None = None,
+    entity_type: str | None = None,
+    parallel: int | None = None,
+) -> None:
+    """Executa busca de mensagens (variante para um loop já em execução)."""
+    entity_ids = entity_ids or []
+    if local:
+        if len(entity_ids) > 1 or entity_type:
+            console.print("[red]A busca --local aceita um único --id (sem --type)[/]")
+            return
+        if not query.strip():
+            console.print("[red]A busca --local precisa de ao menos um termo[/]")
+            return
+        console.print(f"[blue]🔍 Buscando localmente por '[bold]{query}[/]'...[/]")
+        entity_id = entity_ids[0] if entity_ids else None
+        await _search_local(query, entity_id, limit, since, until, sender_id)
+        return
+
+    console.print(f"[blue]🔍 Buscando por '[bold]{query}[/]'...[/]")
+    parallel = max(1, parallel or get_settings().search_parallel)
+    with logger.contextualize(command="search"):
+        await _search_remote(query, entity_ids, entity_type, limit, parallel)
+
+
+def run_search(
+    query: str,
+    entity_ids: list[int] | None = None,
+    limit: int = 20,
+    local: bool = False,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    sender_id: int | None = None,
+    entity_type: str | None = None,
+    parallel: int | None = None,
+) -> None:
+    """Executa busca de mensagens."""
+    run_async(
+        run_search_async(
+            query, entity_ids, limit, local, since, until, sender_id, entity_type, parallel
+        )
+    )
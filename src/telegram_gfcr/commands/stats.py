@@ -0,0 +1,81 @@
+"""Comando para exibir métricas das operações."""
+
+import json
+
+from rich.table import Table
+
+from ..config import get_settings
+from ..core.metrics import Metrics, get_metrics
+from ..core.terminal import console
+
+
+def _seconds(value: float | None) -> str:
+    if value is None:
+        return "-"
+    return "> 60s" if value == float("inf") else f"≤ {value:g}s"
+
+
+def show_stats(metrics: Metrics, title: str) -> None:
+    """Tabelas de operações, do rate limiter e das filas internas."""
+    if not metrics.operations and not metrics.rate_classes and not metrics.queues:
+        console.print("[yellow]Nenhuma métrica registrada ainda[/]")
+        return
+
+    table = Table(title=title, show_header=True, header_style="bold cyan")
+    table.add_column("Operação", style="green")
+    table.add_column("Chamadas", justify="right")
+    table.add_column("Erros", justify="right")
+    table.add_column("p50", justify="right")
+    table.add_column("p95", justify="right")
+    table.add_column("Média", justify="right")
+    table.add_column("Retries", justify="right")
+    table.add_column("Flood (s)", justify="right")
+
+    for name, s in sorted(metrics.operations.items()):
+        errors = ", ".join(f"{error}×{count}" for error, count in s.errors.most_common())
+        table.add_row(
+            name,
+            str(s.calls),
+            errors or "0",
+            _seconds(s.quantile(0.5)),
+            _seconds(s.quantile(0.95)),
+            f"{s.latency_sum / s.calls:.2f}s" if s.calls else "-",
+            str(s.retries),
+            f"{s.flood_seconds:.0f}",
+        )
+    console.print(table)
+
+    if metrics.rate_classes:
+        limiter = Table(title="Rate limiter", show_header=True, header_style="bold cyan")
+        limiter.add_column("Classe", style="green")
+        limiter.add_column("Requisições", justify="right")
+        limiter.add_column("Espera (s)", justify="right")
+        for name, r in sorted(metrics.rate_classes.items()):
+            limiter.add_row(name, str(r.requests), f"{r.wait_seconds:.1f}")
+        console.print(limiter)
+
+    if metrics.queues:
+        queues = Table(title="Filas", show_header=True, header_style="bold cyan")
+        queues.add_column("Fila", style="green")
+        queues.add_column("Itens", justify="right")
+        queues.add_column("Profundidade média", justify="right")
+        queues.add_column("Máxima", justify="right")
+        for name, q in sorted(metrics.queues.items()):
+            queues.add_row(name, str(q.samples), f"{q.depth_sum / q.samples:.1f}", str(q.max_depth))
+        console.print(queues)
+
+
+async def run_stats_async() -> None:
+    """Métricas da sessão atual (REPL)."""
+    show_stats(get_metrics(), "Métricas da sessão")
+
+
+def run_stats() -> None:
+    """Métricas da última execução (dump JSON gravado ao sair)."""
+    settings = get_settings()
+    path = settings.metrics_file or settings.data_dir / "metrics.json"
+    if not path.exists():
+        console.print(f"[yellow]Nenhum dump de métricas em {path}[/]")
+        return
+    metrics = Metrics.from_snapshot(json.loads(path.read_text(encoding="utf-8")))
+    show_stats(metrics, f"Métricas da última execução ({path})")
@@ -0,0 +1,133 @@
+"""Comando de sincronização: backup só dos diálogos que mudaram."""
+
+from dataclasses import dataclass
+
+from rich.table import Table
+
+from ..core.client import run_async
+from ..core.dialogs import get_dialogs
+from ..core.errors import TelegramError
+from ..core.models import DialogInfo
+from ..core.state import BackupCheckpoint, StateStore
+from ..core.terminal import console, workdir
+from .backup import BackupResult, backup_entities, make_options
+
+
+@dataclass(slots=True)
+class SyncItem:
+    """Diálogo com mensagens fora do backup local."""
+
+    dialog: DialogInfo
+    checkpoint: BackupCheckpoint
+
+    @property
+    def behind(self) -> int:
+        """Ids entre o último gravado e a mensagem mais recente do diálogo."""
+        return max(0, self.dialog.top_message_id - self.checkpoint.max_id)
+
+
+def plan_sync(
+    dialogs: list[DialogInfo], checkpoints: dict[int, BackupCheckpoint]
+) -> list[SyncItem]:
+    """
+    Seleciona os diálogos que precisam de backup, mais atrasados primeiro.
+
+    Um diálogo está em dia quando o checkpoint já chegou ao início da conversa
+    e o `max_id` alcança a mensagem mais recente (`top_message_id` da lista de
+    diálogos): nesse caso nem é aberto. Empates saem pelas não lidas.
+    """
+    items = []
+    for dialog in dialogs:
+        checkpoint = checkpoints.get(dialog.id) or BackupCheckpoint(dialog.id, "")
+        if not dialog.top_message_id:
+            continue  # Diálogo sem mensagens
+        if checkpoint.complete and checkpoint.max_id >= dialog.top_message_id:
+            continue
+        items.append(SyncItem(dialog, checkpoint))
+
+    items.sort(key=lambda item: (item.behind, item.dialog.unread), reverse=True)
+    return items
+
+
+def _print_plan(items: list[SyncItem]) -> None:
+    table = Table(title=f"Diálogos a sincronizar ({len(items)})", header_style="bold cyan")
+    table.add_column("ID", style="dim")
+    table.add_column("Nome")
+    table.add_column("Tipo", style="green")
+    table.add_column("Último gravado", justify="right")
+    table.add_column("Mais recente", justify="right")
+
+    for item in items:
+        dialog = item.dialog
+        table.add_row(
+            str(dialog.id),
+            dialog.name[:40] + "..." if len(dialog.name) > 40 else dialog.name,
+            dialog.type,
+            str(item.checkpoint.max_id or "-"),
+            str(dialog.top_message_id),
+        )
+    console.print(table)
+
+
+async def run_sync_async(
+    output: str | None = None,
+    entity_type: str = "all",
+    media: bool = False,
+    workers: int | None = None,
+    compression: str | None = None,
+    fmt: str | None = None,
+    parallel: int | None = None,
+    split: int | None = None,
+    dry_run: bool = False,
+) -> None:
+    """Backup dos diálogos que mudaram (variante para um loop já em execução)."""
+    root = workdir() / (output or "backups")
+
+    try:
+        options = make_options(media, workers, compression, fmt, split)
+        # Lista nova: o top_message_id do cache pode estar atrasado
+        dialogs, _ = await get_dialogs(entity_type, refresh=True)
+        async with StateStore() as state:
+            # Só contam os checkpoints do diretório de cada diálogo sob `root`
+            checkpoints = {
+                checkpoint.entity_id: checkpoint
+                for checkpoint in await state.list_checkpoints()
+                if checkpoint.output == str((root / str(checkpoint.entity_id)).resolve())
+            }
+    except (ValueError, OSError, TelegramError) as e:
+        console.print(f"[red]Erro: {e}[/]")
+        return
+
+    items = plan_sync(dialogs, checkpoints)
+    if not items:
+        console.print(f"[green]✓ Todos os {len(dialogs)} diálogos já estão em dia[/]")
+        return
+
+    console.print(
+        f"[blue]🔄 {len(items)} de {len(dialogs)} diálogos mudaram desde o último backup[/]"
+    )
+    if dry_run:
+        _print_plan(items)
+        return
+
+    results = [BackupResult(item.dialog.id, root / str(item.dialog.id)) for item in items]
+    await backup_entities(results, options, parallel)
+
+
+def run_sync(
+    output: str | None = None,
+    entity_type: str = "all",
+    media: bool = False,
+    workers: int | None = None,
+    compression: str | None = None,
+    fmt: str | None = None,
+    parallel: int | None = None,
+    split: int | None = None,
+    dry_run: bool = False,
+) -> None:
+    """Backup dos diálogos que mudaram."""
+    run_async(
+        run_sync_async(
+            output, entity_type, media, workers, compression, fmt, parallel, split, dry_run
+        )
+    )
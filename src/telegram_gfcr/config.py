@@ -1,5 +1,6 @@
 """Configuração via Pydantic Settings."""
 
+import os
 from pathlib import Path
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -25,6 +26,40 @@ class Settings(BaseSettings):
     # Paths
     data_dir: Path = Path.home() / ".config" / "telegram-gfcr"
 
+    # Backup
+    media_workers: int = 4
+    backup_parallel: int = 4  # entidades simultâneas em backups múltiplos
+    media_dedup: bool = True  # media store compartilhado entre backups
+    media_split_connections: int = 0  # conexões por mídia grande (0 desativa)
+    media_split_mb: int = 20  # tamanho mínimo para baixar em partes
+    backup_compression: str = "none"  # none, gzip ou zstd
+    backup_format: str = "full"  # full (to_json do Telethon) ou compact
+    backup_segment_mb: int = 256
+    backup_segment_records: int = 100_000
+    backup_pipeline_depth: int = 4  # batches serializados à espera da escrita
+    backup_ranges: int = 1  # faixas de ids buscadas em paralelo no histórico antigo
+    follow_flush_seconds: float = 5.0  # flush periódico do backup --follow
+    follow_gap_seconds: float = 60.0  # busca de mensagens perdidas no --follow
+
+    # Busca online: chats consultados simultaneamente
+    search_parallel: int = 4
+
+    # Cache de diálogos (segundos até considerar a lista desatualizada)
+    dialog_cache_ttl: int = 300
+
+    # Métricas (dump JSON ao sair; textfile opcional para o node exporter)
+    metrics_file: Path | None = None  # padrão: data_dir/metrics.json
+    metrics_textfile: Path | None = None
+
+    # Daemon (socket Unix; padrão: data_dir/daemon.sock). Com use_daemon, os
+    # comandos do CLI usam o daemon quando ele estiver rodando
+    daemon_socket: Path | None = None
+    use_daemon: bool = True
+
+    # Logging: sink JSON lines com contexto e amostragem de eventos por mensagem
+    log_json: bool = False
+    log_sample_every: int = 100  # 1 desativa a amostragem
+
     # Debug
     debug: bool = False
 
@@ -35,15 +70,45 @@ class Settings(BaseSettings):
 
     @property
     def session_path(self) -> Path:
-        """Caminho completo do arquivo de sessão com permissões restritas."""
+        """Caminho do arquivo de sessão (sem a extensão `.session`)."""
+        return self.data_dir / self.session_name
+
+    def prepare_session(self) -> Path:
+        """
+        Garante o arquivo de sessão com permissões 0600 (apenas owner lê/escreve).
+
+        Chamado uma vez, ao criar o cliente. Uma sessão nova já nasce 0600, sem
+        janela em que fique legível por outros usuários; uma sessão antiga
+        (criada com a umask padrão) é corrigida no mesmo passo.
+        """
         path = self.ensure_data_dir() / self.session_name
-        # Proteger arquivo de sessão com permissões 0600 (apenas owner lê/escreve)
         session_file = path.with_suffix(".session")
-        if session_file.exists():
-            session_file.chmod(0o600)
+        os.close(os.open(session_file, os.O_CREAT | os.O_WRONLY, 0o600))
+        session_file.chmod(0o600)
         return path
 
 
+# Singleton global das configurações
+_settings: Settings | None = None
+
+
 def get_settings() -> Settings:
-    """Retorna instância singleton das configurações."""
-    return Settings()  # type: ignore[call-arg]
+    """Retorna instância singleton das configurações (ambiente e `.env` lidos uma vez)."""
+    global _settings
+
+    if _settings is None:
+        _settings = Settings()  # type: ignore[call-arg]
+    return _settings
+
+
+def reload_settings() -> Settings:
+    """
+    Relê ambiente e `.env` (comando `reload` do REPL).
+
+    Se a nova configuração for inválida, a exceção de validação é propagada e
+    a instância atual continua valendo.
+    """
+    global _settings
+
+    _settings = Settings()  # type: ignore[call-arg]
+    return _settings
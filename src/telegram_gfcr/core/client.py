@@ -3,22 +3,31 @@
 from __future__ import annotations
 
 import asyncio
-from collections.abc import AsyncGenerator, Awaitable
+from collections.abc import AsyncGenerator, Awaitable, Coroutine
 from contextlib import asynccontextmanager
+from typing import Any
 
 from loguru import logger
-from rich.console import Console
-from telethon import TelegramClient
+from telethon import TelegramClient, utils
 from telethon.tl.types import Channel, Chat, User
 
 from ..config import get_settings
 from .errors import handle_telethon_errors
-
-console = Console()
+from .metrics import dump_metrics
+from .models import DialogInfo, filter_dialogs
+from .peers import PeerCache
+from .ratelimit import RateLimiter
+from .terminal import console
 
 # Singleton global do pool
 _client_pool: TelegramClientPool | None = None
-_pool_lock = asyncio.Lock()
+
+# Tarefas em segundo plano (ex: refresh do cache de diálogos)
+_background_tasks: set[asyncio.Task[Any]] = set()
+
+# Prazo das tarefas em segundo plano ao fim de um comando one-shot: esperar o
+# refresh inteiro anularia o ganho de responder do cache
+BACKGROUND_GRACE_SECONDS = 1.5
 
 
 class TelegramClientPool:
@@ -26,6 +35,8 @@ class TelegramClientPool:
 
     def __init__(self) -> None:
         self.settings = get_settings()
+        # Limiter único do processo: todas as operações compartilham o ritmo
+        self.rate_limiter = RateLimiter()
         self._wrapper: TelegramClientWrapper | None = None
         self._connection_lock = asyncio.Lock()
         self._connected = False
@@ -37,7 +48,7 @@ class TelegramClientPool:
         async with self._connection_lock:
             if self._wrapper is None:
                 logger.info("Criando novo TelegramClientWrapper")
-                self._wrapper = TelegramClientWrapper()
+                self._wrapper = TelegramClientWrapper(self.rate_limiter)
 
             if not self._connected:
                 logger.info("Conectando cliente Telegram")
@@ -45,14 +56,14 @@ class TelegramClientPool:
                 self._connected = True
 
             self._ref_count += 1
-            logger.debug(f"Wrapper obtido. Refs ativas: {self._ref_count}")
+            logger.debug("Wrapper obtido. Refs ativas: {}", self._ref_count)
             return self._wrapper
 
     async def release_wrapper(self) -> None:
         """Libera referência ao wrapper."""
         async with self._connection_lock:
             self._ref_count = max(0, self._ref_count - 1)
-            logger.debug(f"Wrapper liberado. Refs ativas: {self._ref_count}")
+            logger.debug("Wrapper liberado. Refs ativas: {}", self._ref_count)
             # Não desconecta automaticamente - mantém conexão viva
 
     async def disconnect(self) -> None:
@@ -66,14 +77,16 @@ class TelegramClientPool:
 
 
 async def get_pool() -> TelegramClientPool:
-    """Obtém instância singleton do pool."""
+    """
+    Obtém instância singleton do pool.
+
+    Não há await entre o teste e a atribuição, então a criação é atômica no
+    event loop e dispensa um lock global (que ficaria preso ao primeiro loop).
+    """
     global _client_pool
 
     if _client_pool is None:
-        async with _pool_lock:
-            # Double-check locking
-            if _client_pool is None:
-                _client_pool = TelegramClientPool()
+        _client_pool = TelegramClientPool()
 
     return _client_pool
 
@@ -81,8 +94,10 @@ async def get_pool() -> TelegramClientPool:
 class TelegramClientWrapper:
     """Wrapper para gerenciar cliente Telethon."""
 
-    def __init__(self) -> None:
+    def __init__(self, rate_limiter: RateLimiter | None = None) -> None:
         self.settings = get_settings()
+        self.rate_limiter = rate_limiter or RateLimiter()
+        self.peers = PeerCache()
         self._client: TelegramClient | None = None
 
     @property
@@ -90,7 +105,7 @@ class TelegramClientWrapper:
         """Retorna cliente inicializado."""
         if self._client is None:
             self._client = TelegramClient(
-                str(self.settings.session_path),
+                str(self.settings.prepare_session()),
                 self.settings.api_id,
                 self.settings.api_hash,
             )
@@ -101,11 +116,12 @@ class TelegramClientWrapper:
         """Conecta ao Telegram."""
         await self.client.connect()
         is_authorized = await self.client.is_user_authorized()
-        logger.info(f"Conectado. Autorizado: {is_authorized}")
+        logger.info("Conectado. Autorizado: {}", is_authorized)
         return is_authorized
 
     async def disconnect(self) -> None:
         """Desconecta do Telegram."""
+        await self.peers.close()
         if self._client:
             await self._client.disconnect()
 
@@ -119,26 +135,40 @@ class TelegramClientWrapper:
             return True
 
         await self.client.send_code_request(phone)
-        logger.info(f"Código enviado para {phone}")
+        logger.info("Código enviado para {}", phone)
         code = console.input("[yellow]Digite o código recebido: [/]")
 
         await self.client.sign_in(phone, code)
         console.print("[green]✓ Autenticado com sucesso![/]")
-        logger.info(f"Autenticado com sucesso: {phone}")
+        logger.info("Autenticado com sucesso: {}", phone)
         return True
 
-    async def get_dialogs(
-        self, entity_type: str = "all"
-    ) -> list[tuple[int, str, str, int]]:
+    @handle_telethon_errors("resolve")
+    async def resolve(self, entity_id: int) -> Any:
+        """
+        Resolve um id para InputPeer usando o cache de peers.
+
+        No caso comum (id já visto em diálogos ou mensagens) não há RPC. Ids
+        desconhecidos custam um `get_entity` e passam a ficar no cache.
         """
-        Lista diálogos do usuário.
+        peer = await self.peers.resolve(entity_id)
+        if peer is None:
+            entity = await self.client.get_entity(entity_id)
+            self.peers.remember(entity)
+            peer = utils.get_input_peer(entity)
+        return peer
+
+    async def get_dialogs(self, entity_type: str = "all") -> list[DialogInfo]:
+        """
+        Lista diálogos do usuário direto do Telegram (sem cache).
 
         Returns:
-            Lista de tuplas (id, nome, tipo, count_mensagens)
+            Lista de DialogInfo, filtrada por `entity_type`
         """
         dialogs = []
-        async for dialog in self.client.iter_dialogs():
+        async for dialog in self.rate_limiter.paced(self.client.iter_dialogs(), "dialogs"):
             entity = dialog.entity
+            self.peers.remember(entity)
             dtype = "unknown"
 
             if isinstance(entity, User):
@@ -148,17 +178,18 @@ class TelegramClientWrapper:
             elif isinstance(entity, Channel):
                 dtype = "channel" if entity.broadcast else "supergroup"
 
-            if entity_type != "all" and dtype != entity_type:
-                continue
-
-            dialogs.append((
-                dialog.id,
-                dialog.name or "Sem nome",
-                dtype,
-                dialog.unread_count,
-            ))
+            dialogs.append(
+                DialogInfo(
+                    dialog.id,
+                    dialog.name or "Sem nome",
+                    dtype,
+                    dialog.unread_count,
+                    dialog.message.id if dialog.message else 0,
+                )
+            )
 
-        return dialogs
+        await self.peers.flush()
+        return filter_dialogs(dialogs, entity_type)
 
 
 @asynccontextmanager
@@ -182,13 +213,53 @@ async def shutdown_pool() -> None:
     """Desconecta pool (chamar ao sair do app)."""
     global _client_pool
 
-
     if _client_pool:
         logger.info("Shutdown do pool")
         await _client_pool.disconnect()
         _client_pool = None
 
 
+def spawn_background(coro: Coroutine[Any, Any, Any]) -> asyncio.Task[Any]:
+    """Agenda tarefa em segundo plano mantendo referência até concluir."""
+    task = asyncio.create_task(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    return task
+
+
+async def wait_background(timeout: float | None = None) -> None:
+    """
+    Aguarda tarefas em segundo plano (chamar antes de encerrar o loop).
+
+    Com `timeout`, as que não terminarem no prazo são canceladas.
+    """
+    if not _background_tasks:
+        return
+    tasks = set(_background_tasks)
+    _, pending = await asyncio.wait(tasks, timeout=timeout)
+    for task in pending:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
 def run_async[T](coro: Awaitable[T]) -> T:
-    """Executa coroutine em contexto síncrono."""
-    return asyncio.run(coro)
+    """
+    Executa coroutine em contexto síncrono (modo one-shot).
+
+    O loop criado por `asyncio.run` morre ao final da chamada, levando junto a
+    conexão e os locks do pool; por isso o pool é desconectado antes de sair.
+    O REPL não passa por aqui: ele mantém um único loop e aguarda as variantes
+    `run_*_async` dos comandos diretamente. Tarefas em segundo plano ganham só
+    `BACKGROUND_GRACE_SECONDS` antes de serem canceladas (o REPL e o daemon as
+    deixam terminar).
+    """
+
+    async def _main() -> T:
+        try:
+            return await coro
+        finally:
+            await wait_background(BACKGROUND_GRACE_SECONDS)
+            await shutdown_pool()
+            dump_metrics()
+
+    return asyncio.run(_main())
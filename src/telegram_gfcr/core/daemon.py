@@ -0,0 +1,369 @@
+"""
+Daemon opcional: mantém o pool conectado e atende comandos por um socket Unix.
+
+Protocolo (JSON lines, uma conexão por comando):
+
+    cliente → {"command": "backup", "args": {...}, "cwd": "...", "width": 120,
+               "terminal": true, "color_system": "truecolor", "settings": "<sha256>"}
+    daemon  → {"type": "accepted"}                (logo ao receber, antes da fila)
+    daemon  → {"type": "output", "text": "..."}   (0 ou mais, saída Rich já renderizada)
+    daemon  → {"type": "done", "ok": true, "error": null}
+
+Os comandos rodam um por vez, cada um com o `Terminal` do cliente: a saída vai
+para o socket e caminhos relativos como `--output` e `--from-file` partem do cwd
+do cliente. Pedidos com configurações diferentes das do daemon (outro `.env`,
+outras variáveis TELEGRAM_*) são recusados. Se o cliente desconectar (Ctrl+C),
+o comando é cancelado.
+
+Este módulo só importa a biblioteca padrão no topo: o lado cliente roda a cada
+invocação do CLI.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import hashlib
+import json
+import os
+import shutil
+import signal
+import socket
+import sys
+from collections.abc import Awaitable, Callable
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .terminal import Terminal
+
+# Chamado com o `Terminal` do cliente e os argumentos do comando
+Handler = Callable[..., Awaitable[None]]
+
+# Segundos para o daemon aceitar o comando; sem resposta, o CLI roda localmente
+ACCEPT_TIMEOUT = 5.0
+
+SETTINGS_MISMATCH = (
+    "configurações diferentes das do daemon (outro .env ou variáveis TELEGRAM_*): "
+    "reinicie o daemon ou use TELEGRAM_USE_DAEMON=false"
+)
+
+
+def socket_path() -> Path:
+    """Caminho do socket (TELEGRAM_DAEMON_SOCKET ou <data_dir>/daemon.sock)."""
+    from ..config import get_settings
+
+    settings = get_settings()
+    return settings.daemon_socket or settings.data_dir / "daemon.sock"
+
+
+def settings_digest() -> str:
+    """Resumo das configurações em vigor; o daemon só atende clientes com o mesmo."""
+    from ..config import get_settings
+
+    data = get_settings().model_dump_json(exclude={"use_daemon"})
+    return hashlib.sha256(data.encode()).hexdigest()
+
+
+# ========== CLIENTE ==========
+
+
+def run_in_daemon(command: str, **args: Any) -> bool:
+    """
+    Executa o comando no daemon, se houver um rodando.
+
+    Returns:
+        True se o daemon atendeu; False para o chamador rodar localmente
+        (daemon desligado, socket ausente ou recusando conexão).
+    """
+    from ..config import get_settings
+
+    if not get_settings().use_daemon or not hasattr(socket, "AF_UNIX"):
+        return False
+    path = socket_path()
+    if not path.exists():
+        return False
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(ACCEPT_TIMEOUT)
+    try:
+        sock.connect(str(path))
+    except OSError:
+        sock.close()
+        return False
+
+    from rich.console import Console
+
+    local = Console()
+    request = {
+        "command": command,
+        "args": args,
+        "cwd": str(Path.cwd()),
+        "width": shutil.get_terminal_size().columns,
+        "terminal": local.is_terminal,
+        "color_system": local.color_system,
+        "settings": settings_digest(),
+    }
+    with sock, sock.makefile("rwb") as stream:
+        try:
+            stream.write(json.dumps(request).encode() + b"\n")
+            stream.flush()
+            reply = json.loads(stream.readline() or "{}")
+        except (OSError, json.JSONDecodeError):
+            reply = {}
+        if reply.get("type") == "done" and not reply["ok"]:
+            # Recusado (configuração diferente): rodar localmente disputaria a sessão
+            local.print(f"[red]Erro no daemon: {reply['error']}[/]")
+            return True
+        if reply.get("type") != "accepted":
+            # Daemon travado ou encerrando: o socket fechado faz ele descartar o pedido
+            return False
+
+        # Comandos longos (backup) podem ficar minutos sem saída
+        sock.settimeout(None)
+        for line in stream:
+            event = json.loads(line)
+            if event["type"] == "output":
+                sys.stdout.write(event["text"])
+                sys.stdout.flush()
+            elif event["type"] == "done":
+                if not event["ok"]:
+                    local.print(f"[red]Erro no daemon: {event['error']}[/]")
+                return True
+
+    # Conexão encerrada sem "done": o daemon caiu no meio do comando
+    local.print("[red]Conexão com o daemon perdida[/]")
+    return True
+
+
+def ping(path: Path | None = None) -> bool:
+    """Indica se há um daemon respondendo no socket."""
+    path = path or socket_path()
+    if not hasattr(socket, "AF_UNIX") or not path.exists():
+        return False
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(ACCEPT_TIMEOUT)
+        try:
+            sock.connect(str(path))
+            sock.sendall(json.dumps({"command": "ping"}).encode() + b"\n")
+            return b'"done"' in sock.makefile("rb").readline()
+        except OSError:
+            return False
+
+
+def stop() -> bool:
+    """Pede ao daemon para encerrar; False se não havia daemon."""
+    path = socket_path()
+    if not ping():
+        return False
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(ACCEPT_TIMEOUT)
+        sock.connect(str(path))
+        sock.sendall(json.dumps({"command": "shutdown"}).encode() + b"\n")
+        sock.makefile("rb").readline()
+    return True
+
+
+# ========== SERVIDOR ==========
+
+
+class _SocketFile:
+    """Arquivo de texto para o Console Rich: cada write vira um evento `output`."""
+
+    def __init__(self, writer: asyncio.StreamWriter) -> None:
+        self._writer = writer
+
+    def write(self, text: str) -> int:
+        if text and not self._writer.is_closing():
+            self._writer.write(_event("output", text=text))
+        return len(text)
+
+    def flush(self) -> None:
+        pass
+
+    def isatty(self) -> bool:
+        return False
+
+
+def _event(kind: str, **data: Any) -> bytes:
+    return json.dumps({"type": kind, **data}).encode() + b"\n"
+
+
+def _in_terminal(func: Callable[..., Awaitable[None]]) -> Handler:
+    """Handler que roda `func` com a saída e o cwd do cliente."""
+    from .terminal import use_terminal
+
+    async def handler(terminal: Terminal, **args: Any) -> None:
+        with use_terminal(terminal):
+            await func(**args)
+
+    return handler
+
+
+def default_handlers() -> dict[str, Handler]:
+    """As variantes `run_*_async` dos comandos atendidos (os demais rodam localmente)."""
+    from ..commands.backup import run_backup_async
+    from ..commands.forward import run_forward_async
+    from ..commands.leave import run_leave_async
+    from ..commands.list import run_list_async
+    from ..commands.search import run_search_async
+    from ..commands.stats import run_stats_async
+    from ..commands.sync import run_sync_async
+
+    commands: dict[str, Callable[..., Awaitable[None]]] = {
+        "list": run_list_async,
+        "backup": run_backup_async,
+        "forward": run_forward_async,
+        "search": run_search_async,
+        "leave": run_leave_async,
+        "stats": run_stats_async,
+        "sync": run_sync_async,
+    }
+    return {name: _in_terminal(func) for name, func in commands.items()}
+
+
+class DaemonServer:
+    """Servidor do socket Unix; um comando por vez sobre o pool já conectado."""
+
+    def __init__(self, path: Path, handlers: dict[str, Handler]) -> None:
+        self.path = path
+        self.handlers = handlers
+        self.settings = settings_digest()
+        self.stopped = asyncio.Event()
+        self._lock = asyncio.Lock()
+        self._server: asyncio.Server | None = None
+
+    async def start(self) -> None:
+        """Abre o socket (0600), removendo um socket órfão de execução anterior."""
+        if self.path.exists():
+            if await asyncio.to_thread(ping, self.path):
+                raise RuntimeError(f"Já existe um daemon em {self.path}")
+            self.path.unlink()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # O socket já nasce 0600: um chmod depois do bind deixaria uma janela em
+        # que outro usuário local conectaria e usaria a sessão do Telegram
+        umask = os.umask(0o177)
+        try:
+            self._server = await asyncio.start_unix_server(self._handle, path=str(self.path))
+        finally:
+            os.umask(umask)
+
+    async def close(self) -> None:
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        with contextlib.suppress(FileNotFoundError):
+            self.path.unlink()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        from loguru import logger
+
+        try:
+            request = json.loads(await reader.readline())
+            command = request["command"]
+            if command == "ping":
+                writer.write(_event("done", ok=True, error=None))
+            elif command == "shutdown":
+                writer.write(_event("done", ok=True, error=None))
+                self.stopped.set()
+            elif command not in self.handlers:
+                writer.write(_event("done", ok=False, error=f"Comando desconhecido: {command}"))
+            elif request.get("settings") != self.settings:
+                writer.write(_event("done", ok=False, error=SETTINGS_MISMATCH))
+            else:
+                writer.write(_event("accepted"))
+                await writer.drain()
+                async with self._lock:
+                    with logger.contextualize(command=command):
+                        error = await self._run(
+                            command, _terminal(request, writer), request.get("args", {}), reader
+                        )
+                if not writer.is_closing():
+                    writer.write(_event("done", ok=error is None, error=error))
+            await writer.drain()
+        except (ConnectionError, json.JSONDecodeError, KeyError) as e:
+            logger.warning("Requisição inválida ou cliente desconectado: {}", e)
+        finally:
+            writer.close()
+            with contextlib.suppress(ConnectionError):
+                await writer.wait_closed()
+
+    async def _run(
+        self,
+        command: str,
+        terminal: Terminal,
+        args: dict[str, Any],
+        reader: asyncio.StreamReader,
+    ) -> str | None:
+        """Executa o handler; cancela se o cliente desconectar antes do fim."""
+        from loguru import logger
+
+        if reader.at_eof():
+            # Cliente desistiu enquanto o comando esperava a vez
+            return "cancelado"
+
+        task = asyncio.ensure_future(self.handlers[command](terminal, **args))
+        disconnected = asyncio.ensure_future(reader.read())
+        await asyncio.wait({task, disconnected}, return_when=asyncio.FIRST_COMPLETED)
+
+        if not task.done():
+            logger.info("Cliente desconectou, cancelando {}", command)
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+            return "cancelado"
+        disconnected.cancel()
+        if task.cancelled():
+            return "cancelado"
+        if error := task.exception():
+            logger.opt(exception=error).error("Comando {} falhou no daemon", command)
+            return str(error)
+        return None
+
+
+def _terminal(request: dict[str, Any], writer: asyncio.StreamWriter) -> Terminal:
+    """Console no socket, com largura e cores do terminal do cliente, e cwd do cliente."""
+    from rich.console import Console
+
+    from .terminal import Terminal
+
+    console = Console(
+        file=_SocketFile(writer),  # type: ignore[arg-type]
+        width=request.get("width", 80),
+        force_terminal=request.get("terminal", False),
+        color_system=request.get("color_system"),
+    )
+    return Terminal(console, Path(request.get("cwd") or Path.cwd()))
+
+
+async def serve() -> None:
+    """
+    Sobe o daemon: conecta o pool e atende até SIGTERM/SIGINT ou `daemon --stop`.
+
+    Levanta RuntimeError se já houver um daemon no socket.
+    """
+    from loguru import logger
+    from rich.console import Console
+
+    from .client import get_client
+
+    console = Console()
+    server = DaemonServer(socket_path(), default_handlers())
+    try:
+        # Conexão e autorização uma vez, antes de aceitar comandos
+        async with get_client() as client:
+            if not await client.client.is_user_authorized():
+                console.print("[red]Sessão não autorizada: rode 'telegram-gfcr auth' antes[/]")
+                return
+
+        await server.start()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, server.stopped.set)
+
+        logger.info("Daemon atendendo em {}", server.path)
+        console.print(f"[green]✓ Daemon atendendo em {server.path}[/] [dim](Ctrl+C encerra)[/]")
+        await server.stopped.wait()
+    finally:
+        # Desconexão do pool e dump de métricas ficam com `run_async`
+        await server.close()
@@ -0,0 +1,73 @@
+"""Cache persistente da lista de diálogos (TTL + stale-while-revalidate)."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+
+from loguru import logger
+
+from ..config import get_settings
+from .client import get_client, spawn_background
+from .models import DialogInfo, filter_dialogs
+from .state import StateStore
+
+# Refresh em andamento (evita disparar vários em paralelo no REPL)
+_refresh_task: asyncio.Task[list[DialogInfo]] | None = None
+
+
+async def refresh_dialogs() -> list[DialogInfo]:
+    """Busca todos os diálogos no Telegram e regrava o cache."""
+    async with get_client() as client:
+        dialogs = await client.get_dialogs()
+
+    async with StateStore() as state:
+        await state.save_dialogs(dialogs, time.time())
+
+    logger.info("Cache de diálogos atualizado: {} diálogos", len(dialogs))
+    return dialogs
+
+
+async def _refresh_quietly() -> list[DialogInfo]:
+    """Refresh em segundo plano: falhas só vão para o log."""
+    try:
+        return await refresh_dialogs()
+    except Exception as e:
+        logger.warning("Falha ao atualizar cache de diálogos: {}", e)
+        return []
+
+
+async def get_dialogs(
+    entity_type: str = "all", refresh: bool = False
+) -> tuple[list[DialogInfo], float]:
+    """
+    Retorna diálogos do cache local, buscando no Telegram só quando preciso.
+
+    - Sem cache ou com `refresh`: busca agora (e grava o cache).
+    - Cache dentro do TTL: responde direto do disco, sem conectar.
+    - Cache vencido: responde com o cache e agenda refresh em segundo plano
+      (stale-while-revalidate); a próxima chamada já vê a lista nova. No modo
+      one-shot o refresh tem um prazo curto ao sair (ver `run_async`).
+
+    Returns:
+        (diálogos filtrados, idade do cache em segundos)
+    """
+    global _refresh_task
+
+    async with StateStore() as state:
+        cached, updated_at = await state.load_dialogs()
+
+    if refresh or updated_at is None:
+        return filter_dialogs(await refresh_dialogs(), entity_type), 0.0
+
+    age = time.time() - updated_at
+    if age > get_settings().dialog_cache_ttl and (_refresh_task is None or _refresh_task.done()):
+        logger.debug("Cache de diálogos com {:.0f}s, atualizando em segundo plano", age)
+        _refresh_task = spawn_background(_refresh_quietly())
+
+    return filter_dialogs(cached, entity_type), age
+
+
+def is_refreshing() -> bool:
+    """Indica se há refresh do cache em andamento."""
+    return _refresh_task is not None and not _refresh_task.done()
@@ -1,15 +1,19 @@
 """Exceções customizadas e decorators para error handling do Telethon."""
 
 import asyncio
+import time
 from collections.abc import Callable
 from functools import wraps
-from typing import Any, TypeVar
+from typing import TYPE_CHECKING, Any, TypeVar
 
 from loguru import logger
-from rich.console import Console
-from telethon import errors
 
-console = Console()
+from .metrics import get_metrics
+from .terminal import console
+
+if TYPE_CHECKING:
+    from .ratelimit import RateLimiter
+
 T = TypeVar("T")
 
 
@@ -51,6 +55,9 @@ def handle_telethon_errors(operation_name: str) -> Callable:
     """
     Decorator que converte exceções do Telethon em exceções customizadas.
 
+    Também registra métricas da operação: chamadas, latência, erros pela
+    classe original do Telethon e segundos de FloodWait/SlowMode.
+
     Usage:
         @handle_telethon_errors("authenticate")
         async def authenticate(self, phone: str) -> bool:
@@ -60,34 +67,60 @@ def handle_telethon_errors(operation_name: str) -> Callable:
     def decorator(func: Callable[..., T]) -> Callable[..., T]:
         @wraps(func)
         async def wrapper(*args: Any, **kwargs: Any) -> T:
+            metrics = get_metrics()
+            started = time.perf_counter()
+            try:
+                result = await _convert(*args, **kwargs)
+            except TelegramError as e:
+                elapsed = time.perf_counter() - started
+                metrics.observe(operation_name, elapsed, e.original_error or e)
+                if isinstance(e, RateLimitError):
+                    metrics.flood(operation_name, e.wait_seconds)
+                raise
+            metrics.observe(operation_name, time.perf_counter() - started)
+            return result
+
+        # Lido por retry_on_flood para contar retries sob o mesmo nome
+        wrapper.operation_name = operation_name  # type: ignore[attr-defined]
+
+        async def _convert(*args: Any, **kwargs: Any) -> T:
+            # Import tardio: carregar o Telethon custa caro e comandos locais
+            # (index, stats, --help) não devem pagar por ele
+            from telethon import errors
+
             try:
                 return await func(*args, **kwargs)
 
+            # Já convertido por uma operação interna (ex: `resolve`): repassa
+            # como está, sem virar "Erro inesperado" no fallback abaixo
+            except TelegramError:
+                raise
+
             # ===== AUTENTICAÇÃO =====
             except errors.PhoneCodeInvalidError as e:
-                logger.error(f"{operation_name}: Código inválido")
+                logger.error("{}: Código inválido", operation_name)
                 raise AuthenticationError(
                     "Código de autenticação inválido.", original_error=e
                 ) from e
 
             except errors.PhoneCodeExpiredError as e:
-                logger.error(f"{operation_name}: Código expirado")
+                logger.error("{}: Código expirado", operation_name)
                 raise AuthenticationError(
                     "Código expirado. Solicite um novo.", original_error=e
                 ) from e
 
             except errors.SessionPasswordNeededError as e:
-                logger.error(f"{operation_name}: 2FA habilitado")
+                logger.error("{}: 2FA habilitado", operation_name)
                 raise AuthenticationError(
                     "2FA habilitado. Não suportado ainda.", original_error=e
                 ) from e
 
             except errors.PhoneNumberInvalidError as e:
-                logger.error(f"{operation_name}: Número inválido")
+                logger.error("{}: Número inválido", operation_name)
                 raise AuthenticationError("Número de telefone inválido.", original_error=e) from e
 
             except errors.AuthKeyUnregisteredError as e:
-                logger.error(f"{operation_name}: Sessão não autorizada")
+                logger.error("{}: Sessão não autorizada", operation_name)
                 raise AuthenticationError(
                     "Sessão expirada. Execute 'telegram-gfcr auth <phone>'.", original_error=e
                 ) from e
@@ -95,7 +128,7 @@ def handle_telethon_errors(operation_name: str) -> Callable:
             # ===== RATE LIMITING =====
             except errors.FloodWaitError as e:
                 wait_time = e.seconds
-                logger.warning(f"{operation_name}: FloodWait de {wait_time}s")
+                logger.warning("{}: FloodWait de {}s", operation_name, wait_time)
                 raise RateLimitError(
                     f"Rate limit atingido. Aguarde {wait_time} segundos.",
                     wait_seconds=wait_time,
@@ -104,7 +137,7 @@ def handle_telethon_errors(operation_name: str) -> Callable:
 
             except errors.SlowModeWaitError as e:
                 wait_time = e.seconds
-                logger.warning(f"{operation_name}: SlowMode {wait_time}s")
+                logger.warning("{}: SlowMode {}s", operation_name, wait_time)
                 raise RateLimitError(
                     f"Modo lento ativo. Aguarde {wait_time} segundos.",
                     wait_seconds=wait_time,
@@ -113,51 +146,51 @@ def handle_telethon_errors(operation_name: str) -> Callable:
 
             # ===== PERMISSÕES =====
             except errors.ChatAdminRequiredError as e:
-                logger.error(f"{operation_name}: Admin required")
+                logger.error("{}: Admin required", operation_name)
                 raise TelegramPermissionError(
                     "Você precisa ser admin para executar esta operação.", original_error=e
                 ) from e
 
             except errors.ChannelPrivateError as e:
-                logger.error(f"{operation_name}: Canal privado")
+                logger.error("{}: Canal privado", operation_name)
                 raise TelegramPermissionError(
                     "Canal privado ou você não tem acesso.", original_error=e
                 ) from e
 
             except errors.UserBannedInChannelError as e:
-                logger.error(f"{operation_name}: Usuário banido")
+                logger.error("{}: Usuário banido", operation_name)
                 raise TelegramPermissionError(
                     "Você está banido deste canal.", original_error=e
                 ) from e
 
             except errors.ChatWriteForbiddenError as e:
-                logger.error(f"{operation_name}: Escrita proibida")
+                logger.error("{}: Escrita proibida", operation_name)
                 raise TelegramPermissionError(
                     "Sem permissão para escrever neste chat.", original_error=e
                 ) from e
 
             # ===== ENTIDADES/MENSAGENS =====
             except errors.PeerIdInvalidError as e:
-                logger.error(f"{operation_name}: ID inválido")
+                logger.error("{}: ID inválido", operation_name)
                 raise TelegramError("ID inválido. Verifique o número.", original_error=e) from e
 
             except errors.MessageIdInvalidError as e:
-                logger.warning(f"{operation_name}: Mensagem inválida")
+                logger.warning("{}: Mensagem inválida", operation_name)
                 raise TelegramError("Mensagem não pode ser processada.", original_error=e) from e
 
             # ===== MÍDIA =====
             except errors.FileReferenceExpiredError as e:
-                logger.warning(f"{operation_name}: Referência expirada")
+                logger.warning("{}: Referência expirada", operation_name)
                 raise TelegramError("Referência de arquivo expirada.", original_error=e) from e
 
             # ===== GENÉRICO RPC =====
             except errors.RPCError as e:
-                logger.error(f"{operation_name}: RPC error: {e}")
+                logger.error("{}: RPC error: {}", operation_name, e)
                 raise TelegramError(f"Erro do Telegram: {e}", original_error=e) from e
 
             # ===== FALLBACK =====
             except Exception as e:
-                logger.exception(f"{operation_name}: Erro inesperado")
+                logger.exception("{}: Erro inesperado", operation_name)
                 raise TelegramError(f"Erro inesperado: {e}", original_error=e) from e
 
         return wrapper  # type: ignore[return-value]
@@ -165,16 +198,32 @@ def handle_telethon_errors(operation_name: str) -> Callable:
     return decorator
 
 
-def retry_on_flood(max_retries: int = 3, base_delay: float = 1.0) -> Callable:
+async def _rate_limiter() -> "RateLimiter":
+    """Limiter do pool global (import tardio: client importa este módulo)."""
+    from .client import get_pool
+
+    return (await get_pool()).rate_limiter
+
+
+def retry_on_flood(
+    max_retries: int = 3, base_delay: float = 1.0, rate_class: str | None = None
+) -> Callable:
     """
     Decorator para retry automático em FloodWaitError com backoff exponencial.
 
+    Aceita tanto o `FloodWaitError` cru quanto o `RateLimitError` produzido por
+    `handle_telethon_errors` logo abaixo dele na pilha de decorators.
+
     Args:
         max_retries: Número máximo de tentativas
         base_delay: Delay base para backoff (dobra a cada retry)
+        rate_class: Classe do rate limiter global (ex: "forward", "media").
+            Quando informada, cada tentativa aguarda um token antes da chamada
+            e a espera do FloodWait é aplicada ao bucket da classe, pausando
+            também as outras tarefas que a compartilham.
 
     Usage:
-        @retry_on_flood(max_retries=3)
+        @retry_on_flood(max_retries=3, rate_class="media")
         @handle_telethon_errors("download_media")
         async def download_media(message, path):
             await message.download_media(file=path)
@@ -183,18 +232,25 @@ def retry_on_flood(max_retries: int = 3, base_delay: float = 1.0) -> Callable:
     def decorator(func: Callable[..., T]) -> Callable[..., T]:
         @wraps(func)
         async def wrapper(*args: Any, **kwargs: Any) -> T:
+            from telethon import errors
+
             retries = 0
+            limiter = await _rate_limiter() if rate_class else None
 
             while retries <= max_retries:
+                if limiter and rate_class:
+                    await limiter.acquire(rate_class)
+
                 try:
-                    return await func(*args, **kwargs)
+                    result = await func(*args, **kwargs)
 
-                except errors.FloodWaitError as e:
-                    wait_time = e.seconds
+                except (errors.FloodWaitError, RateLimitError) as e:
+                    wait_time = e.wait_seconds if isinstance(e, RateLimitError) else e.seconds
                     retries += 1
+                    get_metrics().retry(getattr(func, "operation_name", func.__name__))
 
                     if retries > max_retries:
-                        logger.error(f"Max retries ({max_retries}) atingido para FloodWait")
+                        logger.error("Max retries ({}) atingido para FloodWait", max_retries)
                         raise RateLimitError(
                             f"Rate limit persistente após {max_retries} tentativas.",
                             wait_seconds=wait_time,
@@ -206,14 +262,27 @@ def retry_on_flood(max_retries: int = 3, base_delay: float = 1.0) -> Callable:
                     actual_wait = max(wait_time, backoff)
 
                     logger.warning(
-                        f"FloodWait {wait_time}s. Retry {retries}/{max_retries} em {actual_wait}s"
+                        "FloodWait {}s. Retry {}/{} em {}s",
+                        wait_time,
+                        retries,
+                        max_retries,
+                        actual_wait,
                     )
                     console.print(
                         f"[yellow]⏳ Rate limit. Aguardando {actual_wait:.0f}s... "
                         f"(tentativa {retries}/{max_retries})[/]"
                     )
 
-                    await asyncio.sleep(actual_wait)
+                    if limiter and rate_class:
+                        # A espera acontece no próximo acquire (para todos da classe)
+                        limiter.on_flood(rate_class, actual_wait)
+                    else:
+                        await asyncio.sleep(actual_wait)
+
+                else:
+                    if limiter and rate_class:
+                        limiter.on_success(rate_class)
+                    return result
 
             raise RuntimeError("Retry loop terminou sem retornar")
 
@@ -0,0 +1,276 @@
+"""Índice de busca full-text (SQLite FTS5) sobre os backups locais."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from types import TracebackType
+from typing import Any
+
+import aiosqlite
+from loguru import logger
+
+from ..config import get_settings
+from .serialization import load_message
+from .storage import LEGACY_FILE, Segment, list_segments
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS messages (
+    rowid INTEGER PRIMARY KEY,
+    entity_id INTEGER NOT NULL,
+    message_id INTEGER NOT NULL,
+    date INTEGER NOT NULL,
+    sender_id INTEGER,
+    text TEXT NOT NULL,
+    UNIQUE (entity_id, message_id)
+);
+
+CREATE INDEX IF NOT EXISTS messages_date ON messages (date);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS messages_fts USING fts5(
+    text,
+    content='messages',
+    content_rowid='rowid',
+    tokenize='unicode61 remove_diacritics 2'
+);
+
+CREATE TRIGGER IF NOT EXISTS messages_ai AFTER INSERT ON messages BEGIN
+    INSERT INTO messages_fts (rowid, text) VALUES (new.rowid, new.text);
+END;
+
+CREATE TRIGGER IF NOT EXISTS messages_ad AFTER DELETE ON messages BEGIN
+    INSERT INTO messages_fts (messages_fts, rowid, text) VALUES ('delete', old.rowid, old.text);
+END;
+
+CREATE TRIGGER IF NOT EXISTS messages_au AFTER UPDATE ON messages BEGIN
+    INSERT INTO messages_fts (messages_fts, rowid, text) VALUES ('delete', old.rowid, old.text);
+    INSERT INTO messages_fts (rowid, text) VALUES (new.rowid, new.text);
+END;
+
+CREATE TABLE IF NOT EXISTS indexed_files (
+    path TEXT PRIMARY KEY,
+    offset INTEGER NOT NULL
+);
+"""
+
+# Marcadores de destaque do snippet (trocados por markup Rich na exibição)
+HIGHLIGHT_START = "\x02"
+HIGHLIGHT_END = "\x03"
+
+# Linhas inseridas por transação no carregamento em massa
+CHUNK_SIZE = 1000
+
+
+@dataclass(slots=True)
+class LocalHit:
+    """Resultado de busca no índice local."""
+
+    entity_id: int
+    message_id: int
+    date: datetime
+    sender_id: int | None
+    snippet: str
+
+
+def _parse_line(line: str) -> tuple[int, int, int, int | None, str] | None:
+    """Extrai (entity_id, message_id, date, sender_id, texto) de uma linha do backup."""
+    message = load_message(line)
+    if not message.text or message.chat_id is None:
+        return None
+    sender_id = message.sender_id or message.chat_id
+    return message.chat_id, message.id, message.date, sender_id, message.text
+
+
+def fts_query(query: str) -> str:
+    """Escapa termos do usuário para a sintaxe FTS5 (todos os termos, como frases)."""
+    terms = [term.replace('"', '""') for term in query.split()]
+    return " ".join(f'"{term}"' for term in terms)
+
+
+class SearchIndex:
+    """Banco do índice (`index.db`) sob `Settings.data_dir`."""
+
+    def __init__(self, path: Path | None = None) -> None:
+        self.path = path or get_settings().ensure_data_dir() / "index.db"
+        self._db: aiosqlite.Connection | None = None
+
+    async def open(self) -> SearchIndex:
+        """Abre conexão e garante o schema."""
+        if self._db is None:
+            self._db = await aiosqlite.connect(self.path)
+            await self._db.execute("PRAGMA journal_mode=WAL")
+            await self._db.execute("PRAGMA synchronous=NORMAL")
+            await self._db.executescript(SCHEMA)
+            await self._db.commit()
+        return self
+
+    async def close(self) -> None:
+        """Fecha conexão."""
+        if self._db is not None:
+            await self._db.close()
+            self._db = None
+
+    async def __aenter__(self) -> SearchIndex:
+        return await self.open()
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        await self.close()
+
+    @property
+    def db(self) -> aiosqlite.Connection:
+        """Conexão aberta."""
+        if self._db is None:
+            raise RuntimeError("SearchIndex não foi aberto")
+        return self._db
+
+    async def index_file(self, path: Path) -> int:
+        """
+        Indexa incrementalmente um `messages.jsonl`.
+
+        Guarda o offset já lido de cada arquivo: execuções seguintes leem só o
+        que o backup acrescentou. Linha final incompleta (backup em andamento)
+        fica para a próxima vez. Mensagens repetidas atualizam o texto.
+
+        Returns:
+            Quantidade de linhas indexadas
+        """
+        key = str(path.resolve())
+        offset = await self._read_offset(key)
+
+        if path.stat().st_size < offset:
+            # Arquivo recriado: recomeça do início
+            offset = 0
+
+        count = 0
+        rows: list[tuple[int, int, int, int | None, str]] = []
+        with path.open("rb") as f:
+            f.seek(offset)
+            for raw in f:
+                if not raw.endswith(b"\n"):
+                    break
+                offset += len(raw)
+                if parsed := _parse_line(raw.decode("utf-8")):
+                    rows.append(parsed)
+                if len(rows) >= CHUNK_SIZE:
+                    count += await self._insert(rows, key, offset)
+                    rows = []
+
+        count += await self._insert(rows, key, offset)
+        logger.info("Índice: {} mensagens de {}", count, path)
+        return count
+
+    async def _read_offset(self, key: str) -> int:
+        """Offset já indexado do arquivo (0 se nunca visto)."""
+        async with self.db.execute(
+            "SELECT offset FROM indexed_files WHERE path = ?", (key,)
+        ) as cursor:
+            row = await cursor.fetchone()
+        return row[0] if row else 0
+
+    async def _insert(
+        self, rows: list[tuple[int, int, int, int | None, str]], key: str, offset: int
+    ) -> int:
+        """Grava um lote e o offset lido na mesma transação."""
+        await self.db.executemany(
+            "INSERT INTO messages (entity_id, message_id, date, sender_id, text) "
+            "VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT (entity_id, message_id) DO UPDATE SET "
+            "text = excluded.text, date = excluded.date, sender_id = excluded.sender_id",
+            rows,
+        )
+        await self.db.execute(
+            "INSERT INTO indexed_files (path, offset) VALUES (?, ?) "
+            "ON CONFLICT (path) DO UPDATE SET offset = excluded.offset",
+            (key, offset),
+        )
+        await self.db.commit()
+        return len(rows)
+
+    async def index_segment(self, segment: Segment) -> int:
+        """
+        Indexa incrementalmente um segmento, bloco a bloco via `.idx.jsonl`.
+
+        O offset guardado é o fim do último bloco lido; blocos comprimidos são
+        descomprimidos isoladamente, sem reler o segmento inteiro.
+        """
+        key = str(segment.path.resolve())
+        offset = await self._read_offset(key)
+
+        count = 0
+        for block in segment.blocks():
+            if block.offset < offset:
+                continue
+            rows = [parsed for line in segment.read_block(block) if (parsed := _parse_line(line))]
+            count += await self._insert(rows, key, block.offset + block.size)
+
+        logger.info("Índice: {} mensagens de {}", count, segment.path)
+        return count
+
+    async def index_tree(self, root: Path) -> int:
+        """Indexa todos os backups (arquivo legado e segmentos) sob `root`."""
+        directories = {path.parent for path in root.rglob(LEGACY_FILE)}
+        directories |= {path.parent for path in root.rglob("messages.*.idx.jsonl")}
+        # Diretórios ocultos são temporários (faixas do `backup --ranges`)
+        directories = {
+            directory
+            for directory in directories
+            if not any(part.startswith(".") for part in directory.relative_to(root).parts)
+        }
+
+        total = 0
+        for directory in sorted(directories):
+            legacy = directory / LEGACY_FILE
+            if legacy.exists():
+                total += await self.index_file(legacy)
+            for segment in list_segments(directory):
+                total += await self.index_segment(segment)
+        return total
+
+    async def search(
+        self,
+        query: str,
+        entity_id: int | None = None,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        sender_id: int | None = None,
+        limit: int = 20,
+    ) -> list[LocalHit]:
+        """Busca por relevância (bm25), com filtros de chat, data e remetente."""
+        if not query.strip():
+            # `MATCH ''` é erro de sintaxe no FTS5
+            return []
+        sql = (
+            "SELECT m.entity_id, m.message_id, m.date, m.sender_id, "
+            f"snippet(messages_fts, 0, '{HIGHLIGHT_START}', '{HIGHLIGHT_END}', '…', 16) "
+            "FROM messages_fts JOIN messages m ON m.rowid = messages_fts.rowid "
+            "WHERE messages_fts MATCH ?"
+        )
+        params: list[Any] = [fts_query(query)]
+
+        if entity_id is not None:
+            sql += " AND m.entity_id = ?"
+            params.append(entity_id)
+        if since is not None:
+            sql += " AND m.date >= ?"
+            params.append(int(since.timestamp()))
+        if until is not None:
+            sql += " AND m.date < ?"
+            params.append(int(until.timestamp()))
+        if sender_id is not None:
+            sql += " AND m.sender_id = ?"
+            params.append(sender_id)
+
+        sql += " ORDER BY bm25(messages_fts), m.date DESC LIMIT ?"
+        params.append(limit)
+
+        async with self.db.execute(sql, params) as cursor:
+            return [
+                LocalHit(row[0], row[1], datetime.fromtimestamp(row[2]), row[3], row[4])
+                for row in await cursor.fetchall()
+            ]
@@ -1,20 +1,34 @@
 """Configuração estruturada do Loguru."""
 
+import logging
 import sys
+from collections import Counter
 
 from loguru import logger
 
 from ..config import get_settings
+from .metrics import TelethonFloodHandler
+
+# Eventos amostrados por chave (ver `sampled`)
+_samples: Counter[str] = Counter()
 
 
 def setup_logging() -> None:
-    """Configura loguru com rotação de arquivos e console."""
+    """
+    Configura loguru com rotação de arquivos e console.
+
+    Os sinks de arquivo usam `enqueue=True`: o event loop só enfileira o
+    registro e a escrita acontece em uma thread do loguru. O contexto ligado
+    com `bind`/`contextualize` (command, entity_id, message_id) vai para o
+    sink JSON lines, quando habilitado.
+    """
     settings = get_settings()
     log_dir = settings.ensure_data_dir() / "logs"
     log_dir.mkdir(exist_ok=True)
 
-    # Remove handler padrão
+    # Remove handler padrão (e os de uma configuração anterior, no reload)
     logger.remove()
+    _samples.clear()
 
     # Console output (apenas se debug=True)
     if settings.debug:
@@ -35,6 +49,50 @@ def setup_logging() -> None:
         retention="7 days",  # Mantém últimos 7 dias
         level="INFO",
         format="{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {name}:{function}:{line} - {message}",
+        enqueue=True,
     )
 
+    # JSON lines com o contexto ligado (opcional)
+    if settings.log_json:
+        logger.add(
+            log_dir / "telegram_gfcr_{time:YYYY-MM-DD}.jsonl",
+            rotation="00:00",
+            retention="7 days",
+            level="DEBUG" if settings.debug else "INFO",
+            serialize=True,
+            enqueue=True,
+        )
+
+    _capture_telethon_floods()
+
     logger.info("Logging configurado")
+
+
+def _capture_telethon_floods() -> None:
+    """
+    Conta nas métricas os FloodWaits que o Telethon dorme sem levantar erro.
+
+    O Telethon só os anuncia em INFO no logger `telethon.client.users`; o nível
+    é baixado para INFO apenas se estiver acima disso. Idempotente (reload).
+    """
+    telethon_logger = logging.getLogger("telethon.client.users")
+    if not any(isinstance(h, TelethonFloodHandler) for h in telethon_logger.handlers):
+        telethon_logger.addHandler(TelethonFloodHandler())
+    if telethon_logger.getEffectiveLevel() > logging.INFO:
+        telethon_logger.setLevel(logging.INFO)
+
+
+def sampled(key: str) -> bool:
+    """
+    Amostragem de eventos por mensagem: True para 1 a cada `log_sample_every`.
+
+    O primeiro evento de cada chave sempre passa. Use antes da chamada de log
+    em loops quentes, para nem montar o registro dos eventos descartados:
+
+        if sampled("backup.media"):
+            logger.debug("Mídia baixada msg {message_id}", message_id=message.id)
+    """
+    every = get_settings().log_sample_every
+    count = _samples[key]
+    _samples[key] = count + 1
+    return every <= 1 or count % every == 0
@@ -0,0 +1,342 @@
+"""Pool de workers para download concorrente de mídias e media store compartilhado."""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import os
+from collections import Counter
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
+from types import TracebackType
+from typing import TYPE_CHECKING, Any
+
+from loguru import logger
+
+from ..config import get_settings
+from .errors import RateLimitError, handle_telethon_errors, retry_on_flood
+from .logging import sampled
+from .models import MediaObject
+from .state import StateStore
+
+if TYPE_CHECKING:
+    from .transfer import ParallelTransfer
+
+# Callback de progresso em bytes: (id da mensagem, recebidos, total)
+ProgressCallback = Callable[[int, int, int], None]
+
+# Tipos aceitos em `--media-type`, na ordem em que são testados (um GIF ou um
+# sticker também é documento; uma nota de vídeo também é vídeo)
+MEDIA_TYPES = ("photo", "sticker", "gif", "video_note", "voice", "video", "audio", "document")
+
+
+@retry_on_flood(max_retries=3, rate_class="media")
+@handle_telethon_errors("download_media")
+async def download_media_with_retry(
+    message: Any,
+    target: Path,
+    transfer: ParallelTransfer | None = None,
+    on_progress: ProgressCallback | None = None,
+) -> None:
+    """
+    Download de mídia com retry automático em FloodWait.
+
+    `target` é um diretório (nome escolhido pelo Telethon) ou o arquivo final.
+    Documentos grandes vão pelo `transfer` (partes em paralelo), se houver; se
+    ele falhar, o mesmo arquivo é baixado pelo caminho normal.
+    """
+    if transfer is None or not transfer.should_split(message):
+        await message.download_media(file=str(target))
+        return
+
+    path = target
+    if target.is_dir():
+        # Mesmo nome do MediaStore: arquivos homônimos não se sobrescrevem
+        name = message.file.name
+        path = target / (f"{message.id}_{name}" if name else f"{message.id}{message.file.ext}")
+
+    def _progress(received: int, total: int) -> None:
+        if on_progress:
+            on_progress(message.id, received, total)
+
+    try:
+        await transfer.download(message, path, on_progress=_progress)
+    except Exception as e:
+        logger.warning(
+            "Mídia msg {}: download em partes falhou ({!r}), usando o normal", message.id, e
+        )
+        await message.download_media(file=str(path))
+
+
+def media_key(message: Any) -> str | None:
+    """Chave estável da mídia no Telegram (`photo-<id>`/`document-<id>`), se houver."""
+    if message.photo is not None:
+        return f"photo-{message.photo.id}"
+    if message.document is not None:
+        return f"document-{message.document.id}"
+    return None
+
+
+def media_type(message: Any) -> str | None:
+    """Tipo da mídia para os filtros (um de `MEDIA_TYPES`), None se não houver arquivo."""
+    for kind in MEDIA_TYPES:
+        if getattr(message, kind, None) is not None:
+            return kind
+    return None
+
+
+@dataclass(frozen=True, slots=True)
+class MediaFilter:
+    """Quais mídias baixar, decidido antes de a mensagem entrar na fila."""
+
+    types: frozenset[str] | None = None
+    max_bytes: int | None = None
+
+    @classmethod
+    def parse(cls, types: str | None, max_mb: float | None) -> MediaFilter:
+        """
+        Monta o filtro a partir do CLI (`photo,video` e tamanho em MB).
+
+        Raises:
+            ValueError: tipo desconhecido ou tamanho negativo
+        """
+        wanted = None
+        if types:
+            wanted = frozenset(kind.strip() for kind in types.split(",") if kind.strip())
+            if unknown := wanted - set(MEDIA_TYPES):
+                raise ValueError(
+                    f"Tipo de mídia inválido: {', '.join(sorted(unknown))} "
+                    f"(use {', '.join(MEDIA_TYPES)})"
+                )
+        if max_mb is not None and max_mb < 0:
+            raise ValueError("Tamanho máximo de mídia não pode ser negativo")
+        max_bytes = int(max_mb * 1024 * 1024) if max_mb is not None else None
+        return cls(wanted, max_bytes)
+
+    def accepts(self, message: Any) -> bool:
+        """Indica se a mídia da mensagem deve ser baixada."""
+        if self.types is not None and media_type(message) not in self.types:
+            return False
+        if self.max_bytes is not None:
+            size = message.file.size if message.file else None
+            if size is not None and size > self.max_bytes:
+                return False
+        return True
+
+
+def _sha256(path: Path) -> str:
+    with path.open("rb") as f:
+        return hashlib.file_digest(f, "sha256").hexdigest()
+
+
+class MediaStore:
+    """
+    Armazenamento de mídias endereçado pelo id do Telegram, compartilhado
+    entre todos os backups (`data_dir/media_store`).
+
+    Um sticker ou vídeo repostado em vários chats é baixado uma única vez;
+    cada backup recebe um hardlink para o objeto (ou, em outro filesystem,
+    uma referência em `media/manifest.jsonl`). O sha256 é calculado ao
+    gravar e conferido no primeiro reaproveitamento de cada objeto na
+    execução: um arquivo truncado ou corrompido é baixado de novo.
+    """
+
+    def __init__(self, state: StateStore, root: Path | None = None) -> None:
+        self.state = state
+        self.root = root or get_settings().ensure_data_dir() / "media_store"
+        self.hits = 0
+        self.downloads = 0
+        # Lock por chave enquanto houver quem a use; conferidas ficam em `_verified`
+        self._locks: dict[str, asyncio.Lock] = {}
+        self._users: Counter[str] = Counter()
+        self._verified: set[str] = set()
+
+    async def fetch(
+        self,
+        message: Any,
+        transfer: ParallelTransfer | None = None,
+        on_progress: ProgressCallback | None = None,
+    ) -> Path | None:
+        """Caminho do objeto no store, baixando apenas se ainda não estiver lá."""
+        key = media_key(message)
+        if key is None:
+            return None
+
+        # Mesma mídia em dois workers ao mesmo tempo: o segundo espera o primeiro
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        self._users[key] += 1
+        try:
+            async with lock:
+                return await self._fetch(key, message, transfer, on_progress)
+        finally:
+            self._users[key] -= 1
+            if not self._users[key]:
+                del self._users[key], self._locks[key]
+
+    async def _fetch(
+        self,
+        key: str,
+        message: Any,
+        transfer: ParallelTransfer | None,
+        on_progress: ProgressCallback | None,
+    ) -> Path:
+        obj = await self.state.get_media_object(key)
+        if obj is not None and await self._intact(obj):
+            self.hits += 1
+            return Path(obj.path)
+        if obj is not None:
+            logger.warning("Objeto {} ausente ou alterado no media store, baixando", key)
+
+        kind, _, object_id = key.partition("-")
+        ext = message.file.ext if message.file else ""
+        target = self.root / kind / object_id[-2:] / f"{object_id}{ext}"
+        target.parent.mkdir(parents=True, exist_ok=True)
+        partial = target.with_name(target.name + ".part")
+
+        await download_media_with_retry(message, partial, transfer, on_progress)
+        partial.replace(target)
+        digest = await asyncio.to_thread(_sha256, target)
+        await self.state.save_media_object(
+            MediaObject(key, str(target), target.stat().st_size, digest)
+        )
+        self._verified.add(key)
+        self.downloads += 1
+        return target
+
+    async def _intact(self, obj: MediaObject) -> bool:
+        """Objeto presente com o tamanho gravado; o sha256 é conferido uma vez por execução."""
+        path = Path(obj.path)
+        if not path.exists() or path.stat().st_size != obj.size:
+            return False
+        if obj.key not in self._verified:
+            if await asyncio.to_thread(_sha256, path) != obj.sha256:
+                return False
+            self._verified.add(obj.key)
+        return True
+
+    def link(self, message: Any, source: Path, media_dir: Path) -> None:
+        """Expõe o objeto no diretório de mídia do backup."""
+        name = message.file.name if message.file else None
+        target = media_dir / (f"{message.id}_{name}" if name else f"{message.id}{source.suffix}")
+        if target.exists():
+            return
+        try:
+            os.link(source, target)
+        except OSError:
+            # Store em outro filesystem: referência no manifest em vez de cópia
+            entry = {"message_id": message.id, "file": target.name, "object": str(source)}
+            with (media_dir / "manifest.jsonl").open("a", encoding="utf-8") as f:
+                f.write(json.dumps(entry) + "\n")
+
+
+class MediaDownloadPool:
+    """
+    Produtor/consumidor limitado para downloads de mídia.
+
+    O iterador de mensagens enfileira com `put` e segue buscando/gravando JSON
+    enquanto `workers` tarefas drenam a fila. Com a fila cheia, `put` bloqueia
+    (backpressure), limitando a memória ocupada por mensagens pendentes. Cada
+    worker trata FloodWait sozinho via `retry_on_flood`, sem parar os demais.
+    Com `store`, fotos e documentos passam pelo media store compartilhado;
+    com `transfer`, documentos grandes são baixados em partes paralelas.
+
+    Usage:
+        async with MediaDownloadPool(media_dir, workers=4, on_result=cb) as pool:
+            async for message in client.iter_messages(entity_id):
+                if message.media:
+                    await pool.put(message)
+    """
+
+    def __init__(
+        self,
+        media_dir: Path,
+        workers: int = 4,
+        queue_size: int | None = None,
+        on_result: Callable[[int, bool], None] | None = None,
+        store: MediaStore | None = None,
+        transfer: ParallelTransfer | None = None,
+        on_progress: ProgressCallback | None = None,
+    ) -> None:
+        self.media_dir = media_dir
+        self.store = store
+        self.transfer = transfer
+        self.on_progress = on_progress
+        self.workers = max(1, workers)
+        self._queue: asyncio.Queue[Any] = asyncio.Queue(maxsize=queue_size or self.workers * 8)
+        self._on_result = on_result
+        self._tasks: list[asyncio.Task[None]] = []
+
+    async def __aenter__(self) -> MediaDownloadPool:
+        self.start()
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        # Em erro, descarta a fila: as mídias ficam pendentes no state DB
+        await self.close(drain=exc_type is None)
+
+    @property
+    def pending(self) -> int:
+        """Mídias na fila aguardando um worker."""
+        return self._queue.qsize()
+
+    def start(self) -> None:
+        """Inicia os workers."""
+        if not self._tasks:
+            self._tasks = [
+                asyncio.create_task(self._worker(n), name=f"media-worker-{n}")
+                for n in range(self.workers)
+            ]
+            logger.debug("{} workers de mídia iniciados", self.workers)
+
+    async def put(self, message: Any) -> None:
+        """Enfileira mensagem com mídia (bloqueia se a fila estiver cheia)."""
+        await self._queue.put(message)
+
+    async def close(self, drain: bool = True) -> None:
+        """Aguarda a fila esvaziar (se `drain`) e encerra os workers."""
+        if drain and self._tasks:
+            await self._queue.join()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _worker(self, n: int) -> None:
+        """Consome a fila até ser cancelado."""
+        while True:
+            message = await self._queue.get()
+            try:
+                ok = await self._download(n, message)
+                if self._on_result:
+                    self._on_result(message.id, ok)
+            finally:
+                self._queue.task_done()
+
+    async def _download(self, n: int, message: Any) -> bool:
+        """Baixa uma mídia; falhas são registradas e não derrubam o worker."""
+        try:
+            if self.store and (
+                path := await self.store.fetch(message, self.transfer, self.on_progress)
+            ):
+                self.store.link(message, path, self.media_dir)
+            else:
+                await download_media_with_retry(
+                    message, self.media_dir, self.transfer, self.on_progress
+                )
+            if sampled("media.download"):
+                logger.debug(
+                    "Worker {n}: mídia baixada msg {message_id}", n=n, message_id=message.id
+                )
+            return True
+        except RateLimitError:
+            logger.warning("Mídia msg {message_id} pulada após max retries", message_id=message.id)
+        except Exception as e:
+            logger.warning("Falha ao baixar mídia msg {message_id}: {}", e, message_id=message.id)
+        return False
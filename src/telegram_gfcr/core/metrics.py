@@ -0,0 +1,301 @@
+"""Métricas estruturadas das operações (chamadas, erros, latência, FloodWait)."""
+
+from __future__ import annotations
+
+import bisect
+import json
+import logging
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, cast
+
+from loguru import logger
+
+# Limites superiores dos buckets de latência (segundos); o último é +Inf
+BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, float("inf"))
+
+PREFIX = "telegram_gfcr"
+
+
+@dataclass(slots=True)
+class OperationStats:
+    """Contadores de uma operação (nome usado em `handle_telethon_errors`)."""
+
+    calls: int = 0
+    errors: Counter[str] = field(default_factory=Counter)
+    buckets: list[int] = field(default_factory=lambda: [0] * len(BUCKETS))
+    latency_sum: float = 0.0
+    retries: int = 0
+    flood_seconds: float = 0.0
+
+    def quantile(self, q: float) -> float | None:
+        """Quantil aproximado pelo limite superior do bucket."""
+        total = sum(self.buckets)
+        if not total:
+            return None
+        rank = q * total
+        seen = 0
+        for bound, count in zip(BUCKETS, self.buckets, strict=True):
+            seen += count
+            if seen >= rank:
+                return bound
+        return BUCKETS[-1]
+
+
+@dataclass(slots=True)
+class RateClassStats:
+    """Requisições liberadas e espera acumulada em uma classe do rate limiter."""
+
+    requests: int = 0
+    wait_seconds: float = 0.0
+
+
+@dataclass(slots=True)
+class QueueStats:
+    """Profundidade de uma fila interna, amostrada a cada item enfileirado."""
+
+    samples: int = 0
+    depth_sum: int = 0
+    max_depth: int = 0
+
+
+class Metrics:
+    """
+    Registro de métricas do processo.
+
+    Alimentado pelos decorators de erro (chamadas, erros, latência, retries,
+    FloodWait), pelo rate limiter (requisições e espera por classe), pelas
+    filas do pipeline de backup e pelos FloodWaits que o próprio Telethon
+    dorme sem levantar exceção.
+    """
+
+    def __init__(self) -> None:
+        self.started = time.time()
+        self.operations: dict[str, OperationStats] = {}
+        self.rate_classes: dict[str, RateClassStats] = {}
+        self.queues: dict[str, QueueStats] = {}
+
+    def operation(self, name: str) -> OperationStats:
+        if name not in self.operations:
+            self.operations[name] = OperationStats()
+        return self.operations[name]
+
+    def observe(self, name: str, seconds: float, error: BaseException | None = None) -> None:
+        """Registra uma chamada concluída (com ou sem erro)."""
+        stats = self.operation(name)
+        stats.calls += 1
+        stats.latency_sum += seconds
+        stats.buckets[bisect.bisect_left(BUCKETS, seconds)] += 1
+        if error is not None:
+            stats.errors[type(error).__name__] += 1
+
+    def retry(self, name: str) -> None:
+        self.operation(name).retries += 1
+
+    def flood(self, name: str, seconds: float) -> None:
+        """Soma segundos de FloodWait/SlowMode exigidos pelo servidor."""
+        self.operation(name).flood_seconds += seconds
+
+    def limiter(self, rate_class: str, waited: float) -> None:
+        """Registra uma requisição liberada pelo rate limiter e quanto ela esperou."""
+        if rate_class not in self.rate_classes:
+            self.rate_classes[rate_class] = RateClassStats()
+        stats = self.rate_classes[rate_class]
+        stats.requests += 1
+        stats.wait_seconds += waited
+
+    def queue(self, name: str, depth: int) -> None:
+        """
+        Amostra a profundidade de uma fila logo após um `put`.
+
+        Perto do limite: o consumidor (ex: a escrita em disco) é o gargalo;
+        perto de zero: a rede é.
+        """
+        if name not in self.queues:
+            self.queues[name] = QueueStats()
+        stats = self.queues[name]
+        stats.samples += 1
+        stats.depth_sum += depth
+        stats.max_depth = max(stats.max_depth, depth)
+
+    @classmethod
+    def from_snapshot(cls, data: dict[str, Any]) -> Metrics:
+        """Reconstrói a partir de um dump JSON (ex: o da execução anterior)."""
+        metrics = cls()
+        metrics.started = data["started"]
+        for name, op in data["operations"].items():
+            metrics.operations[name] = OperationStats(
+                calls=op["calls"],
+                errors=Counter(op["errors"]),
+                buckets=list(op["latency"]["buckets"].values()),
+                latency_sum=op["latency"]["sum"],
+                retries=op["retries"],
+                flood_seconds=op["flood_seconds"],
+            )
+        for name, rate in data["rate_limiter"].items():
+            metrics.rate_classes[name] = RateClassStats(rate["requests"], rate["wait_seconds"])
+        # Dumps anteriores às filas não têm a chave
+        for name, queue in data.get("queues", {}).items():
+            metrics.queues[name] = QueueStats(
+                queue["samples"], queue["depth_sum"], queue["max_depth"]
+            )
+        return metrics
+
+    # ========== EXPORTAÇÃO ==========
+
+    def snapshot(self) -> dict[str, Any]:
+        """Estado atual em estrutura serializável (formato do dump JSON)."""
+        return {
+            "started": self.started,
+            "uptime_seconds": round(time.time() - self.started, 3),
+            "operations": {
+                name: {
+                    "calls": s.calls,
+                    "errors": dict(s.errors),
+                    "latency": {
+                        "sum": round(s.latency_sum, 6),
+                        "buckets": dict(zip(map(str, BUCKETS), s.buckets, strict=True)),
+                    },
+                    "retries": s.retries,
+                    "flood_seconds": s.flood_seconds,
+                }
+                for name, s in sorted(self.operations.items())
+            },
+            "rate_limiter": {
+                name: {"requests": s.requests, "wait_seconds": round(s.wait_seconds, 3)}
+                for name, s in sorted(self.rate_classes.items())
+            },
+            "queues": {
+                name: {"samples": s.samples, "depth_sum": s.depth_sum, "max_depth": s.max_depth}
+                for name, s in sorted(self.queues.items())
+            },
+        }
+
+    def to_prometheus(self) -> str:
+        """Formato texto do Prometheus (para o textfile collector do node exporter)."""
+        lines: list[str] = []
+
+        def metric(name: str, kind: str, help_text: str) -> None:
+            lines.append(f"# HELP {PREFIX}_{name} {help_text}")
+            lines.append(f"# TYPE {PREFIX}_{name} {kind}")
+
+        def sample(name: str, value: float, **labels: str) -> None:
+            label_text = ",".join(
+                f'{key}="{_escape_label(label)}"' for key, label in labels.items()
+            )
+            lines.append(f"{PREFIX}_{name}{{{label_text}}} {value}")
+
+        ops = sorted(self.operations.items())
+
+        metric("operation_calls_total", "counter", "Chamadas por operação")
+        for name, s in ops:
+            sample("operation_calls_total", s.calls, operation=name)
+
+        metric("operation_errors_total", "counter", "Erros por operação e classe")
+        for name, s in ops:
+            for error, count in sorted(s.errors.items()):
+                sample("operation_errors_total", count, operation=name, error=error)
+
+        metric("operation_duration_seconds", "histogram", "Latência por operação")
+        for name, s in ops:
+            cumulative = 0
+            for bound, count in zip(BUCKETS, s.buckets, strict=True):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else str(bound)
+                sample("operation_duration_seconds_bucket", cumulative, operation=name, le=le)
+            sample("operation_duration_seconds_sum", s.latency_sum, operation=name)
+            sample("operation_duration_seconds_count", s.calls, operation=name)
+
+        metric("operation_retries_total", "counter", "Retries por FloodWait")
+        for name, s in ops:
+            sample("operation_retries_total", s.retries, operation=name)
+
+        metric("flood_wait_seconds_total", "counter", "Segundos de FloodWait/SlowMode")
+        for name, s in ops:
+            sample("flood_wait_seconds_total", s.flood_seconds, operation=name)
+
+        metric("rate_limiter_requests_total", "counter", "Requisições liberadas por classe")
+        for name, r in sorted(self.rate_classes.items()):
+            sample("rate_limiter_requests_total", r.requests, rate_class=name)
+
+        metric("rate_limiter_wait_seconds_total", "counter", "Espera no rate limiter por classe")
+        for name, r in sorted(self.rate_classes.items()):
+            sample("rate_limiter_wait_seconds_total", r.wait_seconds, rate_class=name)
+
+        queues = sorted(self.queues.items())
+
+        metric("queue_depth_samples_total", "counter", "Itens enfileirados por fila")
+        for name, q in queues:
+            sample("queue_depth_samples_total", q.samples, queue=name)
+
+        metric("queue_depth_sum", "counter", "Soma das profundidades amostradas")
+        for name, q in queues:
+            sample("queue_depth_sum", q.depth_sum, queue=name)
+
+        metric("queue_depth_max", "gauge", "Maior profundidade observada")
+        for name, q in queues:
+            sample("queue_depth_max", q.max_depth, queue=name)
+
+        return "\n".join(lines) + "\n"
+
+    def write_json(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.snapshot(), indent=2), encoding="utf-8")
+
+    def write_prometheus(self, path: Path) -> None:
+        """Escrita atômica: o collector nunca lê um arquivo pela metade."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_text(self.to_prometheus(), encoding="utf-8")
+        tmp.replace(path)
+
+
+def _escape_label(value: str) -> str:
+    """Escapa `\\`, `"` e quebra de linha, como pede o formato texto do Prometheus."""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class TelethonFloodHandler(logging.Handler):
+    """
+    Captura os FloodWaits que o Telethon dorme sozinho (abaixo do threshold).
+
+    Instalado no logger `telethon.client.users` por `setup_logging`.
+    """
+
+    def emit(self, record: logging.LogRecord) -> None:
+        # Mensagem: 'Sleeping%s for %ds (%s) on %s flood wait'
+        if str(record.msg).startswith("Sleeping") and len(record.args or ()) == 4:
+            _, seconds, _, request = record.args  # type: ignore[misc]
+            get_metrics().flood(f"telethon.{request}", float(cast(int, seconds)))
+
+
+# Singleton global das métricas
+_metrics: Metrics | None = None
+
+
+def get_metrics() -> Metrics:
+    """Retorna o registro de métricas do processo."""
+    global _metrics
+
+    if _metrics is None:
+        _metrics = Metrics()
+    return _metrics
+
+
+def dump_metrics() -> None:
+    """Grava o dump JSON e, se configurado, o textfile do Prometheus (ao sair)."""
+    from ..config import get_settings
+
+    metrics = get_metrics()
+    if not metrics.operations and not metrics.rate_classes and not metrics.queues:
+        return
+
+    settings = get_settings()
+    try:
+        metrics.write_json(settings.metrics_file or settings.ensure_data_dir() / "metrics.json")
+        if settings.metrics_textfile:
+            metrics.write_prometheus(settings.metrics_textfile)
+    except OSError as e:
+        logger.warning("Não foi possível gravar as métricas: {}", e)
@@ -0,0 +1,47 @@
+"""Tipos de dados compartilhados entre o cliente, os caches e os comandos."""
+
+from typing import NamedTuple
+
+# Aliases aceitos em `--type` (o help do CLI usa o plural)
+TYPE_ALIASES: dict[str, set[str]] = {
+    "users": {"user"},
+    "groups": {"group", "supergroup"},
+    "channels": {"channel"},
+}
+
+
+class DialogInfo(NamedTuple):
+    """Resumo de um diálogo (também é o formato do cache local)."""
+
+    id: int
+    name: str
+    type: str
+    unread: int
+    top_message_id: int
+
+
+class PeerInfo(NamedTuple):
+    """Dados mínimos para montar um InputPeer sem consultar o Telegram."""
+
+    id: int
+    type: str
+    access_hash: int
+    username: str | None
+    name: str
+
+
+class MediaObject(NamedTuple):
+    """Arquivo do media store compartilhado, identificado pelo id do Telegram."""
+
+    key: str
+    path: str
+    size: int
+    sha256: str
+
+
+def filter_dialogs(dialogs: list[DialogInfo], entity_type: str = "all") -> list[DialogInfo]:
+    """Filtra diálogos por tipo (`user`, `group`, ... ou os plurais do help)."""
+    if entity_type == "all":
+        return dialogs
+    wanted = TYPE_ALIASES.get(entity_type, {entity_type})
+    return [dialog for dialog in dialogs if dialog.type in wanted]
@@ -0,0 +1,131 @@
+"""Cache persistente de peers (id → tipo, access_hash, username, nome)."""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from typing import Any
+
+from loguru import logger
+from telethon import utils
+from telethon.tl.types import (
+    Channel,
+    Chat,
+    InputPeerChannel,
+    InputPeerChat,
+    InputPeerUser,
+    User,
+)
+
+from .models import PeerInfo
+from .state import StateStore
+
+type InputPeer = InputPeerUser | InputPeerChat | InputPeerChannel
+
+
+def peer_info(entity: Any) -> PeerInfo | None:
+    """Extrai PeerInfo de um User/Chat/Channel do Telethon (None se inutilizável)."""
+    # Entidades "min" não trazem access_hash válido para este usuário
+    if getattr(entity, "min", False):
+        return None
+
+    if isinstance(entity, User):
+        name = " ".join(filter(None, [entity.first_name, entity.last_name]))
+        return PeerInfo(
+            entity.id, "user", entity.access_hash or 0, entity.username, name or "Sem nome"
+        )
+    if isinstance(entity, Chat):
+        return PeerInfo(-entity.id, "chat", 0, None, entity.title or "Sem nome")
+    if isinstance(entity, Channel):
+        return PeerInfo(
+            utils.get_peer_id(entity),
+            "channel",
+            entity.access_hash or 0,
+            entity.username,
+            entity.title or "Sem nome",
+        )
+    return None
+
+
+def input_peer(info: PeerInfo) -> InputPeer:
+    """Monta o InputPeer correspondente."""
+    real_id, _ = utils.resolve_id(info.id)
+    match info.type:
+        case "user":
+            return InputPeerUser(real_id, info.access_hash)
+        case "chat":
+            return InputPeerChat(real_id)
+        case _:
+            return InputPeerChannel(real_id, info.access_hash)
+
+
+class PeerCache:
+    """
+    Resolução de ids sem RPC: LRU em memória com persistência no state DB.
+
+    É alimentado pelas listagens de diálogos e pelos remetentes das mensagens
+    processadas. Novidades ficam em buffer até `flush`, para não tocar o disco
+    a cada mensagem.
+    """
+
+    def __init__(self, capacity: int = 4096, state: StateStore | None = None) -> None:
+        self.capacity = capacity
+        self._lru: OrderedDict[int, PeerInfo] = OrderedDict()
+        self._dirty: dict[int, PeerInfo] = {}
+        self._state = state
+
+    async def _store(self) -> StateStore:
+        if self._state is None:
+            self._state = StateStore()
+        return await self._state.open()
+
+    def _put(self, info: PeerInfo) -> None:
+        self._lru[info.id] = info
+        self._lru.move_to_end(info.id)
+        while len(self._lru) > self.capacity:
+            self._lru.popitem(last=False)
+
+    def remember(self, entity: Any) -> None:
+        """Registra uma entidade vista em alguma resposta do Telegram."""
+        info = peer_info(entity) if entity is not None else None
+        # Compara o registro inteiro: access_hash ou nome novo também vão para o disco
+        if info is None or self._lru.get(info.id) == info:
+            return
+        self._put(info)
+        self._dirty[info.id] = info
+
+    async def get(self, peer_id: int) -> PeerInfo | None:
+        """Busca na memória e depois no disco."""
+        info = self._lru.get(peer_id)
+        if info is not None:
+            self._lru.move_to_end(peer_id)
+            return info
+
+        info = await (await self._store()).get_peer(peer_id)
+        if info is not None:
+            self._put(info)
+        return info
+
+    async def resolve(self, peer_id: int) -> InputPeer | None:
+        """InputPeer a partir do cache, ou None se o id for desconhecido."""
+        info = await self.get(peer_id)
+        return input_peer(info) if info else None
+
+    async def flush(self) -> None:
+        """Persiste entidades novas ou alteradas."""
+        if not self._dirty:
+            return
+        # Troca o buffer antes do await: `remember` durante a gravação vai para o novo
+        dirty, self._dirty = self._dirty, {}
+        try:
+            await (await self._store()).save_peers(list(dirty.values()))
+        except BaseException:
+            # Devolve o lote sem sobrescrever o que chegou durante a gravação
+            self._dirty = dirty | self._dirty
+            raise
+        logger.debug("{} peers gravados no cache", len(dirty))
+
+    async def close(self) -> None:
+        """Grava pendências e fecha o banco."""
+        await self.flush()
+        if self._state is not None:
+            await self._state.close()
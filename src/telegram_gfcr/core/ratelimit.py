@@ -0,0 +1,149 @@
+"""Rate limiter adaptativo (token bucket) compartilhado pelas operações do Telegram."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections.abc import AsyncIterator
+
+from loguru import logger
+
+from .metrics import get_metrics
+
+# Taxas iniciais por classe de método: (requisições/s, burst)
+DEFAULT_RATES: dict[str, tuple[float, float]] = {
+    "history": (3.0, 10.0),  # GetHistory / iter_messages (1 página = 100 msgs)
+    "search": (1.0, 5.0),  # messages.Search
+    "forward": (1.0, 3.0),  # ForwardMessages (até 100 ids por chamada)
+    "media": (5.0, 10.0),  # download_media (1 token por arquivo)
+    "dialogs": (2.0, 5.0),  # GetDialogs
+    "account": (0.5, 2.0),  # leave / operações de conta
+    "default": (2.0, 5.0),
+}
+
+# Piso de taxa após penalidades (1 requisição a cada 30s)
+MIN_RATE = 1 / 30
+
+
+class TokenBucket:
+    """
+    Token bucket com ajuste AIMD a partir de FloodWaits.
+
+    Cada FloodWait bloqueia o bucket pelo tempo exigido pelo servidor e corta
+    a taxa pela metade; cada sucesso devolve uma fração da taxa base. Assim o
+    ritmo converge para logo abaixo do limite real, trocando pausas longas
+    forçadas por espaçamento curto e previsível entre requisições.
+    """
+
+    def __init__(self, rate: float, burst: float) -> None:
+        self.base_rate = rate
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        # Lock FIFO: quem chegou primeiro é atendido primeiro
+        self._lock = asyncio.Lock()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def delay(self, now: float | None = None) -> float:
+        """Segundos até haver um token disponível."""
+        now = time.monotonic() if now is None else now
+        self._refill(now)
+        wait = max(0.0, self._blocked_until - now)
+        if self._tokens < 1:
+            wait = max(wait, (1 - self._tokens) / self.rate)
+        return wait
+
+    async def acquire(self) -> float:
+        """Aguarda e consome um token. Retorna o tempo esperado."""
+        waited = 0.0
+        async with self._lock:
+            while (wait := self.delay()) > 0:
+                waited += wait
+                await asyncio.sleep(wait)
+            self._tokens -= 1
+        return waited
+
+    def on_flood(self, seconds: float) -> None:
+        """Aplica penalidade de FloodWait (bloqueio + redução multiplicativa)."""
+        now = time.monotonic()
+        self._blocked_until = max(self._blocked_until, now + seconds)
+        self.rate = max(MIN_RATE, self.rate / 2)
+        self._tokens = 0.0
+        self._updated = now
+
+    def on_success(self) -> None:
+        """Recupera a taxa aos poucos (aumento aditivo até a taxa base)."""
+        if self.rate < self.base_rate:
+            self.rate = min(self.base_rate, self.rate + self.base_rate * 0.05)
+
+
+class RateLimiter:
+    """Conjunto de buckets por classe de método, um por processo (vive no pool)."""
+
+    def __init__(self, rates: dict[str, tuple[float, float]] | None = None) -> None:
+        self._rates = {**DEFAULT_RATES, **(rates or {})}
+        self._buckets: dict[str, TokenBucket] = {}
+
+    def bucket(self, rate_class: str) -> TokenBucket:
+        """Retorna (criando se necessário) o bucket da classe."""
+        if rate_class not in self._buckets:
+            rate, burst = self._rates.get(rate_class, self._rates["default"])
+            self._buckets[rate_class] = TokenBucket(rate, burst)
+        return self._buckets[rate_class]
+
+    async def acquire(self, rate_class: str) -> float:
+        """Aguarda a vez de fazer uma requisição da classe."""
+        waited = await self.bucket(rate_class).acquire()
+        get_metrics().limiter(rate_class, waited)
+        if waited >= 1:
+            logger.debug("Rate limiter [{}]: aguardou {:.1f}s", rate_class, waited)
+        return waited
+
+    def on_flood(self, rate_class: str, seconds: float) -> None:
+        """Aprende com um FloodWait recebido pela classe."""
+        bucket = self.bucket(rate_class)
+        bucket.on_flood(seconds)
+        logger.warning(
+            "Rate limiter [{}]: FloodWait {}s, taxa reduzida para {:.2f} req/s",
+            rate_class,
+            seconds,
+            bucket.rate,
+        )
+
+    def on_success(self, rate_class: str) -> None:
+        """Registra requisição bem-sucedida da classe."""
+        self.bucket(rate_class).on_success()
+
+    async def paced[T](
+        self, items: AsyncIterator[T], rate_class: str, page_size: int = 100
+    ) -> AsyncIterator[T]:
+        """
+        Consome um iterador paginado do Telethon no ritmo do limiter.
+
+        Um token é consumido antes de cada página (`page_size` itens), que é
+        quando o Telethon faz a próxima requisição. FloodWaits que escapam do
+        iterador também alimentam o limiter antes de serem propagados.
+        """
+        from telethon import errors
+
+        count = 0
+        iterator = aiter(items)
+        while True:
+            if count % page_size == 0:
+                await self.acquire(rate_class)
+            try:
+                item = await anext(iterator)
+            except StopAsyncIteration:
+                return
+            except errors.FloodWaitError as e:
+                self.on_flood(rate_class, e.seconds)
+                raise
+            if count % page_size == 0:
+                self.on_success(rate_class)
+            count += 1
+            yield item
@@ -0,0 +1,178 @@
+"""Serialização das mensagens do backup (formatos "full" e "compact")."""
+
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass, field
+from datetime import datetime
+from json.encoder import encode_basestring
+from typing import Any
+
+FORMATS = ("full", "compact")
+
+# Versão do schema compacto (campo "v" de cada linha)
+COMPACT_VERSION = 1
+
+
+@dataclass(slots=True)
+class BackupMessage:
+    """Mensagem lida do backup, independente do formato em que foi gravada."""
+
+    id: int
+    date: int
+    chat_id: int | None
+    sender_id: int | None
+    text: str
+    reply_to: int | None = None
+    grouped_id: int | None = None
+    media: dict[str, Any] | None = None
+    entities: list[list[Any]] = field(default_factory=list)
+
+
+def check_format(fmt: str) -> None:
+    """Valida o formato de serialização."""
+    if fmt not in FORMATS:
+        raise ValueError(f"Formato inválido: {fmt} (use {', '.join(FORMATS)})")
+
+
+def serialize(message: Any, fmt: str) -> str:
+    """Serializa uma mensagem do Telethon no formato escolhido."""
+    return to_compact(message) if fmt == "compact" else message.to_json()
+
+
+# ========== ESCRITA (COMPACT) ==========
+
+
+def _int(value: int | None) -> str:
+    return "null" if value is None else str(value)
+
+
+def _str(value: str | None) -> str:
+    return "null" if value is None else encode_basestring(value)
+
+
+def _media(message: Any) -> str:
+    """Descritor da mídia: tipo, id, tamanho, mime e nome do arquivo."""
+    kind = type(message.media).__name__.removeprefix("MessageMedia").lower()
+    file = message.file
+    if file is None:
+        return f'{{"type":{_str(kind)}}}'
+    obj = message.photo or message.document
+    return (
+        f'{{"type":{_str(kind)},"id":{_int(getattr(obj, "id", None))}'
+        f',"size":{_int(file.size)},"mime":{_str(file.mime_type)},"name":{_str(file.name)}}}'
+    )
+
+
+def _entity(entity: Any) -> str:
+    """Entidade de formatação como [tipo, offset, length(, extra)]."""
+    kind = type(entity).__name__.removeprefix("MessageEntity")
+    head = f"[{_str(kind)},{entity.offset},{entity.length}"
+    if (user_id := getattr(entity, "user_id", None)) is not None:
+        return f"{head},{user_id}]"
+    if extra := getattr(entity, "url", None) or getattr(entity, "language", None):
+        return f"{head},{_str(extra)}]"
+    return head + "]"
+
+
+def to_compact(message: Any) -> str:
+    """
+    Serializa no schema compacto, montando a linha JSON direto como string.
+
+    Campos sempre presentes: v, id, date (epoch), chat, sender, text. Os
+    opcionais (reply_to, grouped_id, media, entities) só aparecem quando há
+    valor; ausência equivale a null.
+    """
+    parts = [
+        f'{{"v":{COMPACT_VERSION},"id":{message.id}',
+        f',"date":{int(message.date.timestamp())}',
+        f',"chat":{_int(message.chat_id)},"sender":{_int(message.sender_id)}',
+        f',"text":{_str(message.message or "")}',
+    ]
+    if message.reply_to_msg_id:
+        parts.append(f',"reply_to":{message.reply_to_msg_id}')
+    if message.grouped_id:
+        parts.append(f',"grouped_id":{message.grouped_id}')
+    if message.media is not None:
+        parts.append(f',"media":{_media(message)}')
+    if message.entities:
+        parts.append(f',"entities":[{",".join(_entity(e) for e in message.entities)}]')
+    parts.append("}")
+    return "".join(parts)
+
+
+# ========== LEITURA (AMBOS OS FORMATOS) ==========
+
+
+def peer_id(peer: dict[str, Any] | None) -> int | None:
+    """Converte peer do `to_json()` do Telethon no id "marcado" usado pelo CLI."""
+    if not peer:
+        return None
+    match peer.get("_"):
+        case "PeerUser":
+            return int(peer["user_id"])
+        case "PeerChat":
+            return -int(peer["chat_id"])
+        case "PeerChannel":
+            return -(1_000_000_000_000 + int(peer["channel_id"]))
+    return None
+
+
+def _full_media(media: dict[str, Any]) -> dict[str, Any]:
+    """Descritor compacto a partir da mídia serializada por `to_json()`."""
+    descriptor: dict[str, Any] = {"type": media.get("_", "").removeprefix("MessageMedia").lower()}
+    if document := media.get("document"):
+        name = next(
+            (a["file_name"] for a in document.get("attributes", []) if "file_name" in a),
+            None,
+        )
+        descriptor.update(
+            id=document.get("id"),
+            size=document.get("size"),
+            mime=document.get("mime_type"),
+            name=name,
+        )
+    elif photo := media.get("photo"):
+        descriptor.update(id=photo.get("id"), mime="image/jpeg")
+    return descriptor
+
+
+def _entity_row(entity: dict[str, Any]) -> list[Any]:
+    row = [entity["_"].removeprefix("MessageEntity"), entity["offset"], entity["length"]]
+    if entity.get("user_id") is not None:
+        row.append(entity["user_id"])
+    elif extra := entity.get("url") or entity.get("language"):
+        row.append(extra)
+    return row
+
+
+def load_message(line: str) -> BackupMessage:
+    """Lê uma linha do backup em qualquer formato (full ou compact)."""
+    data = json.loads(line)
+
+    if "v" in data:
+        return BackupMessage(
+            id=data["id"],
+            date=data["date"],
+            chat_id=data["chat"],
+            sender_id=data["sender"],
+            text=data["text"],
+            reply_to=data.get("reply_to"),
+            grouped_id=data.get("grouped_id"),
+            media=data.get("media"),
+            entities=data.get("entities", []),
+        )
+
+    reply_to = data.get("reply_to") or {}
+    media = data.get("media")
+    return BackupMessage(
+        id=int(data["id"]),
+        date=int(datetime.fromisoformat(data["date"]).timestamp()),
+        chat_id=peer_id(data.get("peer_id")),
+        sender_id=peer_id(data.get("from_id")),
+        text=data.get("message") or "",
+        reply_to=reply_to.get("reply_to_msg_id"),
+        grouped_id=data.get("grouped_id"),
+        media=_full_media(media) if media else None,
+        entities=[_entity_row(e) for e in data.get("entities") or []],
+    )
@@ -0,0 +1,275 @@
+"""Estado persistente local (checkpoints de backup, caches) em SQLite via aiosqlite."""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+from dataclasses import dataclass
+from pathlib import Path
+from types import TracebackType
+
+import aiosqlite
+from loguru import logger
+
+from ..config import get_settings
+from .models import DialogInfo, MediaObject, PeerInfo
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS backup_checkpoints (
+    entity_id INTEGER NOT NULL,
+    output TEXT NOT NULL,
+    max_id INTEGER NOT NULL DEFAULT 0,
+    min_id INTEGER NOT NULL DEFAULT 0,
+    complete INTEGER NOT NULL DEFAULT 0,
+    updated_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (entity_id, output)
+);
+
+CREATE TABLE IF NOT EXISTS dialogs (
+    id INTEGER PRIMARY KEY,
+    position INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    type TEXT NOT NULL,
+    unread INTEGER NOT NULL,
+    top_message_id INTEGER NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS cache_meta (
+    key TEXT PRIMARY KEY,
+    updated_at REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS peers (
+    id INTEGER PRIMARY KEY,
+    type TEXT NOT NULL,
+    access_hash INTEGER NOT NULL,
+    username TEXT,
+    name TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS backup_media (
+    entity_id INTEGER NOT NULL,
+    output TEXT NOT NULL,
+    message_id INTEGER NOT NULL,
+    done INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (entity_id, output, message_id)
+);
+
+CREATE TABLE IF NOT EXISTS media_objects (
+    key TEXT PRIMARY KEY,
+    path TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    sha256 TEXT NOT NULL
+);
+"""
+
+
+@dataclass(slots=True)
+class BackupCheckpoint:
+    """
+    Faixa contígua de mensagens já gravada para uma entidade.
+
+    O backup percorre o histórico do mais novo para o mais antigo, então tudo
+    entre `min_id` e `max_id` já está em disco. Mensagens acima de `max_id`
+    são novas; abaixo de `min_id` só faltam se `complete` for falso.
+    """
+
+    entity_id: int
+    output: str
+    max_id: int = 0
+    min_id: int = 0
+    complete: bool = False
+
+    def extend(self, message_ids: Iterable[int]) -> None:
+        """Amplia a faixa com ids recém-gravados."""
+        for message_id in message_ids:
+            if message_id > self.max_id:
+                self.max_id = message_id
+            if self.min_id == 0 or message_id < self.min_id:
+                self.min_id = message_id
+
+
+class StateStore:
+    """Banco de estado (`state.db`) sob `Settings.data_dir`."""
+
+    def __init__(self, path: Path | None = None) -> None:
+        self.path = path or get_settings().ensure_data_dir() / "state.db"
+        self._db: aiosqlite.Connection | None = None
+
+    async def open(self) -> StateStore:
+        """Abre conexão e garante o schema."""
+        if self._db is None:
+            self._db = await aiosqlite.connect(self.path)
+            await self._db.execute("PRAGMA journal_mode=WAL")
+            await self._db.executescript(SCHEMA)
+            await self._db.commit()
+            logger.debug("State DB aberto: {}", self.path)
+        return self
+
+    async def close(self) -> None:
+        """Fecha conexão."""
+        if self._db is not None:
+            await self._db.close()
+            self._db = None
+
+    async def __aenter__(self) -> StateStore:
+        return await self.open()
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        await self.close()
+
+    @property
+    def db(self) -> aiosqlite.Connection:
+        """Conexão aberta."""
+        if self._db is None:
+            raise RuntimeError("StateStore não foi aberto")
+        return self._db
+
+    # ========== CHECKPOINTS ==========
+
+    async def get_checkpoint(self, entity_id: int, output: str) -> BackupCheckpoint:
+        """Retorna checkpoint da entidade (vazio se nunca houve backup)."""
+        async with self.db.execute(
+            "SELECT max_id, min_id, complete FROM backup_checkpoints "
+            "WHERE entity_id = ? AND output = ?",
+            (entity_id, output),
+        ) as cursor:
+            row = await cursor.fetchone()
+
+        if row is None:
+            return BackupCheckpoint(entity_id, output)
+        return BackupCheckpoint(entity_id, output, row[0], row[1], bool(row[2]))
+
+    async def list_checkpoints(self) -> list[BackupCheckpoint]:
+        """Todos os checkpoints (de todas as entidades e diretórios de saída)."""
+        async with self.db.execute(
+            "SELECT entity_id, output, max_id, min_id, complete FROM backup_checkpoints"
+        ) as cursor:
+            rows = await cursor.fetchall()
+        return [BackupCheckpoint(row[0], row[1], row[2], row[3], bool(row[4])) for row in rows]
+
+    async def save_checkpoint(self, checkpoint: BackupCheckpoint) -> None:
+        """Persiste checkpoint."""
+        await self.db.execute(
+            "INSERT INTO backup_checkpoints (entity_id, output, max_id, min_id, complete) "
+            "VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT (entity_id, output) DO UPDATE SET "
+            "max_id = excluded.max_id, min_id = excluded.min_id, "
+            "complete = excluded.complete, updated_at = CURRENT_TIMESTAMP",
+            (
+                checkpoint.entity_id,
+                checkpoint.output,
+                checkpoint.max_id,
+                checkpoint.min_id,
+                int(checkpoint.complete),
+            ),
+        )
+        await self.db.commit()
+
+    async def delete_checkpoint(self, entity_id: int, output: str) -> None:
+        """Remove o checkpoint (ex: de uma faixa do `--ranges` já juntada)."""
+        await self.db.execute(
+            "DELETE FROM backup_checkpoints WHERE entity_id = ? AND output = ?",
+            (entity_id, output),
+        )
+        await self.db.commit()
+
+    # ========== MÍDIA ==========
+
+    async def mark_media(
+        self, entity_id: int, output: str, message_ids: Iterable[int], done: bool
+    ) -> None:
+        """Marca mídias como concluídas ou pendentes (para retry na próxima execução)."""
+        rows = [(entity_id, output, message_id, int(done)) for message_id in message_ids]
+        if not rows:
+            return
+        await self.db.executemany(
+            "INSERT INTO backup_media (entity_id, output, message_id, done) "
+            "VALUES (?, ?, ?, ?) "
+            "ON CONFLICT (entity_id, output, message_id) DO UPDATE SET done = excluded.done",
+            rows,
+        )
+        await self.db.commit()
+
+    async def get_media(self, entity_id: int, output: str, done: bool) -> set[int]:
+        """Ids de mensagens cuja mídia está concluída (ou pendente)."""
+        async with self.db.execute(
+            "SELECT message_id FROM backup_media WHERE entity_id = ? AND output = ? AND done = ?",
+            (entity_id, output, int(done)),
+        ) as cursor:
+            return {row[0] for row in await cursor.fetchall()}
+
+    async def get_media_object(self, key: str) -> MediaObject | None:
+        """Busca objeto do media store pela chave (`photo-<id>`, `document-<id>`)."""
+        async with self.db.execute(
+            "SELECT key, path, size, sha256 FROM media_objects WHERE key = ?", (key,)
+        ) as cursor:
+            row = await cursor.fetchone()
+        return MediaObject(*row) if row else None
+
+    async def save_media_object(self, obj: MediaObject) -> None:
+        """Registra (ou substitui) objeto do media store."""
+        await self.db.execute(
+            "INSERT OR REPLACE INTO media_objects (key, path, size, sha256) VALUES (?, ?, ?, ?)",
+            obj,
+        )
+        await self.db.commit()
+
+    # ========== CACHE DE DIÁLOGOS ==========
+
+    async def load_dialogs(self) -> tuple[list[DialogInfo], float | None]:
+        """Retorna diálogos em cache e o timestamp da última atualização."""
+        async with self.db.execute(
+            "SELECT updated_at FROM cache_meta WHERE key = 'dialogs'"
+        ) as cursor:
+            row = await cursor.fetchone()
+        if row is None:
+            return [], None
+
+        async with self.db.execute(
+            "SELECT id, name, type, unread, top_message_id FROM dialogs ORDER BY position"
+        ) as cursor:
+            dialogs = [DialogInfo(*r) for r in await cursor.fetchall()]
+        return dialogs, row[0]
+
+    async def save_dialogs(self, dialogs: list[DialogInfo], updated_at: float) -> None:
+        """Substitui o cache de diálogos (preserva a ordem do Telegram)."""
+        await self.db.execute("DELETE FROM dialogs")
+        await self.db.executemany(
+            "INSERT OR REPLACE INTO dialogs (id, position, name, type, unread, top_message_id) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            [
+                (d.id, position, d.name, d.type, d.unread, d.top_message_id)
+                for position, d in enumerate(dialogs)
+            ],
+        )
+        await self.db.execute(
+            "INSERT INTO cache_meta (key, updated_at) VALUES ('dialogs', ?) "
+            "ON CONFLICT (key) DO UPDATE SET updated_at = excluded.updated_at",
+            (updated_at,),
+        )
+        await self.db.commit()
+
+    # ========== CACHE DE PEERS ==========
+
+    async def get_peer(self, peer_id: int) -> PeerInfo | None:
+        """Busca peer conhecido pelo id marcado."""
+        async with self.db.execute(
+            "SELECT id, type, access_hash, username, name FROM peers WHERE id = ?",
+            (peer_id,),
+        ) as cursor:
+            row = await cursor.fetchone()
+        return PeerInfo(*row) if row else None
+
+    async def save_peers(self, peers: list[PeerInfo]) -> None:
+        """Grava (ou atualiza) peers."""
+        await self.db.executemany(
+            "INSERT OR REPLACE INTO peers (id, type, access_hash, username, name) "
+            "VALUES (?, ?, ?, ?, ?)",
+            peers,
+        )
+        await self.db.commit()
@@ -0,0 +1,293 @@
+"""Armazenamento segmentado (e opcionalmente comprimido) dos backups."""
+
+from __future__ import annotations
+
+import gzip
+import json
+import re
+from collections.abc import Iterator
+from dataclasses import asdict, dataclass, replace
+from pathlib import Path
+from types import TracebackType
+from typing import IO, Any, cast
+
+from loguru import logger
+
+COMPRESSIONS = ("none", "gzip", "zstd")
+SUFFIXES = {"none": "", "gzip": ".gz", "zstd": ".zst"}
+
+# Backups anteriores aos segmentos: um único arquivo sem índice
+LEGACY_FILE = "messages.jsonl"
+
+SEGMENT_RE = re.compile(r"^messages\.(\d{6})\.jsonl(\.gz|\.zst)?$")
+
+# Registro a gravar: (id da mensagem, data em epoch, linha JSON)
+Record = tuple[int, int, str]
+
+
+def _zstd() -> Any:
+    """Importa `zstandard` (dependência opcional)."""
+    try:
+        import zstandard
+    except ImportError as e:
+        raise RuntimeError(
+            "Compressão zstd requer o pacote opcional 'zstandard' "
+            "(pip install 'telegram-gfcr[zstd]')"
+        ) from e
+    return zstandard
+
+
+def check_compression(compression: str) -> None:
+    """Valida o modo de compressão (e a dependência opcional do zstd)."""
+    if compression not in COMPRESSIONS:
+        raise ValueError(f"Compressão inválida: {compression} (use {', '.join(COMPRESSIONS)})")
+    if compression == "zstd":
+        _zstd()
+
+
+def _compress(data: bytes, compression: str) -> bytes:
+    """Comprime um bloco como membro/frame independente (permite seek por bloco)."""
+    match compression:
+        case "gzip":
+            return gzip.compress(data, compresslevel=6)
+        case "zstd":
+            return cast(bytes, _zstd().ZstdCompressor(level=3).compress(data))
+    return data
+
+
+def _decompress(data: bytes, compression: str) -> bytes:
+    match compression:
+        case "gzip":
+            return gzip.decompress(data)
+        case "zstd":
+            return cast(bytes, _zstd().ZstdDecompressor().decompress(data))
+    return data
+
+
+@dataclass(slots=True)
+class Block:
+    """Entrada do índice de um segmento: um batch gravado de uma vez."""
+
+    offset: int
+    size: int
+    count: int
+    first_id: int
+    last_id: int
+    min_date: int
+    max_date: int
+
+    @property
+    def min_id(self) -> int:
+        return min(self.first_id, self.last_id)
+
+    @property
+    def max_id(self) -> int:
+        return max(self.first_id, self.last_id)
+
+
+@dataclass(slots=True)
+class Segment:
+    """Arquivo de segmento e seu índice (`.idx.jsonl`)."""
+
+    path: Path
+    number: int
+    compression: str
+
+    @property
+    def index_path(self) -> Path:
+        return self.path.with_name(f"messages.{self.number:06d}.idx.jsonl")
+
+    def blocks(self) -> list[Block]:
+        """Lê o índice do segmento."""
+        if not self.index_path.exists():
+            return []
+        with self.index_path.open(encoding="utf-8") as f:
+            return [Block(**json.loads(line)) for line in f if line.endswith("\n")]
+
+    def read_block(self, block: Block) -> list[str]:
+        """Lê um bloco direto do offset (sem varrer o arquivo)."""
+        with self.path.open("rb") as f:
+            f.seek(block.offset)
+            data = _decompress(f.read(block.size), self.compression)
+        return data.decode("utf-8").splitlines()
+
+
+def list_segments(directory: Path) -> list[Segment]:
+    """Segmentos do diretório em ordem de criação."""
+    segments = []
+    for path in directory.glob("messages.*.jsonl*"):
+        if match := SEGMENT_RE.match(path.name):
+            compression = {None: "none", ".gz": "gzip", ".zst": "zstd"}[match.group(2)]
+            segments.append(Segment(path, int(match.group(1)), compression))
+    return sorted(segments, key=lambda segment: segment.number)
+
+
+def iter_backup_lines(directory: Path) -> Iterator[str]:
+    """Todas as linhas de um backup: arquivo legado e depois os segmentos."""
+    legacy = directory / LEGACY_FILE
+    if legacy.exists():
+        with legacy.open(encoding="utf-8") as f:
+            for line in f:
+                if line.endswith("\n"):
+                    yield line.rstrip("\n")
+
+    for segment in list_segments(directory):
+        for block in segment.blocks():
+            yield from segment.read_block(block)
+
+
+class SegmentWriter:
+    """
+    Escrita em streaming com um handle persistente por segmento.
+
+    Cada `write_batch` vira um bloco (membro gzip / frame zstd independente)
+    e uma linha no índice do segmento com faixa de ids, faixa de datas e
+    offset em bytes, para leitores pularem direto ao bloco desejado. O
+    segmento rotaciona ao atingir `max_bytes` ou `max_records`.
+
+    Usage:
+        with SegmentWriter(output_path, compression="gzip") as writer:
+            writer.write_batch([(message.id, timestamp, line), ...])
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        max_bytes: int = 256 * 1024 * 1024,
+        max_records: int = 100_000,
+        compression: str = "none",
+    ) -> None:
+        check_compression(compression)
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_records = max_records
+        self.compression = compression
+        self._segment: Segment | None = None
+        self._data: IO[bytes] | None = None
+        self._index: IO[str] | None = None
+        self._bytes = 0
+        self._records = 0
+
+    def __enter__(self) -> SegmentWriter:
+        self.open()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def open(self) -> None:
+        """Continua o último segmento (se couber) ou inicia um novo."""
+        segments = list_segments(self.directory)
+        last = segments[-1] if segments else None
+
+        if last and last.compression == self.compression:
+            blocks = last.blocks()
+            end = blocks[-1].offset + blocks[-1].size if blocks else 0
+            records = sum(block.count for block in blocks)
+            if end < self.max_bytes and records < self.max_records:
+                self._open_segment(last, end, records)
+                return
+
+        self._open_segment(self._new_segment(last.number + 1 if last else 1), 0, 0)
+
+    def _new_segment(self, number: int) -> Segment:
+        name = f"messages.{number:06d}.jsonl{SUFFIXES[self.compression]}"
+        return Segment(self.directory / name, number, self.compression)
+
+    def _open_segment(self, segment: Segment, end: int, records: int) -> None:
+        self._segment = segment
+        self._data = segment.path.open("ab")
+        # Descarta bloco órfão (gravado sem entrada no índice antes de uma queda)
+        if self._data.tell() > end:
+            self._data.truncate(end)
+            self._data.seek(end)
+        # Idem para entrada de índice truncada
+        if segment.index_path.exists():
+            raw = segment.index_path.read_bytes()
+            if not raw.endswith(b"\n") and raw:
+                segment.index_path.write_bytes(raw[: raw.rfind(b"\n") + 1])
+        self._index = segment.index_path.open("a", encoding="utf-8")
+        self._bytes = end
+        self._records = records
+        logger.debug("Segmento aberto: {} ({} registros)", segment.path.name, records)
+
+    def close(self) -> None:
+        """Fecha os handles do segmento atual."""
+        if self._data:
+            self._data.close()
+            self._data = None
+        if self._index:
+            self._index.close()
+            self._index = None
+
+    def write_batch(self, records: list[Record]) -> None:
+        """Grava um batch como um bloco do segmento atual."""
+        if not records:
+            return
+        if self._data is None or self._index is None:
+            raise RuntimeError("SegmentWriter não foi aberto")
+
+        payload = "".join(line + "\n" for _, _, line in records).encode("utf-8")
+        dates = [date for _, date, _ in records]
+        self._append(
+            _compress(payload, self.compression),
+            Block(
+                offset=0,
+                size=0,
+                count=len(records),
+                first_id=records[0][0],
+                last_id=records[-1][0],
+                min_date=min(dates),
+                max_date=max(dates),
+            ),
+        )
+
+    def copy_segment(self, segment: Segment) -> None:
+        """
+        Acrescenta os blocos de outro segmento, na ordem, sem descomprimir.
+
+        Raises:
+            ValueError: se a compressão do segmento for outra
+        """
+        if segment.compression != self.compression:
+            raise ValueError(
+                f"Segmento {segment.path.name} em {segment.compression}, "
+                f"esperado {self.compression}"
+            )
+        with segment.path.open("rb") as f:
+            for block in segment.blocks():
+                f.seek(block.offset)
+                self._append(f.read(block.size), block)
+
+    def _append(self, data: bytes, block: Block) -> None:
+        """Grava um bloco já comprimido; offset e tamanho vêm do segmento atual."""
+        if self._data is None or self._index is None:
+            raise RuntimeError("SegmentWriter não foi aberto")
+
+        if self._bytes >= self.max_bytes or self._records >= self.max_records:
+            self._rotate()
+            assert self._data is not None and self._index is not None
+
+        block = replace(block, offset=self._bytes, size=len(data))
+
+        # Dados antes do índice: entrada no índice implica bloco completo
+        self._data.write(data)
+        self._data.flush()
+        self._index.write(json.dumps(asdict(block)) + "\n")
+        self._index.flush()
+
+        self._bytes += len(data)
+        self._records += block.count
+
+    def _rotate(self) -> None:
+        """Fecha o segmento cheio e abre o próximo."""
+        assert self._segment is not None
+        number = self._segment.number + 1
+        self.close()
+        logger.info("Rotacionando backup para o segmento {:06d}", number)
+        self._open_segment(self._new_segment(number), 0, 0)
@@ -0,0 +1,67 @@
+"""
+Console e diretório de trabalho do comando em execução.
+
+Os comandos escrevem em `console` e resolvem caminhos relativos com
+`workdir()`. Fora do daemon são o terminal e o cwd do processo; no daemon,
+cada comando roda com o `Terminal` do cliente que o pediu (`use_terminal`),
+isolado por contexto: dois comandos simultâneos não se misturam.
+"""
+
+from __future__ import annotations
+
+import contextlib
+from collections.abc import Iterator
+from contextvars import ContextVar
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, cast
+
+from rich.console import Console
+
+
+@dataclass(frozen=True, slots=True)
+class Terminal:
+    """Saída e cwd de quem pediu o comando."""
+
+    console: Console
+    cwd: Path
+
+
+_default = Console()
+_current: ContextVar[Terminal | None] = ContextVar("terminal", default=None)
+
+
+def current_console() -> Console:
+    """Console do comando em execução (o do processo, fora de `use_terminal`)."""
+    terminal = _current.get()
+    return terminal.console if terminal else _default
+
+
+def workdir() -> Path:
+    """Diretório de trabalho do comando em execução."""
+    terminal = _current.get()
+    return terminal.cwd if terminal else Path.cwd()
+
+
+@contextlib.contextmanager
+def use_terminal(terminal: Terminal) -> Iterator[None]:
+    """Direciona `console` e `workdir()` para `terminal` no contexto atual."""
+    token = _current.set(terminal)
+    try:
+        yield
+    finally:
+        _current.reset(token)
+
+
+class _ConsoleProxy:
+    """Repassa cada acesso ao console do contexto atual."""
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(current_console(), name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        setattr(current_console(), name, value)
+
+
+# Importado pelos módulos de comando no lugar de um `Console()` próprio
+console = cast(Console, _ConsoleProxy())
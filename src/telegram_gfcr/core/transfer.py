@@ -0,0 +1,186 @@
+"""Download paralelo em partes de mídias grandes (várias conexões MTProto)."""
+
+from __future__ import annotations
+
+import asyncio
+import math
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any, cast
+
+from loguru import logger
+from telethon import TelegramClient, errors, utils
+from telethon.crypto import AuthKey
+from telethon.network import MTProtoSender
+from telethon.tl.alltlobjects import LAYER
+from telethon.tl.functions import InvokeWithLayerRequest
+from telethon.tl.functions.auth import ExportAuthorizationRequest, ImportAuthorizationRequest
+from telethon.tl.functions.upload import GetFileRequest
+
+from .ratelimit import RateLimiter
+
+# Tamanho de cada parte: múltiplo de 4 KB que divide 1 MB (exigência do upload.getFile)
+PART_SIZE = 512 * 1024
+
+# Tentativas por parte antes de desistir do arquivo
+PART_RETRIES = 3
+
+
+class ParallelTransfer:
+    """
+    Baixa documentos grandes em partes de `PART_SIZE`, em paralelo.
+
+    Mantém `connections` MTProtoSenders por DC, criados sob demanda e
+    compartilhados por todos os downloads. Depende de internos do
+    `TelegramClient` 1.x (`_get_dc`, `_connection`, `_init_request`); quem
+    chama cai no download normal se algo aqui falhar. Para o DC da sessão reaproveita a
+    auth key; para outros DCs exporta a autorização uma vez e reutiliza a
+    chave nos demais senders. Cada parte vai direto para o seu offset em um
+    arquivo pré-alocado.
+
+    Usage:
+        transfer = ParallelTransfer(client.client, connections=4)
+        if transfer.should_split(message):
+            await transfer.download(message, path, on_progress=callback)
+        await transfer.close()
+    """
+
+    def __init__(
+        self,
+        client: TelegramClient,
+        connections: int = 4,
+        threshold: int = 20 * 1024 * 1024,
+        limiter: RateLimiter | None = None,
+    ) -> None:
+        self.client = client
+        self.connections = connections
+        self.threshold = threshold
+        self.limiter = limiter
+        self._senders: dict[int, list[MTProtoSender]] = {}
+        self._auth_keys: dict[int, AuthKey] = {}
+        self._lock = asyncio.Lock()
+
+    def should_split(self, message: Any) -> bool:
+        """Só documentos acima do limite valem o custo de abrir conexões extras."""
+        document = message.document
+        return (
+            self.connections > 1 and document is not None and (document.size or 0) >= self.threshold
+        )
+
+    async def _create_sender(self, dc_id: int) -> MTProtoSender:
+        """Conecta um sender ao DC (exportando a autorização se for outro DC)."""
+        client = self.client
+        dc = await client._get_dc(dc_id)
+        auth_key = self._auth_keys.get(dc_id)
+        if auth_key is None and dc_id == client.session.dc_id:
+            auth_key = client.session.auth_key
+
+        sender = MTProtoSender(auth_key, loggers=client._log)
+        await sender.connect(
+            client._connection(
+                dc.ip_address,
+                dc.port,
+                dc.id,
+                loggers=client._log,
+                proxy=client._proxy,
+                local_addr=client._local_addr,
+            )
+        )
+        if auth_key is None:
+            exported = await client(ExportAuthorizationRequest(dc_id))
+            client._init_request.query = ImportAuthorizationRequest(
+                id=exported.id, bytes=exported.bytes
+            )
+            await sender.send(InvokeWithLayerRequest(LAYER, client._init_request))
+            self._auth_keys[dc_id] = sender.auth_key
+        return sender
+
+    async def _senders_for(self, dc_id: int) -> list[MTProtoSender]:
+        async with self._lock:
+            if dc_id not in self._senders:
+                # Sequencial: o primeiro sender exporta a auth key usada pelos demais
+                self._senders[dc_id] = [
+                    await self._create_sender(dc_id) for _ in range(self.connections)
+                ]
+                logger.debug("{} conexões abertas no DC {}", self.connections, dc_id)
+            return self._senders[dc_id]
+
+    async def _get_part(self, sender: MTProtoSender, location: Any, offset: int) -> bytes:
+        """Busca uma parte, respeitando FloodWait sem derrubar as outras."""
+        for attempt in range(PART_RETRIES + 1):
+            try:
+                result = await sender.send(GetFileRequest(location, offset, PART_SIZE))
+                return cast(bytes, result.bytes)
+            except errors.FloodWaitError as e:
+                if attempt == PART_RETRIES:
+                    raise
+                logger.warning("FloodWait de {}s na parte {}", e.seconds, offset // PART_SIZE)
+                if self.limiter:
+                    self.limiter.on_flood("media", e.seconds)
+                    await self.limiter.acquire("media")
+                else:
+                    await asyncio.sleep(e.seconds)
+        raise AssertionError("unreachable")
+
+    async def download(
+        self,
+        message: Any,
+        path: Path,
+        on_progress: Callable[[int, int], None] | None = None,
+    ) -> Path:
+        """
+        Baixa o documento da mensagem para `path`.
+
+        Args:
+            message: Mensagem com documento
+            path: Arquivo de destino (pré-alocado com o tamanho final e
+                removido se o download falhar)
+            on_progress: Callback (bytes recebidos, total)
+
+        Returns:
+            Caminho do arquivo baixado
+        """
+        document = message.document
+        dc_id, location = utils.get_input_location(document)
+        size = document.size
+        senders = await self._senders_for(dc_id)
+        parts = iter(range(math.ceil(size / PART_SIZE)))
+        received = 0
+
+        try:
+            with path.open("wb") as f:
+                f.truncate(size)
+
+                async def _fetch(sender: MTProtoSender) -> None:
+                    # Iterador compartilhado: cada sender pega a próxima parte livre
+                    nonlocal received
+                    for part in parts:
+                        data = await self._get_part(sender, location, part * PART_SIZE)
+                        f.seek(part * PART_SIZE)
+                        f.write(data)
+                        received += len(data)
+                        if on_progress:
+                            on_progress(received, size)
+
+                async with asyncio.TaskGroup() as group:
+                    for sender in senders:
+                        group.create_task(_fetch(sender))
+        except BaseException:
+            # Pré-alocado no tamanho final: um arquivo incompleto pareceria pronto
+            path.unlink(missing_ok=True)
+            raise
+
+        logger.debug(
+            "Mídia msg {message_id}: {} bytes em {} conexões",
+            size,
+            len(senders),
+            message_id=message.id,
+        )
+        return path
+
+    async def close(self) -> None:
+        """Desconecta todos os senders extras."""
+        for senders in self._senders.values():
+            for sender in senders:
+                await sender.disconnect()
+        self._senders.clear()
@@ -1,6 +1,8 @@
 """REPL interativo com prompt_toolkit."""
 
 import asyncio
+import contextlib
+import signal
 
 from prompt_toolkit import PromptSession
 from prompt_toolkit.auto_suggest import AutoSuggestFromHistory
@@ -13,16 +15,21 @@ from rich.table import Table
 
 from . import __version__
 from .config import get_settings
-from .core.client import shutdown_pool
+from .core.client import shutdown_pool, wait_background
+from .core.metrics import dump_metrics
 
 # Comandos disponíveis no modo interativo
 COMMANDS = {
     "help": "Exibe esta ajuda",
-    "list": "Lista grupos, conversas e canais",
-    "backup": "Faz backup: backup <id> [--media]",
+    "list": "Lista grupos, conversas e canais: list [tipo] [--refresh]",
+    "backup": "Faz backup: backup <id> [<id> ...] [--media] [--follow]",
+    "sync": "Backup dos diálogos que mudaram: sync [tipo] [--media] [--dry-run]",
     "forward": "Encaminha: forward <origem> <destino>",
-    "search": "Busca: search <termo> [--id <id>]",
+    "search": "Busca: search <termo> [--id <id> ...] [--type <tipo>] [--local]",
+    "index": "Indexa backups para busca offline: index [dir]",
     "leave": "Sai de um grupo: leave <id>",
+    "stats": "Métricas da sessão (latência, erros, FloodWait)",
+    "reload": "Relê variáveis de ambiente e .env",
     "clear": "Limpa a tela",
     "exit": "Encerra o CLI",
 }
@@ -47,6 +54,29 @@ def show_banner(console: Console) -> None:
     )
 
 
+async def reload_config(console: Console) -> None:
+    """Relê as configurações; reconecta se credenciais ou sessão mudaram."""
+    from pydantic import ValidationError
+
+    from .config import reload_settings
+    from .core.logging import setup_logging
+
+    old = get_settings()
+    try:
+        new = reload_settings()
+    except ValidationError as e:
+        console.print(f"[red]Configuração inválida, mantendo a atual:[/]\n{e}")
+        return
+
+    setup_logging()
+    connection = ("api_id", "api_hash", "session_name", "data_dir")
+    if any(getattr(old, field) != getattr(new, field) for field in connection):
+        # A próxima operação cria um pool novo com as credenciais novas
+        await wait_background()
+        await shutdown_pool()
+    console.print("[green]✓ Configurações recarregadas[/]")
+
+
 def show_help(console: Console) -> None:
     """Exibe tabela de comandos disponíveis."""
     table = Table(title="Comandos Disponíveis", show_header=True, header_style="bold cyan")
@@ -59,7 +89,7 @@ def show_help(console: Console) -> None:
     console.print(table)
 
 
-def process_command(cmd: str, console: Console) -> bool:
+async def process_command(cmd: str, console: Console) -> bool:
     """
     Processa comando do usuário.
 
@@ -81,35 +111,55 @@ def process_command(cmd: str, console: Console) -> bool:
         case "help" | "h" | "?":
             show_help(console)
 
+        case "stats":
+            from .commands.stats import run_stats_async
+
+            await run_stats_async()
+
+        case "reload":
+            await reload_config(console)
+
         case "clear" | "cls":
             console.clear()
             show_banner(console)
 
         case "list":
-            from .commands.list import run_list
+            from .commands.list import run_list_async
 
-            entity_type = args[0] if args else "all"
-            run_list(entity_type)
+            refresh = "--refresh" in args or "-r" in args
+            types = [arg for arg in args if not arg.startswith("-")]
+            await run_list_async(types[0] if types else "all", refresh)
 
         case "backup":
             if not args:
-                console.print("[red]Uso: backup <id> [--media][/]")
+                console.print("[red]Uso: backup <id> [<id> ...] [--media][/]")
             else:
-                from .commands.backup import run_backup
+                from .commands.backup import run_backup_async
 
+                # Flags conhecidas à parte: ids de grupos e canais são negativos
+                flags = {"--media", "-m", "--follow", "-F"}
                 try:
-                    entity_id = int(args[0])
+                    entity_ids = [int(arg) for arg in args if arg not in flags]
                 except ValueError:
                     console.print("[red]ID inválido: use um número[/]")
                     return True
                 media = "--media" in args or "-m" in args
-                run_backup(entity_id, None, media)
+                follow = "--follow" in args or "-F" in args
+                await run_backup_async(entity_ids, None, media, follow=follow)
+
+        case "sync":
+            from .commands.sync import run_sync_async
+
+            types = [arg for arg in args if not arg.startswith("-")]
+            media = "--media" in args or "-m" in args
+            dry_run = "--dry-run" in args or "-n" in args
+            await run_sync_async(None, types[0] if types else "all", media, dry_run=dry_run)
 
         case "forward":
             if len(args) < 2:
                 console.print("[red]Uso: forward <origem> <destino>[/]")
             else:
-                from .commands.forward import run_forward
+                from .commands.forward import run_forward_async
 
                 try:
                     source_id = int(args[0])
@@ -117,26 +167,28 @@ def process_command(cmd: str, console: Console) -> bool:
                 except ValueError:
                     console.print("[red]IDs inválidos: use números[/]")
                     return True
-                run_forward(source_id, dest_id, 100)
+                await run_forward_async(source_id, dest_id, 100)
 
         case "search":
             if not args:
                 console.print("[red]Uso: search <termo> [--id <id>] [--limit <n>][/]")
             else:
-                from .commands.search import run_search
+                from .commands.search import run_search_async
 
                 query = args[0]
-                entity_id = None
+                entity_ids = []
+                entity_type = None
                 limit = 20
 
-                if "--id" in args:
-                    idx = args.index("--id")
-                    if idx + 1 < len(args):
+                for idx, arg in enumerate(args[:-1]):
+                    if arg == "--id":
                         try:
-                            entity_id = int(args[idx + 1])
+                            entity_ids.append(int(args[idx + 1]))
                         except ValueError:
                             console.print("[red]ID inválido[/]")
                             return True
+                    elif arg in ("--type", "-t"):
+                        entity_type = args[idx + 1]
 
                 if "--limit" in args:
                     idx = args.index("--limit")
@@ -147,20 +199,26 @@ def process_command(cmd: str, console: Console) -> bool:
                             console.print("[red]Limite inválido[/]")
                             return True
 
-                run_search(query, entity_id, limit)
+                local = "--local" in args
+                await run_search_async(query, entity_ids, limit, local, entity_type=entity_type)
+
+        case "index":
+            from .commands.index import run_index_async
+
+            await run_index_async(args[0] if args else None)
 
         case "leave":
             if not args:
                 console.print("[red]Uso: leave <id>[/]")
             else:
-                from .commands.leave import run_leave
+                from .commands.leave import run_leave_async
 
                 try:
                     entity_id = int(args[0])
                 except ValueError:
                     console.print("[red]ID inválido: use um número[/]")
                     return True
-                run_leave(entity_id, confirm=False)
+                await run_leave_async(entity_id, confirm=False)
 
         case _:
             console.print(f"[yellow]⚠️ Comando desconhecido:[/] {command}")
@@ -169,6 +227,54 @@ def process_command(cmd: str, console: Console) -> bool:
     return True
 
 
+async def _run_command(cmd: str, console: Console) -> bool:
+    """
+    Executa um comando como task cancelável por Ctrl+C.
+
+    Enquanto o comando roda, SIGINT cancela apenas a task do comando, sem
+    derrubar o loop do REPL (e a conexão do pool que vive nele).
+    """
+    loop = asyncio.get_running_loop()
+    task = asyncio.ensure_future(process_command(cmd, console))
+
+    with contextlib.suppress(NotImplementedError):
+        loop.add_signal_handler(signal.SIGINT, task.cancel)
+
+    try:
+        return await task
+    except asyncio.CancelledError:
+        if not task.cancelled():
+            raise
+        console.print("\n[yellow]Comando interrompido[/]")
+        return True
+    finally:
+        with contextlib.suppress(NotImplementedError):
+            loop.remove_signal_handler(signal.SIGINT)
+
+
+async def _session_loop(session: PromptSession[str], console: Console) -> None:
+    """Loop do REPL rodando em um único event loop de longa duração."""
+    try:
+        while True:
+            try:
+                cmd = await session.prompt_async("telegram> ")
+                if not await _run_command(cmd, console):
+                    break
+            except KeyboardInterrupt:
+                console.print("\n[dim]Use 'exit' para sair[/]")
+            except EOFError:
+                break
+            except Exception as e:
+                console.print(f"[red]Erro: {e}[/]")
+    finally:
+        # Cleanup: desconectar pool no mesmo loop em que foi conectado
+        console.print("[dim]Fechando conexão...[/]")
+        with contextlib.suppress(Exception):
+            await wait_background()
+            await shutdown_pool()
+        dump_metrics()
+
+
 def start_session() -> None:
     """Inicia sessão interativa REPL."""
     console = Console()
@@ -187,22 +293,4 @@ def start_session() -> None:
 
     show_banner(console)
 
-    try:
-        while True:
-            try:
-                cmd = session.prompt("telegram> ")
-                if not process_command(cmd, console):
-                    break
-            except KeyboardInterrupt:
-                console.print("\n[dim]Use 'exit' para sair[/]")
-            except EOFError:
-                break
-            except Exception as e:
-                console.print(f"[red]Erro: {e}[/]")
-    finally:
-        import contextlib
-
-        # Cleanup: desconectar pool
-        console.print("[dim]Fechando conexão...[/]")
-        with contextlib.suppress(Exception):
-            asyncio.run(shutdown_pool())
+    asyncio.run(_session_loop(session, console))
@@ -0,0 +1,400 @@
+"""Testes do agendamento de backups múltiplos e do `--follow`."""
+
+import asyncio
+import io
+import json
+from collections.abc import AsyncIterator
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+from rich.console import Console
+from rich.progress import Progress
+
+from telegram_gfcr.commands.backup import (
+    DELETIONS_FILE,
+    RANGES_DIR,
+    BackupOptions,
+    BackupResult,
+    MessageFilter,
+    _filtered_pass,
+    _follow_entity,
+    _FollowTarget,
+    _gap_ticker,
+    _resolve_targets,
+    make_options,
+)
+from telegram_gfcr.core.media import MediaFilter
+from telegram_gfcr.core.ratelimit import RateLimiter
+from telegram_gfcr.core.state import BackupCheckpoint, StateStore
+from telegram_gfcr.core.storage import iter_backup_lines
+
+
+@pytest.mark.asyncio
+async def test_targets_merge_args_and_file(tmp_path: Path) -> None:
+    """Testa união de ids da linha de comando e do arquivo, sem repetir e na ordem."""
+    ids_file = tmp_path / "chats.txt"
+    ids_file.write_text("# grupos da equipe\n-100123\n\n456  # suporte\n789\n")
+
+    assert await _resolve_targets([789, 1], str(ids_file), None) == [789, 1, -100123, 456]
+
+
+def _message(message_id: int, text: str = "") -> Any:
+    return SimpleNamespace(
+        id=message_id,
+        date=datetime(2024, 1, 1, tzinfo=UTC),
+        chat_id=1,
+        sender=None,
+        sender_id=None,
+        message=text,
+        reply_to_msg_id=None,
+        grouped_id=None,
+        media=None,
+        entities=None,
+    )
+
+
+async def _drain(target: _FollowTarget, follow: asyncio.Task[None]) -> None:
+    """Espera o `--follow` consumir a fila e o cancela, propagando falhas da task."""
+
+    async def _empty() -> None:
+        while not target.queue.empty() and not follow.done():
+            await asyncio.sleep(0.01)
+        await asyncio.sleep(0.01)
+
+    await asyncio.wait_for(_empty(), timeout=5)
+    if follow.done():
+        follow.result()  # Falha do follow aparece aqui, não como timeout
+    follow.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await follow
+
+
+async def _run_fake_backup(config: Any, output: Path, **kwargs: Any) -> Any:
+    """Roda `run_backup_async` do canal simulado, sem limite de taxa; devolve o cliente."""
+    from benchmarks.fake_client import CHANNEL_ID, FakeTelegramClient
+    from telegram_gfcr.commands import backup
+    from telegram_gfcr.config import reload_settings
+    from telegram_gfcr.core.client import TelegramClientWrapper, get_pool, shutdown_pool
+    from telegram_gfcr.core.ratelimit import DEFAULT_RATES
+
+    backup.console.quiet = True
+    reload_settings()
+    fake = FakeTelegramClient(config)
+    pool = await get_pool()
+    pool.rate_limiter = RateLimiter({key: (1e9, 1e9) for key in DEFAULT_RATES})
+    pool._wrapper = TelegramClientWrapper(pool.rate_limiter)
+    pool._wrapper._client = fake  # type: ignore[assignment]
+    try:
+        await backup.run_backup_async([-(1_000_000_000_000 + CHANNEL_ID)], str(output), **kwargs)
+    finally:
+        await shutdown_pool()
+    return fake
+
+
+class FakeClient:
+    """Só o que o `--follow` usa do wrapper: histórico acima de `min_id` e peers."""
+
+    def __init__(self, history: list[int]) -> None:
+        self.client = self
+        self.history = history
+        self.rate_limiter = RateLimiter({"history": (1e9, 1e9)})
+
+        async def flush() -> None:
+            pass
+
+        self.peers = SimpleNamespace(remember=lambda sender: None, flush=flush)
+
+    async def iter_messages(self, peer: Any, min_id: int, reverse: bool) -> AsyncIterator[Any]:
+        for message_id in self.history:
+            if message_id > min_id:
+                yield _message(message_id)
+
+
+@pytest.mark.asyncio
+async def test_follow_fills_gap_and_applies_events(tmp_path: Path) -> None:
+    """Testa lacuna, evento repetido, edição (sem avançar checkpoint) e exclusão."""
+    output = tmp_path / "backup"
+    output.mkdir()
+    target = _FollowTarget(BackupResult(1, output), peer=1)
+    for event in [
+        ("gap", None),
+        ("new", _message(3)),  # já veio pela lacuna
+        ("new", _message(4)),
+        ("edited", _message(2, "editada")),
+        ("deleted", [1]),
+    ]:
+        target.queue.put_nowait(event)
+
+    options = BackupOptions(media=False, workers=1, compression="none", fmt="compact", split=0)
+    async with StateStore(tmp_path / "state.db") as state:
+        with Progress(console=Console(file=io.StringIO())) as progress:
+            follow = asyncio.create_task(
+                _follow_entity(
+                    FakeClient([1, 2, 3]),
+                    state,
+                    None,
+                    None,
+                    target,
+                    options,  # type: ignore[arg-type]
+                    progress,
+                    progress.add_task("follow"),
+                )
+            )
+            await _drain(target, follow)
+
+        checkpoint = await state.get_checkpoint(1, str(output.resolve()))
+
+    records = [json.loads(line) for line in iter_backup_lines(output)]
+    assert [(r["id"], r["text"]) for r in records] == [
+        (1, ""),
+        (2, ""),
+        (3, ""),
+        (4, ""),
+        (2, "editada"),
+    ]
+    assert (checkpoint.min_id, checkpoint.max_id) == (1, 4)
+    deletions = json.loads((output / DELETIONS_FILE).read_text())
+    assert deletions["ids"] == [1]
+    assert (target.new, target.edited, target.deleted) == (4, 1, 1)
+
+
+@pytest.mark.asyncio
+async def test_gap_ticker_requests_gap_fills(tmp_path: Path) -> None:
+    """Testa que a busca periódica pede lacuna a todos os chats acompanhados."""
+    targets = [_FollowTarget(BackupResult(n, tmp_path / str(n)), peer=n) for n in (1, 2)]
+    ticker = asyncio.create_task(_gap_ticker(targets, 0.01))
+    await asyncio.sleep(0.035)
+    ticker.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await ticker
+
+    for target in targets:
+        assert target.queue.qsize() >= 2
+        assert target.queue.get_nowait() == ("gap", None)
+
+
+@pytest.mark.asyncio
+async def test_follow_applies_media_filter(tmp_path: Path) -> None:
+    """Testa que o `--follow` não baixa mídias recusadas pelo filtro."""
+    output = tmp_path / "backup"
+    output.mkdir()
+    target = _FollowTarget(BackupResult(1, output), peer=1)
+    message = _message(2)
+    message.media = object()
+    message.photo, message.document = None, SimpleNamespace(id=9)
+    message.file = SimpleNamespace(size=2 * 1024 * 1024, mime_type="video/mp4", name=None)
+    for event in [("gap", None), ("new", message)]:
+        target.queue.put_nowait(event)
+
+    options = BackupOptions(
+        media=True,
+        workers=1,
+        compression="none",
+        fmt="compact",
+        split=0,
+        media_filter=MediaFilter(max_bytes=1024 * 1024),
+    )
+    async with StateStore(tmp_path / "state.db") as state:
+        with Progress(console=Console(file=io.StringIO())) as progress:
+            follow = asyncio.create_task(
+                _follow_entity(
+                    FakeClient([1]),
+                    state,
+                    None,
+                    None,
+                    target,
+                    options,  # type: ignore[arg-type]
+                    progress,
+                    progress.add_task("follow"),
+                )
+            )
+            await _drain(target, follow)
+
+        output_key = str(output.resolve())
+        pending = await state.get_media(1, output_key, done=False)
+        done = await state.get_media(1, output_key, done=True)
+
+    assert target.new == 2
+    assert (pending, done) == (set(), set())
+    assert not (output / "media").exists() or not any((output / "media").iterdir())
+
+
+@pytest.mark.asyncio
+async def test_filtered_pass_maps_limits_to_server() -> None:
+    """Testa ids inclusivos → exclusivos, `until` como offset_date e parada em `since`."""
+    start = datetime(2024, 1, 1, tzinfo=UTC)
+    requests: list[dict[str, Any]] = []
+
+    class HistoryClient(FakeClient):
+        async def iter_messages(self, peer: Any, **kwargs: Any) -> AsyncIterator[Any]:
+            requests.append(kwargs)
+            for day in range(9, -1, -1):
+                message = _message(day + 1)
+                message.date = start + timedelta(days=day)
+                yield message
+
+    filters = MessageFilter(
+        since=start + timedelta(days=7), until=start + timedelta(days=30), min_id=2, max_id=50
+    )
+    client = HistoryClient([])
+    messages = [m async for m in _filtered_pass(client, 1, filters)]  # type: ignore[arg-type]
+
+    assert [m.id for m in messages] == [10, 9, 8]
+    assert requests == [{"offset_date": filters.until, "min_id": 1, "max_id": 51}]
+
+
+def test_options_validate_filters() -> None:
+    """Testa datas com fuso e recusa de faixas invertidas."""
+    options = make_options(False, since="2024-01-01", until="2024-04-01")
+    assert options.messages.active
+    assert options.messages.since is not None and options.messages.since.tzinfo is not None
+
+    with pytest.raises(ValueError, match="--since"):
+        make_options(False, since="2024-04-01", until="2024-01-01")
+    with pytest.raises(ValueError, match="--min-id"):
+        make_options(False, min_id=10, max_id=5)
+
+
+@pytest.mark.asyncio
+async def test_empty_chat_then_messages_arrive(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Testa que um chat vazio no primeiro backup não fica "completo" para sempre."""
+    from benchmarks.fake_client import FakeConfig
+    from benchmarks.worker import run_scenario
+
+    monkeypatch.setenv("TELEGRAM_DATA_DIR", str(tmp_path / "data"))
+    first = await run_scenario("backup", FakeConfig(messages=0, latency=0), True, tmp_path)
+    second = await run_scenario("backup", FakeConfig(messages=50, latency=0), True, tmp_path)
+
+    assert (first["items"], second["items"]) == (0, 50)
+    ids = [json.loads(line)["id"] for line in iter_backup_lines(tmp_path / "backup")]
+    assert ids == list(range(1, 51))
+
+
+@pytest.mark.asyncio
+async def test_pending_media_respects_filter(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Testa que mídias pendentes recusadas pelo filtro não são baixadas e seguem pendentes."""
+    from benchmarks.fake_client import FakeConfig
+    from benchmarks.worker import run_scenario
+
+    monkeypatch.setenv("TELEGRAM_DATA_DIR", str(tmp_path / "data"))
+    # Backup sem mídias: checkpoint completo, nada novo na segunda execução
+    config = FakeConfig(messages=10, latency=0, media_every=2, media_size=64 * 1024)
+    await run_scenario("backup", config, True, tmp_path)
+
+    output_key = str((tmp_path / "backup").resolve())
+    async with StateStore() as state:
+        (checkpoint,) = await state.list_checkpoints()
+        await state.mark_media(checkpoint.entity_id, output_key, [2, 4], done=False)
+
+    fake = await _run_fake_backup(config, tmp_path / "backup", media=True, max_media_mb=0.01)
+
+    async with StateStore() as state:
+        pending = await state.get_media(checkpoint.entity_id, output_key, done=False)
+
+    assert fake.rpcs["GetFile"] == 0
+    assert pending == {2, 4}
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("filtered_first", [True, False])
+async def test_filtered_and_incremental_never_share_output(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, filtered_first: bool
+) -> None:
+    """Testa que recorte e backup incremental recusam o diretório um do outro."""
+    from benchmarks.fake_client import FakeConfig
+
+    monkeypatch.setenv("TELEGRAM_DATA_DIR", str(tmp_path / "data"))
+    config = FakeConfig(messages=20, latency=0)
+    output = tmp_path / "backup"
+    runs = [{"min_id": 5, "max_id": 10}, {}]
+    if not filtered_first:
+        runs.reverse()
+
+    for kwargs in runs:
+        await _run_fake_backup(config, output, media=False, **kwargs)
+
+    ids = [json.loads(line)["id"] for line in iter_backup_lines(output)]
+    assert ids == (list(range(10, 4, -1)) if filtered_first else list(range(20, 0, -1)))
+
+
+@pytest.mark.asyncio
+async def test_filtered_marker_only_with_messages(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Testa que recorte sem chat resolvido ou sem mensagens não marca o diretório."""
+    from benchmarks.fake_client import FakeConfig, FakeTelegramClient
+
+    monkeypatch.setenv("TELEGRAM_DATA_DIR", str(tmp_path / "data"))
+    config = FakeConfig(messages=20, latency=0)
+    output = tmp_path / "backup"
+
+    async def missing(self: Any, entity_id: int) -> Any:
+        raise ValueError(f"Cannot find any entity corresponding to {entity_id}")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(FakeTelegramClient, "get_entity", missing)
+        await _run_fake_backup(config, output, media=False, min_id=5, max_id=10)
+    await _run_fake_backup(config, output, media=False, min_id=100, max_id=200)
+    assert not (output / ".filtered").exists()
+
+    await _run_fake_backup(config, output, media=False)
+    ids = [json.loads(line)["id"] for line in iter_backup_lines(output)]
+    assert ids == list(range(20, 0, -1))
+
+
+@pytest.mark.asyncio
+async def test_ranges_resume_checks_compression_first(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Testa que retomar faixas com outro --compress falha antes de buscar o histórico."""
+    from benchmarks.fake_client import FakeConfig
+
+    monkeypatch.setenv("TELEGRAM_DATA_DIR", str(tmp_path / "data"))
+    output = tmp_path / "backup"
+    (output / RANGES_DIR).mkdir(parents=True)
+    (output / RANGES_DIR / "plan.json").write_text(
+        json.dumps({"bounds": [0, 10, 20], "compression": "gzip"})
+    )
+
+    fake = await _run_fake_backup(
+        FakeConfig(messages=20, latency=0), output, media=False, ranges=2, compression="none"
+    )
+
+    assert fake.rpcs["GetHistory"] == 0
+    assert list(iter_backup_lines(output)) == []
+
+
+@pytest.mark.asyncio
+async def test_sequential_run_discards_orphaned_ranges(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Testa que um backup sem --ranges descarta as faixas de uma execução interrompida."""
+    from benchmarks.fake_client import CHANNEL_ID, FakeConfig
+    from telegram_gfcr.config import reload_settings
+
+    monkeypatch.setenv("TELEGRAM_DATA_DIR", str(tmp_path / "data"))
+    reload_settings()
+    output = tmp_path / "backup"
+    part = output / RANGES_DIR / "000"
+    part.mkdir(parents=True)
+    (output / RANGES_DIR / "plan.json").write_text(json.dumps({"bounds": [0, 10, 20]}))
+    entity_id = -(1_000_000_000_000 + CHANNEL_ID)
+    async with StateStore() as state:
+        await state.save_checkpoint(
+            BackupCheckpoint(entity_id, str(part.resolve()), max_id=9, min_id=5)
+        )
+
+    await _run_fake_backup(FakeConfig(messages=20, latency=0), output, media=False)
+
+    assert not (output / RANGES_DIR).exists()
+    async with StateStore() as state:
+        assert [c.output for c in await state.list_checkpoints()] == [str(output.resolve())]
+    ids = [json.loads(line)["id"] for line in iter_backup_lines(output)]
+    assert ids == list(range(20, 0, -1))
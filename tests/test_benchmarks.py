@@ -0,0 +1,38 @@
+"""Smoke test do harness de benchmarks (cliente simulado, sem rede)."""
+
+import json
+from pathlib import Path
+
+import pytest
+
+from benchmarks.fake_client import FakeConfig
+from benchmarks.worker import run_scenario
+from telegram_gfcr.commands.backup import RANGES_DIR
+from telegram_gfcr.core.storage import iter_backup_lines
+
+
+@pytest.mark.asyncio
+async def test_backup_scenario_runs(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Testa que o cenário de backup percorre todo o histórico simulado."""
+    monkeypatch.setenv("TELEGRAM_DATA_DIR", str(tmp_path / "data"))
+    config = FakeConfig(messages=250, latency=0, flood_every=2, flood_seconds=0)
+
+    result = await run_scenario("backup", config, unlimited=True, workdir=tmp_path)
+
+    assert result["items"] == 250
+    assert result["rpcs_by_method"]["GetHistory"] == 3
+    assert result["limiter_wait_s"] == 0
+
+
+@pytest.mark.asyncio
+async def test_backup_ranges_scenario(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Testa que as faixas paralelas juntam o histórico inteiro, sem repetir, em ordem."""
+    monkeypatch.setenv("TELEGRAM_DATA_DIR", str(tmp_path / "data"))
+    config = FakeConfig(messages=250, latency=0, page_size=30)
+
+    await run_scenario("backup-ranges", config, unlimited=True, workdir=tmp_path)
+
+    backup = tmp_path / "backup"
+    ids = [json.loads(line)["id"] for line in iter_backup_lines(backup)]
+    assert ids == list(range(250, 0, -1))
+    assert not (backup / RANGES_DIR).exists()
@@ -1,8 +1,16 @@
 """Testes do CLI principal."""
 
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
 from typer.testing import CliRunner
 
+from telegram_gfcr import cli
 from telegram_gfcr.cli import app
+from telegram_gfcr.commands import backup
 
 runner = CliRunner()
 
@@ -33,3 +41,89 @@ def test_backup_help() -> None:
     result = runner.invoke(app, ["backup", "--help"])
     assert result.exit_code == 0
     assert "Faz backup" in result.stdout
+
+
+# Orçamento de startup: importar o CLI (o que --help, --version e o shell
+# completion pagam) sem Telethon, pydantic-settings nem loguru
+STARTUP_BUDGET_S = 0.4
+HEAVY_MODULES = ("telethon", "pydantic_settings", "loguru", "telegram_gfcr.config")
+
+
+def _clean_env(home: Path) -> dict[str, str]:
+    """Ambiente sem TELEGRAM_*: se algo construir Settings, a validação falha."""
+    env = {k: v for k, v in os.environ.items() if not k.startswith("TELEGRAM_")}
+    env["HOME"] = str(home)
+    return env
+
+
+def test_startup_budget(tmp_path: Path) -> None:
+    """Testa o tempo de import do CLI e que módulos pesados ficam de fora."""
+    code = (
+        "import sys, time\n"
+        "start = time.perf_counter()\n"
+        "import telegram_gfcr.cli\n"
+        "elapsed = time.perf_counter() - start\n"
+        f"heavy = [m for m in {HEAVY_MODULES!r} if m in sys.modules]\n"
+        "print(elapsed, ','.join(heavy))\n"
+    )
+    proc = subprocess.run(
+        [sys.executable, "-c", code],
+        env=_clean_env(tmp_path),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    elapsed, _, heavy = proc.stdout.strip().partition(" ")
+    assert heavy == ""
+    assert float(elapsed) < STARTUP_BUDGET_S
+
+
+def test_local_commands_skip_telethon(tmp_path: Path) -> None:
+    """Testa que `index` e `stats` (só disco local) não importam o Telethon."""
+    (tmp_path / "backups").mkdir()
+    code = (
+        "import sys\n"
+        "from telegram_gfcr.cli import app\n"
+        f"app(['index', {str(tmp_path / 'backups')!r}], standalone_mode=False)\n"
+        "app(['stats'], standalone_mode=False)\n"
+        "print('telethon' in sys.modules)\n"
+    )
+    env = _clean_env(tmp_path) | {
+        "TELEGRAM_API_ID": "1",
+        "TELEGRAM_API_HASH": "x",
+        "TELEGRAM_PHONE": "1",
+        "TELEGRAM_DATA_DIR": str(tmp_path / "data"),
+    }
+    proc = subprocess.run(
+        [sys.executable, "-c", code], env=env, capture_output=True, text=True, check=True
+    )
+    assert proc.stdout.strip().splitlines()[-1] == "False"
+
+
+def test_help_does_not_touch_settings(tmp_path: Path) -> None:
+    """Testa que --help e --version rodam sem configuração e sem criar diretórios."""
+    for args in (["--help"], ["--version"], ["backup", "--help"]):
+        proc = subprocess.run(
+            [sys.executable, "-m", "telegram_gfcr.cli", *args],
+            env=_clean_env(tmp_path),
+            capture_output=True,
+            text=True,
+            check=False,
+        )
+        assert proc.returncode == 0, proc.stderr
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_follow_never_goes_to_daemon(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Testa que `backup --follow` (que não termina) roda local, sem prender o daemon."""
+    daemon_calls: list[str] = []
+    local_calls: list[bool] = []
+    monkeypatch.setattr(cli, "_in_daemon", lambda command, **args: daemon_calls.append(command))
+    monkeypatch.setattr(cli, "_setup", lambda: None)
+    monkeypatch.setattr(backup, "run_backup", lambda **args: local_calls.append(args["follow"]))
+
+    assert runner.invoke(app, ["backup", "1001", "--follow"]).exit_code == 0
+    assert runner.invoke(app, ["backup", "1001"]).exit_code == 0
+
+    assert local_calls == [True, False]
+    assert daemon_calls == ["backup"]
@@ -0,0 +1,25 @@
+"""Testes do ciclo de vida do modo one-shot."""
+
+import asyncio
+import time
+
+import pytest
+
+from telegram_gfcr.core import client
+from telegram_gfcr.core.client import run_async, spawn_background
+
+
+def test_one_shot_does_not_wait_for_background(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Testa que o refresh em segundo plano não segura a saída do comando one-shot."""
+    monkeypatch.setattr(client, "BACKGROUND_GRACE_SECONDS", 0.05)
+    refresh: list[asyncio.Task[None]] = []
+
+    async def command() -> str:
+        refresh.append(spawn_background(asyncio.sleep(10)))
+        return "ok"
+
+    started = time.perf_counter()
+    assert run_async(command()) == "ok"
+
+    assert time.perf_counter() - started < 2
+    assert refresh[0].cancelled()
@@ -0,0 +1,37 @@
+"""Testes das configurações."""
+
+import stat
+from pathlib import Path
+
+import pytest
+
+from telegram_gfcr.config import get_settings, reload_settings
+
+
+def test_settings_memoized_and_reload(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Testa que o ambiente é lido uma vez e relido apenas no reload."""
+    settings = get_settings()
+    assert get_settings() is settings
+
+    monkeypatch.setenv("TELEGRAM_DATA_DIR", str(tmp_path))
+    assert get_settings().data_dir != tmp_path
+
+    try:
+        assert reload_settings().data_dir == tmp_path
+        assert get_settings().data_dir == tmp_path
+    finally:
+        monkeypatch.undo()
+        reload_settings()
+
+
+def test_prepare_session_permissions(tmp_path: Path) -> None:
+    """Testa que a sessão nova nasce 0600 e a antiga é corrigida."""
+    settings = get_settings().model_copy(update={"data_dir": tmp_path / "data"})
+
+    path = settings.prepare_session()
+    session_file = path.with_suffix(".session")
+    assert stat.S_IMODE(session_file.stat().st_mode) == 0o600
+
+    session_file.chmod(0o644)
+    settings.prepare_session()
+    assert stat.S_IMODE(session_file.stat().st_mode) == 0o600
@@ -0,0 +1,111 @@
+"""Testes do daemon (socket Unix) com handlers locais, sem Telegram."""
+
+import asyncio
+import io
+import stat
+import threading
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+from rich.console import Console
+
+from telegram_gfcr.config import reload_settings
+from telegram_gfcr.core import daemon
+from telegram_gfcr.core.terminal import Terminal, console, use_terminal, workdir
+
+
+async def _echo(text: str) -> None:
+    # O `console` compartilhado pelos comandos escreve no socket do cliente
+    console.print(f"{text} em {workdir().name}")
+
+
+async def _fail() -> None:
+    raise ValueError("quebrou")
+
+
+@pytest.fixture
+def server(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Iterator[Path]:
+    """Daemon rodando em outra thread, com socket em tmp_path."""
+    path = tmp_path / "d.sock"
+    monkeypatch.setenv("TELEGRAM_DAEMON_SOCKET", str(path))
+    reload_settings()
+
+    loop = asyncio.new_event_loop()
+    handlers = {"echo": daemon._in_terminal(_echo), "fail": daemon._in_terminal(_fail)}
+    instance = daemon.DaemonServer(path, handlers)
+    loop.run_until_complete(instance.start())
+    thread = threading.Thread(target=loop.run_until_complete, args=(instance.stopped.wait(),))
+    thread.start()
+    try:
+        yield tmp_path
+    finally:
+        if not instance.stopped.is_set():
+            daemon.stop()
+        thread.join(timeout=5)
+        loop.run_until_complete(instance.close())
+        loop.close()
+        monkeypatch.undo()
+        reload_settings()
+
+
+def test_roundtrip(
+    server: Path, monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture[str]
+) -> None:
+    """Testa socket 0600, saída repassada, cwd do cliente e erro do handler."""
+    workdir = server / "cliente"
+    workdir.mkdir()
+    monkeypatch.chdir(workdir)
+
+    assert stat.S_IMODE((server / "d.sock").stat().st_mode) == 0o600
+    assert daemon.ping()
+    assert daemon.run_in_daemon("echo", text="olá")
+    assert "olá em cliente" in capsys.readouterr().out
+
+    assert daemon.run_in_daemon("fail")
+    assert "quebrou" in capsys.readouterr().out
+
+    assert daemon.stop()
+
+
+def test_rejects_other_settings(
+    server: Path, monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture[str]
+) -> None:
+    """Testa que um cliente com outra configuração é recusado, sem rodar o comando."""
+    monkeypatch.setenv("TELEGRAM_BACKUP_FORMAT", "compact")
+    reload_settings()
+
+    assert daemon.run_in_daemon("echo", text="olá")
+    out = capsys.readouterr().out
+    assert "configurações diferentes" in out
+    assert "olá" not in out
+
+
+def test_without_daemon(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Testa que, sem socket, o comando fica para rodar localmente."""
+    monkeypatch.setenv("TELEGRAM_DAEMON_SOCKET", str(tmp_path / "ausente.sock"))
+    reload_settings()
+    try:
+        assert not daemon.ping()
+        assert not daemon.run_in_daemon("echo", text="olá")
+    finally:
+        monkeypatch.undo()
+        reload_settings()
+
+
+@pytest.mark.asyncio
+async def test_terminals_do_not_mix(tmp_path: Path) -> None:
+    """Testa que comandos simultâneos escrevem cada um no seu terminal."""
+    outputs = [io.StringIO(), io.StringIO()]
+
+    async def command(n: int) -> None:
+        terminal = Terminal(Console(file=outputs[n]), tmp_path / f"c{n}")
+        with use_terminal(terminal):
+            for _ in range(3):
+                await _echo(f"cmd{n}")
+                await asyncio.sleep(0)
+
+    await asyncio.gather(command(0), command(1))
+
+    assert outputs[0].getvalue().split("\n")[:3] == ["cmd0 em c0"] * 3
+    assert outputs[1].getvalue().split("\n")[:3] == ["cmd1 em c1"] * 3
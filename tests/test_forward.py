@@ -0,0 +1,20 @@
+"""Testes do agrupamento de mensagens para encaminhamento."""
+
+from telegram_gfcr.commands.forward import build_batches
+
+
+def test_batches_respect_max_size() -> None:
+    """Testa divisão em batches preservando a ordem."""
+    messages = [(n, None) for n in range(1, 251)]
+    batches = build_batches(messages)
+
+    assert [len(b) for b in batches] == [100, 100, 50]
+    assert [n for batch in batches for n in batch] == list(range(1, 251))
+
+
+def test_batches_keep_albums_together() -> None:
+    """Testa que álbuns (grouped_id) nunca são separados."""
+    messages = [(1, None), (2, None), (3, 77), (4, 77), (5, 77), (6, None), (7, 88), (8, 88)]
+    batches = build_batches(messages, max_size=4)
+
+    assert batches == [[1, 2], [3, 4, 5, 6], [7, 8]]
@@ -0,0 +1,67 @@
+"""Testes do índice de busca local (FTS5)."""
+
+import json
+from datetime import UTC, datetime
+from pathlib import Path
+
+import pytest
+
+from telegram_gfcr.core.index import SearchIndex, fts_query
+
+
+def _line(message_id: int, text: str, day: int, user_id: int = 42) -> str:
+    return json.dumps(
+        {
+            "_": "Message",
+            "id": message_id,
+            "peer_id": {"_": "PeerChannel", "channel_id": 123},
+            "date": datetime(2024, 1, day, tzinfo=UTC).isoformat(),
+            "message": text,
+            "from_id": {"_": "PeerUser", "user_id": user_id},
+        }
+    )
+
+
+def test_fts_query_escapes_terms() -> None:
+    """Testa escape de aspas e operadores do FTS5."""
+    assert fts_query('foo "bar" OR') == '"foo" """bar""" "OR"'
+
+
+@pytest.mark.asyncio
+async def test_index_is_incremental(tmp_path: Path) -> None:
+    """Testa indexação incremental e filtros da busca."""
+    backup = tmp_path / "123" / "messages.jsonl"
+    backup.parent.mkdir()
+    backup.write_text(_line(1, "reunião de planejamento", 1) + "\n" + _line(2, "almoço", 2) + "\n")
+
+    async with SearchIndex(tmp_path / "index.db") as index:
+        assert await index.index_tree(tmp_path) == 2
+        assert await index.index_tree(tmp_path) == 0
+
+        with backup.open("a") as f:
+            f.write(_line(3, "nova reuniao amanhã", 3, user_id=7) + "\n")
+            f.write('{"incompleta"')
+        assert await index.index_tree(tmp_path) == 1
+
+        hits = await index.search("reuniao")
+        assert {hit.message_id for hit in hits} == {1, 3}
+        assert hits[0].entity_id == -1_000_000_000_123
+
+        hits = await index.search("reuniao", sender_id=7)
+        assert [hit.message_id for hit in hits] == [3]
+
+        hits = await index.search("reuniao", until=datetime(2024, 1, 2, tzinfo=UTC))
+        assert [hit.message_id for hit in hits] == [1]
+
+
+@pytest.mark.asyncio
+async def test_empty_query_finds_nothing(tmp_path: Path) -> None:
+    """Testa que consulta vazia não chega ao FTS5 (`MATCH ''` é inválido)."""
+    backup = tmp_path / "123" / "messages.jsonl"
+    backup.parent.mkdir()
+    backup.write_text(_line(1, "reunião", 1) + "\n")
+
+    async with SearchIndex(tmp_path / "index.db") as index:
+        await index.index_tree(tmp_path)
+        assert await index.search("") == []
+        assert await index.search("   ") == []
@@ -0,0 +1,23 @@
+"""Testes do parsing de comandos do REPL."""
+
+from typing import Any
+
+import pytest
+from rich.console import Console
+
+from telegram_gfcr.commands import backup
+from telegram_gfcr.interactive import process_command
+
+
+@pytest.mark.asyncio
+async def test_backup_accepts_negative_ids(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Testa que ids negativos (grupos/canais) não são confundidos com flags."""
+    calls: list[tuple[Any, ...]] = []
+
+    async def fake_backup(entity_ids: list[int], output: Any, media: bool, **kwargs: Any) -> None:
+        calls.append((entity_ids, media, kwargs["follow"]))
+
+    monkeypatch.setattr(backup, "run_backup_async", fake_backup)
+
+    assert await process_command("backup -1001234567 42 --media", Console(quiet=True))
+    assert calls == [([-1001234567, 42], True, False)]
@@ -0,0 +1,24 @@
+"""Testes do comando de sair de grupos."""
+
+from typing import Any
+
+import pytest
+from telethon import errors
+
+from telegram_gfcr.commands.leave import _leave_with_retry
+from telegram_gfcr.core.errors import TelegramPermissionError, handle_telethon_errors
+
+
+class PrivateChannelClient:
+    """Wrapper cujo `resolve` (convertido como o real) esbarra num canal privado."""
+
+    @handle_telethon_errors("resolve")
+    async def resolve(self, entity_id: int) -> Any:
+        raise errors.ChannelPrivateError(request=None)
+
+
+@pytest.mark.asyncio
+async def test_leave_private_channel_keeps_permission_error() -> None:
+    """Testa que o erro convertido no `resolve` atravessa o decorator do `leave`."""
+    with pytest.raises(TelegramPermissionError, match="Canal privado"):
+        await _leave_with_retry(PrivateChannelClient(), -1001234567)  # type: ignore[arg-type]
@@ -0,0 +1,56 @@
+"""Testes da configuração de logging."""
+
+import json
+import logging
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+from loguru import logger
+
+from telegram_gfcr.config import reload_settings
+from telegram_gfcr.core.logging import sampled, setup_logging
+from telegram_gfcr.core.metrics import TelethonFloodHandler
+
+
+@pytest.fixture
+def log_settings(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Iterator[Path]:
+    """Logging configurado em um data dir temporário, com JSON lines e amostragem 1/3."""
+    monkeypatch.setenv("TELEGRAM_DATA_DIR", str(tmp_path))
+    monkeypatch.setenv("TELEGRAM_LOG_JSON", "true")
+    monkeypatch.setenv("TELEGRAM_LOG_SAMPLE_EVERY", "3")
+    reload_settings()
+    setup_logging()
+    yield tmp_path / "logs"
+    logger.remove()
+    monkeypatch.undo()
+    reload_settings()
+
+
+def test_json_sink_carries_context(log_settings: Path) -> None:
+    """Testa o contexto ligado (command, entity_id, message_id) no sink JSON lines."""
+    with logger.contextualize(command="backup", entity_id=42):
+        logger.info("Mídia msg {message_id} pulada", message_id=7)
+    logger.complete()
+
+    (jsonl,) = log_settings.glob("*.jsonl")
+    records = [json.loads(line)["record"] for line in jsonl.read_text().splitlines()]
+    record = next(r for r in records if r["message"] == "Mídia msg 7 pulada")
+    assert record["extra"] == {"command": "backup", "entity_id": 42, "message_id": 7}
+
+
+def test_sampled(log_settings: Path) -> None:
+    """Testa que passa 1 a cada N eventos por chave, começando pelo primeiro."""
+    assert [sampled("a") for _ in range(7)] == [True, False, False, True, False, False, True]
+    assert sampled("b")
+
+
+def test_setup_installs_flood_handler_once(log_settings: Path) -> None:
+    """Testa que o handler de FloodWait do Telethon é instalado uma vez, no setup."""
+    telethon_logger = logging.getLogger("telethon.client.users")
+    setup_logging()
+
+    handlers = [h for h in telethon_logger.handlers if isinstance(h, TelethonFloodHandler)]
+    assert len(handlers) == 1
+    assert telethon_logger.getEffectiveLevel() <= logging.INFO
+    telethon_logger.removeHandler(handlers[0])
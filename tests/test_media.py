@@ -0,0 +1,129 @@
+"""Testes do pool de download de mídias."""
+
+import asyncio
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from telegram_gfcr.core.media import MediaDownloadPool, MediaFilter, MediaStore
+from telegram_gfcr.core.state import StateStore
+
+
+class FakeMessage:
+    """Mensagem mínima com download simulado."""
+
+    in_flight = 0
+    peak = 0
+
+    def __init__(self, message_id: int, fail: bool = False) -> None:
+        self.id = message_id
+        self.fail = fail
+
+    async def download_media(self, file: str) -> None:
+        FakeMessage.in_flight += 1
+        FakeMessage.peak = max(FakeMessage.peak, FakeMessage.in_flight)
+        await asyncio.sleep(0.01)
+        FakeMessage.in_flight -= 1
+        if self.fail:
+            raise OSError("disco cheio")
+
+
+@pytest.mark.asyncio
+async def test_pool_downloads_concurrently(tmp_path: Path) -> None:
+    """Testa que workers drenam a fila em paralelo e reportam falhas."""
+    results: dict[int, bool] = {}
+
+    async with MediaDownloadPool(
+        tmp_path, workers=3, queue_size=2, on_result=results.__setitem__
+    ) as pool:
+        for n in range(10):
+            await pool.put(FakeMessage(n, fail=n == 7))
+
+    assert len(results) == 10
+    assert results[7] is False
+    assert all(ok for n, ok in results.items() if n != 7)
+    assert FakeMessage.peak == 3
+
+
+class FakeFile:
+    def __init__(self, name: str | None, ext: str) -> None:
+        self.name = name
+        self.ext = ext
+
+
+class FakeDocument:
+    def __init__(self, document_id: int) -> None:
+        self.id = document_id
+
+
+class StoredMessage:
+    """Mensagem com documento; conta downloads reais."""
+
+    downloads = 0
+
+    def __init__(self, message_id: int, document_id: int) -> None:
+        self.id = message_id
+        self.photo = None
+        self.document = FakeDocument(document_id)
+        self.file = FakeFile("meme.webp", ".webp")
+
+    async def download_media(self, file: str) -> str:
+        StoredMessage.downloads += 1
+        Path(file).write_bytes(b"conteudo")
+        return file
+
+
+@pytest.mark.asyncio
+async def test_store_deduplicates_across_backups(tmp_path: Path) -> None:
+    """Testa que a mesma mídia em dois backups é baixada uma vez e linkada nos dois."""
+    async with StateStore(tmp_path / "state.db") as state:
+        store = MediaStore(state, tmp_path / "store")
+        for chat in ("a", "b"):
+            media_dir = tmp_path / chat / "media"
+            media_dir.mkdir(parents=True)
+            async with MediaDownloadPool(media_dir, workers=2, store=store) as pool:
+                await pool.put(StoredMessage(1, 555))
+                await pool.put(StoredMessage(2, 555))
+
+    assert StoredMessage.downloads == 1
+    assert (store.downloads, store.hits) == (1, 3)
+    assert (tmp_path / "b" / "media" / "2_meme.webp").read_bytes() == b"conteudo"
+    assert (tmp_path / "a" / "media" / "1_meme.webp").stat().st_nlink == 5
+
+
+@pytest.mark.asyncio
+async def test_store_redownloads_corrupted_object(tmp_path: Path) -> None:
+    """Testa que um objeto com o tamanho certo mas sha256 diferente é baixado de novo."""
+    async with StateStore(tmp_path / "state.db") as state:
+        path = await MediaStore(state, tmp_path / "store").fetch(StoredMessage(1, 777))
+        assert path is not None
+        path.write_bytes(b"CONTEUDO")  # mesmo tamanho, bytes trocados
+
+        store = MediaStore(state, tmp_path / "store")
+        assert await store.fetch(StoredMessage(2, 777)) == path
+        assert await store.fetch(StoredMessage(3, 777)) == path
+
+    assert path.read_bytes() == b"conteudo"
+    assert (store.downloads, store.hits) == (1, 1)
+    assert not store._locks
+
+
+def test_media_filter_by_type_and_size() -> None:
+    """Testa o filtro de mídia por tipo (GIF não conta como vídeo) e tamanho."""
+
+    def message(kind: str, size: int) -> SimpleNamespace:
+        attrs = dict.fromkeys(
+            ("photo", "sticker", "gif", "video_note", "voice", "video", "audio", "document")
+        )
+        attrs[kind] = object()
+        return SimpleNamespace(**attrs, file=SimpleNamespace(size=size))
+
+    media_filter = MediaFilter.parse("photo, video", max_mb=1)
+
+    assert media_filter.accepts(message("photo", 1024))
+    assert not media_filter.accepts(message("video", 2 * 1024 * 1024))
+    assert not media_filter.accepts(message("gif", 1024))
+    assert MediaFilter().accepts(message("document", 10**9))
+    with pytest.raises(ValueError, match="filme"):
+        MediaFilter.parse("filme", None)
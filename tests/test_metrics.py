@@ -0,0 +1,62 @@
+"""Testes das métricas das operações."""
+
+import pytest
+from telethon import errors
+
+from telegram_gfcr.core import metrics as metrics_module
+from telegram_gfcr.core.errors import RateLimitError, handle_telethon_errors, retry_on_flood
+from telegram_gfcr.core.metrics import Metrics
+
+
+@pytest.mark.asyncio
+async def test_decorators_record_metrics(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Testa chamadas, erros pela classe original, retries e segundos de FloodWait."""
+    metrics = Metrics()
+    monkeypatch.setattr(metrics_module, "_metrics", metrics)
+    attempts = 0
+
+    @retry_on_flood(max_retries=1, base_delay=0)
+    @handle_telethon_errors("fake_op")
+    async def flaky() -> str:
+        nonlocal attempts
+        attempts += 1
+        raise errors.FloodWaitError(request=None, capture=0)
+
+    with pytest.raises(RateLimitError):
+        await flaky()
+
+    stats = metrics.operations["fake_op"]
+    assert attempts == 2
+    assert stats.calls == 2
+    assert stats.errors == {"FloodWaitError": 2}
+    assert stats.retries == 2
+
+    prometheus = metrics.to_prometheus()
+    assert 'telegram_gfcr_operation_calls_total{operation="fake_op"} 2' in prometheus
+    assert 'operation_duration_seconds_bucket{operation="fake_op",le="+Inf"} 2' in prometheus
+
+    restored = Metrics.from_snapshot(metrics.snapshot())
+    assert restored.operations["fake_op"].buckets == stats.buckets
+
+
+def test_queue_depth() -> None:
+    """Testa a amostragem de profundidade de fila e o dump sem a chave (versão anterior)."""
+    metrics = Metrics()
+    for depth in (1, 3, 2):
+        metrics.queue("backup_write", depth)
+
+    assert 'telegram_gfcr_queue_depth_max{queue="backup_write"} 3' in metrics.to_prometheus()
+    restored = Metrics.from_snapshot(metrics.snapshot())
+    assert restored.queues["backup_write"].depth_sum == 6
+
+    snapshot = metrics.snapshot()
+    del snapshot["queues"]
+    assert Metrics.from_snapshot(snapshot).queues == {}
+
+
+def test_prometheus_escapes_labels() -> None:
+    """Testa o escape de `\\`, `"` e quebra de linha nos valores de label."""
+    metrics = Metrics()
+    metrics.queue('a\\b "c"\nd', 1)
+
+    assert 'queue="a\\\\b \\"c\\"\\nd"' in metrics.to_prometheus()
@@ -0,0 +1,71 @@
+"""Testes do cache de peers."""
+
+from pathlib import Path
+
+import pytest
+from telethon.tl.types import Channel, ChatPhotoEmpty, InputPeerChannel, InputPeerUser, User
+
+from telegram_gfcr.core.peers import PeerCache, input_peer, peer_info
+from telegram_gfcr.core.state import StateStore
+
+
+def _channel(channel_id: int, access_hash: int) -> Channel:
+    return Channel(
+        id=channel_id,
+        title="Canal",
+        photo=ChatPhotoEmpty(),
+        date=None,
+        access_hash=access_hash,
+        username="canal",
+    )
+
+
+def test_peer_info_roundtrip() -> None:
+    """Testa conversão entidade → PeerInfo → InputPeer."""
+    info = peer_info(_channel(123, 999))
+    assert info is not None
+    assert info.id == -1_000_000_000_123
+    assert input_peer(info) == InputPeerChannel(123, 999)
+
+    user = peer_info(User(id=42, access_hash=7, first_name="Ana", last_name="Lima"))
+    assert user is not None
+    assert user.name == "Ana Lima"
+    assert input_peer(user) == InputPeerUser(42, 7)
+
+    assert peer_info(User(id=43, access_hash=8, min=True)) is None
+
+
+@pytest.mark.asyncio
+async def test_cache_persists_and_evicts(tmp_path: Path) -> None:
+    """Testa LRU em memória com persistência em disco."""
+    cache = PeerCache(capacity=1, state=StateStore(tmp_path / "state.db"))
+    cache.remember(_channel(1, 10))
+    cache.remember(_channel(2, 20))
+    await cache.close()
+
+    cache = PeerCache(capacity=1, state=StateStore(tmp_path / "state.db"))
+    assert await cache.resolve(-1_000_000_000_001) == InputPeerChannel(1, 10)
+    assert await cache.resolve(-1_000_000_000_002) == InputPeerChannel(2, 20)
+    assert await cache.resolve(555) is None
+    await cache.close()
+
+
+@pytest.mark.asyncio
+async def test_flush_keeps_peers_seen_while_saving(tmp_path: Path) -> None:
+    """Testa que `remember` durante a gravação e troca de access_hash não se perdem."""
+
+    class SlowStore(StateStore):
+        async def save_peers(self, peers: list) -> None:
+            cache.remember(_channel(2, 20))  # chega enquanto o lote é gravado
+            await super().save_peers(peers)
+
+    cache = PeerCache(state=SlowStore(tmp_path / "state.db"))
+    cache.remember(_channel(1, 10))
+    await cache.flush()
+    cache.remember(_channel(1, 11))  # mesmo id, access_hash novo
+    await cache.close()
+
+    async with StateStore(tmp_path / "state.db") as state:
+        cache = PeerCache(state=state)
+        assert await cache.resolve(-1_000_000_000_001) == InputPeerChannel(1, 11)
+        assert await cache.resolve(-1_000_000_000_002) == InputPeerChannel(2, 20)
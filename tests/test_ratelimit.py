@@ -0,0 +1,53 @@
+"""Testes do rate limiter adaptativo."""
+
+import time
+
+import pytest
+
+from telegram_gfcr.core.ratelimit import MIN_RATE, RateLimiter, TokenBucket
+
+
+def test_flood_blocks_and_halves_rate() -> None:
+    """Testa que FloodWait bloqueia o bucket e reduz a taxa."""
+    bucket = TokenBucket(rate=2.0, burst=5.0)
+    now = time.monotonic()
+    assert bucket.delay(now) == 0
+
+    bucket.on_flood(30)
+    assert bucket.rate == 1.0
+    assert bucket.delay() == pytest.approx(30, abs=0.5)
+
+    for _ in range(100):
+        bucket.on_flood(0)
+    assert bucket.rate == MIN_RATE
+
+
+def test_success_recovers_rate() -> None:
+    """Testa recuperação aditiva até a taxa base."""
+    bucket = TokenBucket(rate=2.0, burst=5.0)
+    bucket.on_flood(0)
+    for _ in range(100):
+        bucket.on_success()
+    assert bucket.rate == 2.0
+
+
+@pytest.mark.asyncio
+async def test_paced_acquires_once_per_page() -> None:
+    """Testa consumo de um token por página do iterador."""
+    limiter = RateLimiter()
+    acquired: list[str] = []
+
+    async def fake_acquire(rate_class: str) -> float:
+        acquired.append(rate_class)
+        return 0.0
+
+    limiter.acquire = fake_acquire  # type: ignore[method-assign]
+
+    async def pages():
+        for n in range(250):
+            yield n
+
+    items = [n async for n in limiter.paced(pages(), "history", page_size=100)]
+
+    assert items == list(range(250))
+    assert acquired == ["history"] * 3
@@ -0,0 +1,60 @@
+"""Testes da busca em vários chats."""
+
+from collections.abc import AsyncIterator
+from datetime import UTC, datetime, timedelta
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+
+from telegram_gfcr.commands.search import ChatFailure, search_stream
+from telegram_gfcr.core.ratelimit import RateLimiter
+
+EPOCH = datetime(2024, 1, 1, tzinfo=UTC)
+
+# Horas de cada resultado por chat (cada chat entrega do mais novo para o mais antigo)
+HISTORY = {1: [9, 6, 2], 2: [8, 7, 1], 3: [5]}
+
+
+class FakeClient:
+    """Só o que `search_stream` usa do wrapper."""
+
+    def __init__(self) -> None:
+        self.client = self
+        self.rate_limiter = RateLimiter({"search": (1e9, 1e9)})
+        self.peers = SimpleNamespace(remember=lambda sender: None)
+
+    async def resolve(self, entity_id: int) -> int:
+        if entity_id not in HISTORY:
+            raise ValueError("chat inexistente")
+        return entity_id
+
+    async def iter_messages(self, peer: int, search: str, limit: int) -> AsyncIterator[Any]:
+        for hour in HISTORY[peer][:limit]:
+            yield SimpleNamespace(
+                id=hour, chat_id=peer, sender=None, date=EPOCH + timedelta(hours=hour)
+            )
+
+
+async def _collect(entity_ids: list[int | None], limit: int) -> tuple[list[Any], list[ChatFailure]]:
+    failures: list[ChatFailure] = []
+    stream = search_stream(FakeClient(), "x", entity_ids, limit, 2, failures)  # type: ignore[arg-type]
+    return [message async for message in stream], failures
+
+
+@pytest.mark.asyncio
+async def test_results_merged_by_date() -> None:
+    """Testa a intercalação por data (mais nova primeiro) entre os chats."""
+    messages, failures = await _collect([1, 2, 3], limit=10)
+
+    assert [m.id for m in messages] == [9, 8, 7, 6, 5, 2, 1]
+    assert failures == []
+
+
+@pytest.mark.asyncio
+async def test_limit_and_failed_chat() -> None:
+    """Testa o corte no limite e que um chat com erro não derruba a busca."""
+    messages, failures = await _collect([1, 99, 2], limit=3)
+
+    assert [(m.chat_id, m.id) for m in messages] == [(1, 9), (2, 8), (2, 7)]
+    assert failures == [ChatFailure(99, "chat inexistente")]
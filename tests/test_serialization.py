@@ -0,0 +1,69 @@
+"""Testes da serialização compacta e do loader dos dois formatos."""
+
+import json
+from datetime import UTC, datetime
+
+from telethon.tl.types import (
+    Document,
+    DocumentAttributeFilename,
+    Message,
+    MessageEntityBold,
+    MessageEntityTextUrl,
+    MessageMediaDocument,
+    MessageReplyHeader,
+    PeerChannel,
+    PeerUser,
+)
+
+from telegram_gfcr.core.serialization import load_message, to_compact
+
+
+def _message() -> Message:
+    document = Document(
+        id=11,
+        access_hash=1,
+        file_reference=b"",
+        date=None,
+        mime_type="text/plain",
+        size=10,
+        dc_id=1,
+        attributes=[DocumentAttributeFilename('relatório "final".txt')],
+    )
+    return Message(
+        id=7,
+        peer_id=PeerChannel(123),
+        date=datetime(2024, 1, 1, tzinfo=UTC),
+        message='olá "mundo"\nsegunda linha',
+        from_id=PeerUser(42),
+        reply_to=MessageReplyHeader(reply_to_msg_id=5),
+        grouped_id=9,
+        entities=[MessageEntityBold(0, 3), MessageEntityTextUrl(4, 7, "https://a.b")],
+        media=MessageMediaDocument(document=document),
+    )
+
+
+def test_compact_is_valid_json() -> None:
+    """Testa que a linha compacta é JSON válido e de linha única."""
+    line = to_compact(_message())
+    assert "\n" not in line
+    data = json.loads(line)
+    assert data["chat"] == -1000000000123
+    assert data["entities"] == [["Bold", 0, 3], ["TextUrl", 4, 7, "https://a.b"]]
+
+
+def test_loader_reads_both_formats() -> None:
+    """Testa que full e compact carregam a mesma mensagem."""
+    message = _message()
+    full = load_message(message.to_json())
+    compact = load_message(to_compact(message))
+
+    assert full == compact
+    assert compact.sender_id == 42
+    assert compact.reply_to == 5
+    assert compact.media == {
+        "type": "document",
+        "id": 11,
+        "size": 10,
+        "mime": "text/plain",
+        "name": 'relatório "final".txt',
+    }
@@ -0,0 +1,63 @@
+"""Testes do banco de estado (checkpoints de backup)."""
+
+from pathlib import Path
+
+import pytest
+
+from telegram_gfcr.core.models import DialogInfo, filter_dialogs
+from telegram_gfcr.core.state import BackupCheckpoint, StateStore
+
+
+def test_checkpoint_extend() -> None:
+    """Testa ampliação da faixa de ids gravados."""
+    checkpoint = BackupCheckpoint(entity_id=1, output="/tmp/x")
+    checkpoint.extend([50, 49, 48])
+    checkpoint.extend([47])
+    assert (checkpoint.min_id, checkpoint.max_id) == (47, 50)
+
+    checkpoint.extend([51, 52])
+    assert (checkpoint.min_id, checkpoint.max_id) == (47, 52)
+
+
+@pytest.mark.asyncio
+async def test_checkpoint_roundtrip(tmp_path: Path) -> None:
+    """Testa persistência de checkpoint e estado de mídias."""
+    async with StateStore(tmp_path / "state.db") as state:
+        checkpoint = await state.get_checkpoint(1, "out")
+        assert checkpoint.max_id == 0
+        assert not checkpoint.complete
+
+        checkpoint.extend([10, 5])
+        checkpoint.complete = True
+        await state.save_checkpoint(checkpoint)
+
+        await state.mark_media(1, "out", [5], done=False)
+        await state.mark_media(1, "out", [10], done=True)
+        await state.mark_media(1, "out", [5], done=True)
+
+    async with StateStore(tmp_path / "state.db") as state:
+        checkpoint = await state.get_checkpoint(1, "out")
+        assert (checkpoint.min_id, checkpoint.max_id, checkpoint.complete) == (5, 10, True)
+        assert await state.get_media(1, "out", done=True) == {5, 10}
+        assert await state.get_media(1, "out", done=False) == set()
+
+
+@pytest.mark.asyncio
+async def test_dialog_cache_roundtrip(tmp_path: Path) -> None:
+    """Testa cache de diálogos preservando a ordem do Telegram."""
+    dialogs = [
+        DialogInfo(300, "Canal", "channel", 0, 90),
+        DialogInfo(100, "Grupo", "supergroup", 3, 15),
+        DialogInfo(200, "Ana", "user", 1, 7),
+    ]
+
+    async with StateStore(tmp_path / "state.db") as state:
+        assert await state.load_dialogs() == ([], None)
+
+        await state.save_dialogs(dialogs, 1000.0)
+        cached, updated_at = await state.load_dialogs()
+        assert cached == dialogs
+        assert updated_at == 1000.0
+
+    assert filter_dialogs(cached, "groups") == [dialogs[1]]
+    assert filter_dialogs(cached, "user") == [dialogs[2]]
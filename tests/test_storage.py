@@ -0,0 +1,49 @@
+"""Testes do armazenamento segmentado dos backups."""
+
+from pathlib import Path
+
+from telegram_gfcr.core.storage import SegmentWriter, iter_backup_lines, list_segments
+
+
+def _records(start: int, count: int) -> list[tuple[int, int, str]]:
+    return [(i, 1_700_000_000 + i, f'{{"id": {i}}}') for i in range(start, start + count)]
+
+
+def test_segments_rotate_and_resume(tmp_path: Path) -> None:
+    """Testa rotação por registros, índice por bloco e retomada do último segmento."""
+    with SegmentWriter(tmp_path, max_records=4, compression="gzip") as writer:
+        writer.write_batch(_records(1, 3))
+        writer.write_batch(_records(4, 3))
+        writer.write_batch(_records(7, 3))
+
+    segments = list_segments(tmp_path)
+    assert [s.path.name for s in segments] == [
+        "messages.000001.jsonl.gz",
+        "messages.000002.jsonl.gz",
+    ]
+
+    block = segments[0].blocks()[1]
+    assert (block.first_id, block.last_id, block.count) == (4, 6, 3)
+    assert segments[0].read_block(block) == ['{"id": 4}', '{"id": 5}', '{"id": 6}']
+
+    # Segmento 2 tem espaço: a próxima execução continua nele
+    with SegmentWriter(tmp_path, max_records=4, compression="gzip") as writer:
+        writer.write_batch(_records(10, 1))
+
+    assert len(list_segments(tmp_path)) == 2
+    assert list(iter_backup_lines(tmp_path)) == [f'{{"id": {i}}}' for i in range(1, 11)]
+
+
+def test_orphan_block_is_discarded(tmp_path: Path) -> None:
+    """Testa descarte de dados gravados sem entrada no índice (queda no meio do bloco)."""
+    with SegmentWriter(tmp_path) as writer:
+        writer.write_batch(_records(1, 2))
+
+    segment = list_segments(tmp_path)[0]
+    with segment.path.open("ab") as f:
+        f.write(b'{"id": 3')
+
+    with SegmentWriter(tmp_path) as writer:
+        writer.write_batch(_records(3, 1))
+
+    assert list(iter_backup_lines(tmp_path)) == ['{"id": 1}', '{"id": 2}', '{"id": 3}']
@@ -0,0 +1,27 @@
+"""Testes do planejamento do `sync`."""
+
+from telegram_gfcr.commands.sync import plan_sync
+from telegram_gfcr.core.models import DialogInfo
+from telegram_gfcr.core.state import BackupCheckpoint
+
+
+def test_plan_skips_unchanged_and_orders_by_lag() -> None:
+    """Testa que diálogos em dia ficam de fora e os mais atrasados vêm primeiro."""
+    dialogs = [
+        DialogInfo(1, "em dia", "group", 0, 100),
+        DialogInfo(2, "pouco atrasado", "group", 3, 105),
+        DialogInfo(3, "novo", "channel", 0, 40),
+        DialogInfo(4, "muito atrasado", "supergroup", 0, 500),
+        DialogInfo(5, "histórico incompleto", "user", 0, 10),
+        DialogInfo(6, "vazio", "user", 0, 0),
+    ]
+    checkpoints = {
+        1: BackupCheckpoint(1, "out/1", max_id=100, min_id=1, complete=True),
+        2: BackupCheckpoint(2, "out/2", max_id=100, min_id=1, complete=True),
+        4: BackupCheckpoint(4, "out/4", max_id=300, min_id=1, complete=True),
+        5: BackupCheckpoint(5, "out/5", max_id=10, min_id=8, complete=False),
+    }
+
+    plan = plan_sync(dialogs, checkpoints)
+
+    assert [(item.dialog.id, item.behind) for item in plan] == [(4, 200), (3, 40), (2, 5), (5, 0)]
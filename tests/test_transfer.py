@@ -0,0 +1,135 @@
+"""Testes do download paralelo em partes."""
+
+import asyncio
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+from telethon.tl.types import Document
+
+from telegram_gfcr.core.media import download_media_with_retry
+from telegram_gfcr.core.transfer import PART_SIZE, ParallelTransfer
+
+
+class FakeSender:
+    """Sender que serve fatias de um conteúdo fixo."""
+
+    def __init__(self, content: bytes) -> None:
+        self.content = content
+        self.requests = 0
+
+    async def send(self, request) -> SimpleNamespace:
+        self.requests += 1
+        await asyncio.sleep(0)
+        return SimpleNamespace(bytes=self.content[request.offset : request.offset + request.limit])
+
+
+@pytest.mark.asyncio
+async def test_parts_land_at_their_offsets(tmp_path: Path) -> None:
+    """Testa que as partes de vários senders montam o arquivo original."""
+    content = bytes(range(256)) * (PART_SIZE * 5 // 256 + 7)
+    document = Document(
+        id=1,
+        access_hash=2,
+        file_reference=b"",
+        date=None,
+        mime_type="video/mp4",
+        size=len(content),
+        dc_id=4,
+        attributes=[],
+    )
+    message = SimpleNamespace(id=9, document=document)
+
+    transfer = ParallelTransfer(client=None, connections=3, threshold=PART_SIZE)  # type: ignore[arg-type]
+    senders = [FakeSender(content) for _ in range(3)]
+    transfer._senders[4] = senders  # type: ignore[assignment]
+    seen: list[int] = []
+
+    assert transfer.should_split(message)
+    path = await transfer.download(message, tmp_path / "video.mp4", lambda r, t: seen.append(r))
+
+    assert path.read_bytes() == content
+    assert seen[-1] == len(content)
+    assert sum(sender.requests for sender in senders) == 6
+    assert all(sender.requests for sender in senders)
+
+
+@pytest.mark.asyncio
+async def test_same_name_files_do_not_overwrite(tmp_path: Path) -> None:
+    """Testa que documentos homônimos baixados em partes ganham o id no nome."""
+    transfer = ParallelTransfer(client=None, connections=2, threshold=PART_SIZE)  # type: ignore[arg-type]
+    for message_id in (9, 10):
+        content = bytes([message_id]) * PART_SIZE
+        transfer._senders[4] = [FakeSender(content), FakeSender(content)]  # type: ignore[assignment]
+        document = Document(
+            id=message_id,
+            access_hash=2,
+            file_reference=b"",
+            date=None,
+            mime_type="video/mp4",
+            size=len(content),
+            dc_id=4,
+            attributes=[],
+        )
+        message = SimpleNamespace(
+            id=message_id, document=document, file=SimpleNamespace(name="video.mp4", ext=".mp4")
+        )
+        await download_media_with_retry(message, tmp_path, transfer)
+
+    assert (tmp_path / "9_video.mp4").read_bytes() == bytes([9]) * PART_SIZE
+    assert (tmp_path / "10_video.mp4").read_bytes() == bytes([10]) * PART_SIZE
+
+
+class BrokenSender(FakeSender):
+    """Sender que falha na segunda parte."""
+
+    async def send(self, request) -> SimpleNamespace:
+        if request.offset:
+            raise ConnectionError("conexão caiu")
+        return await super().send(request)
+
+
+def _big_message(message_id: int, content: bytes) -> SimpleNamespace:
+    document = Document(
+        id=message_id,
+        access_hash=2,
+        file_reference=b"",
+        date=None,
+        mime_type="video/mp4",
+        size=len(content),
+        dc_id=4,
+        attributes=[],
+    )
+    return SimpleNamespace(
+        id=message_id, document=document, file=SimpleNamespace(name="video.mp4", ext=".mp4")
+    )
+
+
+@pytest.mark.asyncio
+async def test_failed_part_removes_file(tmp_path: Path) -> None:
+    """Testa que o arquivo pré-alocado não fica no disco quando uma parte falha."""
+    content = b"x" * PART_SIZE * 2
+    transfer = ParallelTransfer(client=None, connections=1, threshold=PART_SIZE)  # type: ignore[arg-type]
+    transfer._senders[4] = [BrokenSender(content)]  # type: ignore[assignment]
+
+    with pytest.raises(ExceptionGroup):
+        await transfer.download(_big_message(9, content), tmp_path / "video.mp4")
+    assert not (tmp_path / "video.mp4").exists()
+
+
+@pytest.mark.asyncio
+async def test_falls_back_to_normal_download(tmp_path: Path) -> None:
+    """Testa que uma falha no download em partes cai no `download_media` do Telethon."""
+    content = b"x" * PART_SIZE * 2
+    transfer = ParallelTransfer(client=None, connections=2, threshold=PART_SIZE)  # type: ignore[arg-type]
+    transfer._senders[4] = [BrokenSender(content), BrokenSender(content)]  # type: ignore[assignment]
+    message = _big_message(9, content)
+
+    async def download_media(file: str) -> str:
+        Path(file).write_bytes(content)
+        return file
+
+    message.download_media = download_media
+    await download_media_with_retry(message, tmp_path, transfer)
+
+    assert (tmp_path / "9_video.mp4").read_bytes() == content